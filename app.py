@@ -1,7 +1,20 @@
+import importlib.util
+import os
 import dash
 from dash import html, dcc
 
-app = dash.Dash(__name__, use_pages=True)
+# Respuestas comprimidas con brotli/gzip si flask-compress está instalado
+COMPRESION = os.environ.get('COMPRESION', '1') != '0' and importlib.util.find_spec('flask_compress') is not None
+
+# Las páginas importan scipy, numba y los simuladores dentro de sus
+# callbacks, así que registrarlas todas al arrancar es barato
+app = dash.Dash(__name__, use_pages=True, compress=COMPRESION)
+
+# Tiempos y tamaños de los callbacks en /metrics y en /diagnostico
+if os.environ.get('METRICAS', '1') != '0':
+    from utils.metricas import instalar as instalar_metricas
+
+    instalar_metricas(app)
 
 app.layout = html.Div([
     html.H1("Técnicas de Modelamiento Matemático", className='app-header'),
@@ -15,5 +28,8 @@ app.layout = html.Div([
     dash.page_container
 ], className='app-container')
 
+# Servidor WSGI (Flask) para gunicorn/uvicorn, ver wsgi.py
+server = app.server
+
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
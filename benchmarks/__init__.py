@@ -0,0 +1,13 @@
+# ==========================================
+# BENCHMARKS DE MODELOS, SOLVERS Y FIGURAS
+# ==========================================
+#
+# Cada módulo bench_*.py define funciones time_* (estilo asv): el runner
+# las mide con timeit y compara la mediana con benchmarks/referencia.json.
+# Una función puede declarar `params` (lista de valores que recibe como
+# argumento) y `umbral` (tolerancia propia a la regresión).
+#
+#     python -m benchmarks                        # ejecuta y compara
+#     python -m benchmarks campo                  # solo los que contienen "campo"
+#     python -m benchmarks --registrar            # agrega la corrida a historial.jsonl
+#     python -m benchmarks --guardar-referencia   # fija la referencia actual
@@ -0,0 +1,154 @@
+import argparse
+import importlib
+import json
+import os
+import pkgutil
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+RUTA_REFERENCIA = os.path.join(CARPETA, 'referencia.json')
+RUTA_HISTORIAL = os.path.join(CARPETA, 'historial.jsonl')
+
+# Una mediana más lenta que la referencia en más de este factor es regresión
+UMBRAL = 0.25
+REPETICIONES = 5
+
+
+def _preparar_entorno():
+    # Sin trabajos en segundo plano ni caché compartida: se mide el código
+    os.environ.setdefault('SEGUNDO_PLANO', '0')
+    os.environ.setdefault('CACHE_BACKEND', 'memoria')
+    import dash
+
+    # Las páginas llaman a dash.register_page al importarse
+    dash.Dash(__name__, use_pages=True, pages_folder='')
+
+
+def descubrir(filtro=None):
+    """
+    Devuelve [(identificador, función, parámetro)] de los time_* de cada
+    módulo bench_*.py.
+    """
+    casos = []
+    for info in sorted(pkgutil.iter_modules([CARPETA]), key=lambda m: m.name):
+        if not info.name.startswith('bench_'):
+            continue
+        modulo = importlib.import_module(f"benchmarks.{info.name}")
+        for nombre in sorted(dir(modulo)):
+            if not nombre.startswith('time_'):
+                continue
+            funcion = getattr(modulo, nombre)
+            for parametro in getattr(funcion, 'params', [None]):
+                identificador = f"{info.name[len('bench_'):]}.{nombre[len('time_'):]}"
+                if parametro is not None:
+                    identificador += f"[{parametro}]"
+                if filtro is None or filtro in identificador:
+                    casos.append((identificador, funcion, parametro))
+    return casos
+
+
+def medir(funcion, parametro, repeticiones=REPETICIONES):
+    """
+    Mide una función con timeit: cada repetición dura al menos 0.2 s y el
+    tiempo por llamada es el de la repetición dividido por las llamadas.
+    """
+    argumentos = () if parametro is None else (parametro,)
+    temporizador = timeit.Timer(lambda: funcion(*argumentos))
+    numero, _ = temporizador.autorange()
+    tiempos = [t / numero for t in temporizador.repeat(repeticiones, numero)]
+    return {'mediana': statistics.median(tiempos), 'minimo': min(tiempos), 'llamadas': numero}
+
+
+def comparar(resultados, referencia, umbrales):
+    """
+    Devuelve las regresiones: [(identificador, actual, referencia, cambio)].
+    """
+    regresiones = []
+    for identificador, datos in resultados.items():
+        base = referencia.get(identificador)
+        if base is None:
+            continue
+        cambio = datos['mediana'] / base['mediana'] - 1
+        if cambio > umbrales.get(identificador, UMBRAL):
+            regresiones.append((identificador, datos['mediana'], base['mediana'], cambio))
+    return regresiones
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=CARPETA,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _maquina():
+    return {'python': platform.python_version(), 'sistema': platform.platform(),
+            'procesador': platform.machine(), 'nucleos': os.cpu_count()}
+
+
+def _leer_referencia():
+    try:
+        with open(RUTA_REFERENCIA, encoding='utf-8') as f:
+            return json.load(f)
+    except OSError:
+        return {'resultados': {}}
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmarks del dashboard')
+    parser.add_argument('filtro', nargs='?', help='ejecuta solo los benchmarks cuyo nombre lo contiene')
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES)
+    parser.add_argument('--registrar', action='store_true', help='agrega la corrida a historial.jsonl')
+    parser.add_argument('--guardar-referencia', action='store_true',
+                        help='guarda los resultados como nueva referencia')
+    args = parser.parse_args(argumentos)
+
+    _preparar_entorno()
+    referencia = _leer_referencia()
+    casos = descubrir(args.filtro)
+    resultados = {}
+    umbrales = {}
+
+    print(f"{'Benchmark':<44}{'mediana (ms)':>14}{'referencia':>12}{'cambio':>9}")
+    for identificador, funcion, parametro in casos:
+        resultados[identificador] = medir(funcion, parametro, args.repeticiones)
+        umbrales[identificador] = getattr(funcion, 'umbral', UMBRAL)
+        actual = resultados[identificador]['mediana']
+        base = referencia['resultados'].get(identificador)
+        if base is None:
+            print(f"{identificador:<44}{1000 * actual:>14.3f}{'-':>12}{'':>9}")
+        else:
+            print(f"{identificador:<44}{1000 * actual:>14.3f}{1000 * base['mediana']:>12.3f}"
+                  f"{100 * (actual / base['mediana'] - 1):>+8.0f}%")
+
+    if args.registrar:
+        with open(RUTA_HISTORIAL, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': _commit(),
+                                'maquina': _maquina(), 'resultados': resultados}) + '\n')
+
+    if args.guardar_referencia:
+        referencia['resultados'].update(resultados)
+        referencia.update({'commit': _commit(), 'maquina': _maquina()})
+        with open(RUTA_REFERENCIA, 'w', encoding='utf-8') as f:
+            json.dump(referencia, f, indent=2, sort_keys=True)
+        print(f"\nReferencia guardada en {RUTA_REFERENCIA}")
+        return 0
+
+    regresiones = comparar(resultados, referencia['resultados'], umbrales)
+    if regresiones:
+        print("\nRegresiones:")
+        for identificador, actual, base, cambio in regresiones:
+            print(f"  {identificador}: {1000 * base:.3f} ms -> {1000 * actual:.3f} ms "
+                  f"({100 * cambio:+.0f} %, umbral {100 * umbrales[identificador]:.0f} %)")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import contextlib
+import os
+
+from pages.pagina8 import actualizar_dashboard_covid
+from pages.pagina9 import actualizar_dashboard_clima
+from pages.ppagina10 import obtener_datos_malaria_api
+from utils import api
+
+# ==========================================
+# PROCESAMIENTO DE RESPUESTAS DE LAS APIS
+# ==========================================
+#
+# Las peticiones se reproducen desde benchmarks/fixtures (ver generar.py)
+# sin latencia y con la caché vacía: se mide la lectura del fixture, el
+# procesamiento y la figura.
+
+CARPETA_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+@contextlib.contextmanager
+def _api_grabada():
+    anterior = api.configurar(modo='reproducir', carpeta=CARPETA_FIXTURES, latencia_ms=0)
+    api.limpiar_cache()
+    try:
+        yield
+    finally:
+        api.configurar(**anterior)
+
+
+def time_dashboard_covid(dias):
+    with _api_grabada():
+        actualizar_dashboard_covid(1, 'Peru', dias)
+
+
+time_dashboard_covid.params = [90, 'all']
+
+
+def time_dashboard_clima(tipo):
+    with _api_grabada():
+        actualizar_dashboard_clima(1, 'lima', tipo)
+
+
+time_dashboard_clima.params = ['temperatura', 'precipitacion']
+
+
+def time_datos_malaria():
+    with _api_grabada():
+        obtener_datos_malaria_api('GHA')
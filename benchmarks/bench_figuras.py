@@ -0,0 +1,94 @@
+import numpy as np
+
+from pages.pagina5 import (generar_campo_vectorial, actualizar_campo_vectorial, detallar_campo_vectorial,
+                          mover_parametros)
+from pages.pagina6 import simular_sir_euler
+from pages.ppagina13 import generar_grafico_sir
+from utils.funciones import generar_graf_pob_exp, generar_grafico_logistico
+from utils.submuestreo import indices_min_max
+
+# ==========================================
+# CONSTRUCCIÓN DE FIGURAS
+# ==========================================
+
+MALLAS = [10, 25, 50]
+
+
+def time_generar_campo_vectorial(n):
+    generar_campo_vectorial("np.sin(Y)", "np.cos(X)", 5, 5, n)
+
+
+time_generar_campo_vectorial.params = MALLAS
+
+
+def time_flechas_campo_vectorial(n):
+    # Callback completo: evaluación del campo y la traza de flechas
+    actualizar_campo_vectorial(lambda hechos, total: None, 1, "np.sin(Y)", "np.cos(X)", 5, 5, n)
+
+
+time_flechas_campo_vectorial.params = MALLAS
+
+
+def time_analisis_campo_vectorial(n):
+    # Flechas más nulclinas, equilibrios y su estabilidad
+    actualizar_campo_vectorial(lambda hechos, total: None, 1, "np.sin(Y)", "np.cos(X)", 5, 5, n, ['analisis'])
+
+
+time_analisis_campo_vectorial.params = MALLAS
+
+
+def time_capa_campo_vectorial(n):
+    # Flechas sobre el mapa de calor de la divergencia (malla fina)
+    actualizar_campo_vectorial(lambda hechos, total: None, 1, "np.sin(Y)", "np.cos(X)", 5, 5, n, [], 'divergencia')
+
+
+time_capa_campo_vectorial.params = MALLAS
+
+
+def time_zoom_campo_vectorial(n):
+    # Desplazamiento dentro de una vista ampliada: las teselas ya están
+    # en caché tras la primera llamada
+    config = {'fx': "np.sin(Y)", 'fy': "np.cos(X)", 'xmax': 5, 'ymax': 5, 'n': n}
+    detallar_campo_vectorial({'x': [0.5, 1.5], 'y': [-0.4, 0.6]}, config)
+
+
+time_zoom_campo_vectorial.params = MALLAS
+
+
+_PARAMETROS = [{'type': 'parametro-campo', 'nombre': 'a'}, {'type': 'parametro-campo', 'nombre': 'b'}]
+
+
+def time_parametros_campo_vectorial(n):
+    # Arrastre de un deslizador: solo la parte de las expresiones que
+    # depende de los parámetros, con la capa de divergencia
+    config = {'fx': "a*np.sin(Y)*np.exp(-X**2/10)", 'fy': "np.cos(X) + b*Y", 'xmax': 5, 'ymax': 5, 'n': n,
+              'refinamiento': -(-200 // (n - 1)), 'capa': 'divergencia', 'analisis': False, 'flechas': 1}
+    mover_parametros([1.5, -0.5], _PARAMETROS, None, config)
+
+
+time_parametros_campo_vectorial.params = MALLAS
+
+
+def time_generar_graf_pob_exp():
+    generar_graf_pob_exp(100, 0.03, 100)
+
+
+def time_generar_grafico_logistico():
+    generar_grafico_logistico(10, 0.1, 1000, 100)
+
+
+def time_generar_grafico_sir():
+    generar_grafico_sir(990, 10, 0, 0.3, 0.1, 160)
+
+
+_series = {}
+
+
+def time_reducir_serie(dias):
+    # Solo la reducción de los infectados de un SIR de Euler a 800 puntos
+    if dias not in _series:
+        _series[dias] = np.asarray(simular_sir_euler(1000, 0.24, 0.1, 1, dias)[2])
+    indices_min_max(_series[dias], 800)
+
+
+time_reducir_serie.params = [10000, 100000]
@@ -0,0 +1,157 @@
+import itertools
+
+import numpy as np
+
+from pages.pagina6 import simular_sir_euler
+from pages.pagina7 import simular_seir_euler
+from utils.modelos import sir_rhs, sir_jac, seir_rhs, seir_jac
+from utils.solver import resolver_ode
+from utils.estocastico import simular_ensamble
+from utils.metapoblacion import regiones_sinteticas, simular_metapoblacion
+from utils.redes import generar_red, libre_escala, simular_sincrono, simular_eventos
+from utils.agentes import crear_simulacion, avanzar
+from utils import difusion
+from utils.intervenciones import simular_calendario
+from utils.control import optimizar_control
+from utils.sensibilidad import analizar_sensibilidad
+from utils.cache_compartido import obtener_cache
+
+# ==========================================
+# MODELOS Y SOLVERS
+# ==========================================
+
+
+def time_simular_sir_euler(t_max):
+    simular_sir_euler(1000, 0.24, 0.1, 1, t_max)
+
+
+time_simular_sir_euler.params = [100, 1000]
+
+
+def time_simular_seir_euler(t_max):
+    simular_seir_euler(1000, 0.5, 0.2, 0.1, 1, 0, t_max)
+
+
+time_simular_seir_euler.params = [100, 1000]
+
+
+def time_resolver_sir(t_max):
+    resolver_ode(sir_rhs, [999, 1, 0], t_max, args=(0.3, 0.1, 1000), jac=sir_jac,
+                 umbrales={'fin': (1, 1.0, -1)})
+
+
+time_resolver_sir.params = [100, 1000]
+
+
+def time_resolver_seir(t_max):
+    resolver_ode(seir_rhs, [999, 1, 0, 0], t_max, args=(0.5, 0.2, 0.1, 1000), jac=seir_jac,
+                 indice_pico=2)
+
+
+time_resolver_seir.params = [100, 1000]
+
+
+def time_ensamble_sir(realizaciones):
+    # Un solo proceso: se mide el simulador, no el reparto entre núcleos
+    simular_ensamble(999, 1, 0, 0.24, 0.1, 100, realizaciones=realizaciones, semilla=0, procesos=1)
+
+
+time_ensamble_sir.params = [100, 500]
+# Los tiempos del ensamble dependen más de la carga de la máquina
+time_ensamble_sir.umbral = 0.4
+
+
+_REGIONES = {n: regiones_sinteticas(n) for n in (500, 5000)}
+
+
+def time_metapoblacion_sir(regiones):
+    # Un año de SIR con movilidad dispersa entre `regiones` regiones
+    simular_metapoblacion(_REGIONES[regiones], 0.3, 0.1, 0.05, 365)
+
+
+time_metapoblacion_sir.params = [500, 5000]
+
+
+def time_generar_red_libre_escala():
+    # Sin la caché de generar_red
+    libre_escala(10 ** 5, 10, np.random.default_rng(0))
+
+
+_RED = generar_red('libre-escala', 10 ** 5, 10)
+
+
+def time_red_sir(metodo):
+    # SIR en una red libre de escala de 10**5 nodos
+    if metodo == 'eventos':
+        simular_eventos(_RED, 0.05, 0.1, 150)
+    else:
+        simular_sincrono(_RED, 0.05, 0.1, 150)
+
+
+time_red_sir.params = ['eventos', 'sincrono']
+
+
+_AGENTES = {n: crear_simulacion(n, n // 100, semilla=0) for n in (10 ** 4, 10 ** 5)}
+
+
+def time_paso_agentes(agentes):
+    # Diez pasos del SIR de agentes con el 1 % infectado, siempre desde el
+    # mismo estado (copia de los arreglos)
+    simulacion = dict(_AGENTES[agentes], rng=np.random.default_rng(0),
+                      historial={c: [] for c in 'SIR'})
+    for clave in ('x', 'y', 'angulo', 'estado', 'reloj'):
+        simulacion[clave] = simulacion[clave].copy()
+    avanzar(simulacion, 10)
+
+
+time_paso_agentes.params = [10 ** 4, 10 ** 5]
+
+
+_DIFUSION = dict(D=1.0, beta=0.5, gamma=0.1, r=0.5)
+
+
+def time_paso_difusion(metodo):
+    # Diez pasos del SIR con difusión en una malla de 512 x 512
+    dominio = difusion.crear_dominio(512, 200.0, 'sir')
+    difusion.avanzar(dominio, 10, 0.5, _DIFUSION, metodo)
+
+
+time_paso_difusion.params = ['fft', 'estencil']
+
+
+_EDICIONES = itertools.count()
+
+
+def time_calendario_intervencion(edicion):
+    # SIR de diez años con β cambiando cada 90 días (41 tramos). 'completo'
+    # los integra todos; 'tardia' cambia el último punto a un valor nuevo
+    # en cada llamada, con los tramos anteriores ya en la caché
+    if edicion == 'completo':
+        obtener_cache().limpiar('intervenciones')
+    puntos = [(float(t), 0.3 if (t // 90) % 2 else 0.15) for t in range(0, 3650, 90)]
+    puntos[-1] = (puntos[-1][0], 0.2 + 1e-6 * next(_EDICIONES))
+    simular_calendario('sir', (1e6 - 10, 10, 0), (0.1, 1e6), {'tipo': 'escalon', 'puntos': puntos}, 3650)
+
+
+time_calendario_intervencion.params = ['completo', 'tardia']
+
+
+def time_control_optimo(medidas):
+    # Barrido adelante-atrás de 365 días para las 9 escalas de costo, sin
+    # la caché de soluciones
+    obtener_cache().limpiar('control')
+    optimizar_control(0.3, 0.1, 1e-4, 365, controles=tuple(medidas.split('+')))
+
+
+time_control_optimo.params = ['vacunacion', 'vacunacion+distanciamiento']
+
+
+def time_sensibilidad_sobol(base):
+    # Índices de Sobol del SIR a un año: base·5 epidemias integradas en un
+    # solo lote, en un proceso y sin la caché de resultados
+    obtener_cache().limpiar('sensibilidad')
+    analizar_sensibilidad('sir', {'beta': (0.15, 0.6), 'gamma': (0.05, 0.2), 'i0': (1e-5, 1e-3)}, 365,
+                          'sobol', base, procesos=1)
+
+
+time_sensibilidad_sobol.params = [256, 2048]
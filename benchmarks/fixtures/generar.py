@@ -0,0 +1,130 @@
+import os
+from datetime import date, timedelta
+
+import numpy as np
+
+# ==========================================
+# FIXTURES DE LAS APIS EXTERNAS
+# ==========================================
+#
+# Respuestas con la misma forma que disease.sh, Open-Meteo y Data360, con
+# valores deterministas, grabadas en el formato de utils/api.py. Sirven
+# para medir el procesamiento de cada dashboard sin red:
+#     python -m benchmarks.fixtures.generar
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+
+INICIO_COVID = date(2020, 1, 22)
+FIN_COVID = date(2023, 3, 9)
+
+
+def covid_pais(pais='Peru'):
+    return {
+        'updated': 1678406400000, 'country': pais, 'cases': 4487553, 'todayCases': 312,
+        'deaths': 219539, 'todayDeaths': 4, 'recovered': 4245613, 'active': 22401,
+        'population': 33684208, 'tests': 38000000,
+    }
+
+
+def covid_historico(pais='Peru', dias='all'):
+    rng = np.random.default_rng(0)
+    total = (FIN_COVID - INICIO_COVID).days + 1
+    n = total if dias == 'all' else int(dias)
+    # Acumulados crecientes con olas sucesivas
+    t = np.arange(total)
+    nuevos = sum(a * np.exp(-0.5 * ((t - c) / s) ** 2)
+                 for a, c, s in ((4000, 150, 40), (9000, 420, 50), (25000, 720, 30)))
+    nuevos = np.maximum(nuevos * rng.uniform(0.8, 1.2, total), 0)
+    casos = np.cumsum(nuevos).astype(int)
+    muertes = (np.cumsum(nuevos * 0.05)).astype(int)
+    fechas = [INICIO_COVID + timedelta(days=int(i)) for i in t]
+    clave = [f"{d.month}/{d.day}/{d.strftime('%y')}" for d in fechas]
+    return {
+        'country': pais, 'province': ['mainland'],
+        'timeline': {
+            'cases': dict(zip(clave[-n:], casos[-n:].tolist())),
+            'deaths': dict(zip(clave[-n:], muertes[-n:].tolist())),
+            'recovered': {c: 0 for c in clave[-n:]},
+        }
+    }
+
+
+def clima(lat=-12.0464, lon=-77.0428):
+    rng = np.random.default_rng(1)
+    horas = np.arange(7 * 24)
+    dias = [(date(2024, 6, 1) + timedelta(days=i)).isoformat() for i in range(7)]
+    return {
+        'latitude': lat, 'longitude': lon, 'timezone': 'America/Lima',
+        'hourly': {
+            'time': [f"{dias[h // 24]}T{h % 24:02d}:00" for h in horas],
+            'temperature_2m': np.round(18 + 4 * np.sin(2 * np.pi * horas / 24) + rng.normal(0, 0.5, horas.size), 1).tolist(),
+            'relative_humidity_2m': np.round(80 + 10 * np.cos(2 * np.pi * horas / 24)).astype(int).tolist(),
+            'precipitation': np.round(np.maximum(rng.normal(0, 0.2, horas.size), 0), 1).tolist(),
+            'wind_speed_10m': np.round(10 + 3 * rng.random(horas.size), 1).tolist(),
+        },
+        'daily': {
+            'time': dias,
+            'temperature_2m_max': np.round(22 + rng.normal(0, 1, 7), 1).tolist(),
+            'temperature_2m_min': np.round(15 + rng.normal(0, 1, 7), 1).tolist(),
+            'precipitation_sum': np.round(np.maximum(rng.normal(0.5, 1, 7), 0), 1).tolist(),
+            'wind_speed_10m_max': np.round(18 + rng.normal(0, 2, 7), 1).tolist(),
+        }
+    }
+
+
+def malaria(paises=('ARG', 'BRA', 'KHM', 'COL', 'CHN', 'ECU', 'SLV', 'GHA', 'IND', 'DOM')):
+    rng = np.random.default_rng(2)
+    valores = []
+    # Además de los países del selector, el resto del índice
+    otros = [f"X{i:02d}" for i in range(130)]
+    for pais in list(paises) + otros:
+        base = rng.uniform(1, 140)
+        for anio in range(2007, 2018):
+            ranking = float(np.clip(base + rng.normal(0, 4) - 0.8 * (anio - 2007), 1, 148))
+            for unidad, valor in (('RANK', round(ranking)), ('SCORE', round(7 - ranking / 25, 2))):
+                valores.append({
+                    'DATABASE_ID': 'WEF_GCIHH', 'INDICATOR': 'WEF_GCIHH_MALARIAPC',
+                    'REF_AREA': pais, 'TIME_PERIOD': str(anio),
+                    'UNIT_MEASURE': unidad, 'OBS_VALUE': str(valor),
+                })
+    return {'count': len(valores), 'value': valores}
+
+
+def descargar(url, params, timeout):
+    """
+    Sustituye a la red al grabar: devuelve la respuesta sintética de `url`.
+    """
+    if 'covid-19/countries' in url:
+        return covid_pais(url.rsplit('/', 1)[-1])
+    if 'covid-19/historical' in url:
+        return covid_historico(url.rsplit('/', 1)[-1], params['lastdays'])
+    if 'open-meteo' in url:
+        return clima(params['latitude'], params['longitude'])
+    if 'data360' in url:
+        return malaria()
+    raise KeyError(url)
+
+
+def generar():
+    import dash
+    from utils import api
+
+    dash.Dash(__name__, use_pages=True, pages_folder='')
+    from pages import pagina8, pagina9, ppagina10
+
+    anterior = api.configurar(modo='grabar', carpeta=CARPETA, descargar=descargar)
+    try:
+        api.limpiar_cache()
+        pagina8.obtener_datos_pais('Peru')
+        for dias in (90, 'all'):
+            pagina8.obtener_historico_pais('Peru', dias)
+        pagina9.obtener_datos_clima('lima')
+        ppagina10.obtener_datos_malaria_api('GHA')
+    finally:
+        api.configurar(**anterior)
+        api.limpiar_cache()
+
+
+if __name__ == '__main__':
+    generar()
+    print(f"Fixtures en {CARPETA}")
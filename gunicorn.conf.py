@@ -0,0 +1,32 @@
+import multiprocessing
+import os
+
+# ==========================================
+# CONFIGURACIÓN DE GUNICORN
+# ==========================================
+#
+#     gunicorn wsgi:server
+#
+# Todos los valores se pueden cambiar con variables de entorno.
+
+bind = os.environ.get('BIND', '0.0.0.0:8050')
+
+# Un worker por núcleo: las simulaciones son CPU y el GIL impide que los
+# hilos de un mismo proceso las ejecuten en paralelo
+workers = int(os.environ.get('WORKERS', multiprocessing.cpu_count()))
+
+# Hilos por worker para las peticiones que esperan red (APIs externas)
+threads = int(os.environ.get('THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Los ajustes de R_t y los ensambles grandes pueden tardar
+timeout = int(os.environ.get('TIMEOUT', 120))
+
+# Reciclar workers de vez en cuando acota la memoria; como scipy y numba
+# se importan con la primera simulación, un worker nuevo arranca en cerca
+# de un segundo
+max_requests = int(os.environ.get('MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+
+# Los workers comparten las cachés de APIs y estimaciones vía SQLite
+os.environ.setdefault('CACHE_BACKEND', 'sqlite')
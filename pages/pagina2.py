@@ -2,9 +2,11 @@ import dash
 from dash import html, dcc
 import numpy as np
 import plotly.graph_objects as go
+from utils.figuras_estaticas import figura_estatica, obtener_figura
 
 dash.register_page(__name__, path='/logistico', name='Logístico')
 
+@figura_estatica('logistico')
 def crear_grafico_logistico():
     P0 = 100      
     r = 0.1       
@@ -87,14 +89,14 @@ def crear_grafico_logistico():
     
     return fig
 
-fig_logistico = crear_grafico_logistico()
-
-layout = html.Div(children=[  
-    html.Div(children=[
-        # Contenedor izquierdo  
-        html.Div(children=[  
-            html.H2("Crecimiento Logístico de la Población", className="title"),  
-            dcc.Markdown(r"""
+def layout(**kwargs):
+    # La figura se construye (o se lee del artefacto) una sola vez por proceso
+    return html.Div(children=[  
+        html.Div(children=[
+            # Contenedor izquierdo  
+            html.Div(children=[  
+                html.H2("Crecimiento Logístico de la Población", className="title"),  
+                dcc.Markdown(r"""
 El crecimiento exponencial no es una situación muy sostenible, ya que depende de cantidades infinitas de recursos (las cuales no suelen existir en el mundo real).
 El crecimiento exponencial puede ocurrir durante un tiempo, si hay pocos individuos y muchos recursos, pero cuando el número de individuos es lo suficientemente grande, los recursos empiezan a agotarse, lo que desacelera la tasa de crecimiento. Finalmente, el tamaño de la población se nivelará, o se estabilizará, lo que produce una gráfica con forma de $S$. El tamaño de la población en el que el crecimiento poblacional se nivela representa el tamaño poblacional máximo que puede soportar un medio ambiente en particular y se conoce como capacidad de carga o 
 $K$
@@ -111,19 +113,19 @@ En este ejemplo:
 - **$P_0 = 100$**
 - **$r = 0.1$**
 - **$K = 1000$**
-            """, className="content", mathjax=True),
-        ], className="left-container"),
+                """, className="content", mathjax=True),
+            ], className="left-container"),
         
-        html.Div(children=[
-            html.H2("Grafica", className="title"),
-            html.Div([
-                dcc.Graph(
-                    id='grafico-logistico',
-                    figure=fig_logistico,
-                    config={'displayModeBar': False},
-                    style={'height': '450px', 'width': '100%'}
-                )
-            ], className="graph-container"),
-        ], className="right-container")
-    ], className="main-container")
-])
\ No newline at end of file
+            html.Div(children=[
+                html.H2("Grafica", className="title"),
+                html.Div([
+                    dcc.Graph(
+                        id='grafico-logistico',
+                        figure=obtener_figura('logistico'),
+                        config={'displayModeBar': False},
+                        style={'height': '450px', 'width': '100%'}
+                    )
+                ], className="graph-container"),
+            ], className="right-container")
+        ], className="main-container")
+    ])
\ No newline at end of file
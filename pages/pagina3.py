@@ -3,6 +3,7 @@ from dash import html, dcc, Input, Output, State, callback
 import plotly.graph_objects as go
 import numpy as np
 from utils.funciones import generar_graf_pob_exp
+from utils.compactar import figuras_compactas
 
 dash.register_page(__name__, path='/exponencial-interactivo', name='Exponencial Interactivo')
 
@@ -54,6 +55,7 @@ html.H2("Crecimiento Exponencial de la Población", className="title"),
     State('input-t', 'value'),
     prevent_initial_call=False
 )
+@figuras_compactas
 def actualizar_grafica(n_clicks, P0, r, t_max):
     fig = generar_graf_pob_exp(P0, r, t_max)
     return fig
\ No newline at end of file
@@ -4,6 +4,7 @@ import numpy as np
 import plotly.graph_objects as go
 
 from utils.funciones import generar_grafico_logistico
+from utils.compactar import figuras_compactas
 
 dash.register_page(__name__, path='/logistico-interactivo', name='Logístico Interactivo')
 
@@ -65,6 +66,7 @@ layout = html.Div(children=[
      State('input-t-max-logistico', 'value')],
     prevent_initial_call=False
 )
+@figuras_compactas
 def actualizar_grafica_logistica(n_clicks, P0, r, K, t_max):
     fig = generar_grafico_logistico(P0, r, K, t_max)
     return fig
\ No newline at end of file
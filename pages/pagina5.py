@@ -1,11 +1,19 @@
 import dash
-from dash import html, dcc, Input, Output, State, callback
+from dash import html, dcc, Input, Output, State, ALL, Patch, callback, clientside_callback, no_update
 import numpy as np
 import plotly.graph_objects as go
-import math
+
+from utils.campo import (evaluar_campo, malla_vista, traza_flechas, analizar_campo, trazas_analisis,
+                         CAPAS, traza_capa, parametros_de)
+from utils.compactar import compactar_figura, figuras_compactas
+from utils.segundo_plano import callback_largo, controles_progreso
 
 dash.register_page(__name__, path='/campo-vectorial', name='Campo Vectorial')
 
+# Puntos por eje de la malla sobre la que se buscan nulclinas y equilibrios
+# y se calculan las capas; las flechas usan un subconjunto de esa misma malla
+RESOLUCION_ANALISIS = 201
+
 # Layout de la aplicación
 layout = html.Div(children=[  
     html.Div(children=[
@@ -39,7 +47,33 @@ layout = html.Div(children=[
                     dcc.Input(id="input-n", type="number", value=15, min=5, max=50, className="input-field")
                 ], className="input-group"),
                 
-                html.Button("Generar Campo Vectorial", id="btn-generar", className="btn-generar")
+                # Un deslizador por cada parámetro libre de las ecuaciones
+                html.Div(id="parametros-campo"),
+                
+                html.Div([
+                    dcc.Checklist(
+                        id="opciones-campo",
+                        options=[{'label': ' Nulclinas y equilibrios', 'value': 'analisis'}],
+                        value=['analisis'],
+                        className="input-field"
+                    )
+                ], className="input-group"),
+                
+                html.Div([
+                    html.Label("Capa de fondo:", className="input-label"),
+                    dcc.RadioItems(
+                        id="capa-campo",
+                        options=[{'label': ' Ninguna', 'value': 'ninguna'}] + [
+                            {'label': f" {nombre.split(' ')[0]}", 'value': capa}
+                            for capa, (nombre, _, _) in CAPAS.items()
+                        ],
+                        value='ninguna',
+                        className="input-field"
+                    )
+                ], className="input-group"),
+                
+                html.Button("Generar Campo Vectorial", id="btn-generar", className="btn-generar"),
+                controles_progreso("campo")
             ], className="controls-container"),
             
             # Información del campo vectorial
@@ -52,7 +86,8 @@ layout = html.Div(children=[
                     html.Li("dx/dt = X, dy/dt = Y"),
                     html.Li("dx/dt = -Y, dy/dt = X"),
                     html.Li("dx/dt = X + Y, dy/dt = np.cos(Y)"),
-                    html.Li("dx/dt = np.sin(Y), dy/dt = np.cos(X)")
+                    html.Li("dx/dt = np.sin(Y), dy/dt = np.cos(X)"),
+                    html.Li("dx/dt = a*X - Y, dy/dt = X + b*Y (parámetros a y b)")
                 ], className="examples-list")
             ], className="examples-container")
             
@@ -66,61 +101,100 @@ layout = html.Div(children=[
                     id='grafico-campo-vectorial',
                     config={'displayModeBar': True},
                     style={'height': '700px', 'width': '100%'}
-                )
+                ),
+                # Rango visible tras el zoom y campo dibujado (para re-evaluarlo)
+                dcc.Store(id="campo-vista"),
+                dcc.Store(id="campo-config")
             ], className="graph-container"),
         ], className="right-container")
     ], className="main-container")
 ])
 
 # Función para generar el campo vectorial
-def generar_campo_vectorial(fx_str, fy_str, xmax, ymax, n):
-    # Crear la malla
-    x = np.linspace(-xmax, xmax, n)
-    y = np.linspace(-ymax, ymax, n)
+def generar_campo_vectorial(fx_str, fy_str, xmax, ymax, n, refinamiento=1, parametros=None):
+    # Crear la malla (con `refinamiento` puntos por cada celda del mallado:
+    # la malla de n x n queda como la submalla [::refinamiento, ::refinamiento])
+    puntos = (n - 1) * refinamiento + 1
+    x = np.linspace(-xmax, xmax, puntos)
+    y = np.linspace(-ymax, ymax, puntos)
     X, Y = np.meshgrid(x, y)
     
-    # Evaluar las funciones dx/dt y dy/dt
-    try:
-        # Preparar el contexto para eval
-        context = {
-            'np': np,
-            'math': math,
-            'X': X,
-            'Y': Y,
-            'sin': np.sin,
-            'cos': np.cos,
-            'exp': np.exp,
-            'log': np.log,
-            'sqrt': np.sqrt
-        }
-        
-        # Evaluar U (dx/dt) y V (dy/dt)
-        U = eval(fx_str, context)
-        V = eval(fy_str, context)
-        
-        # Calcular magnitud
-        magnitude = np.sqrt(U**2 + V**2)
-        
-        return X, Y, U, V, magnitude
+    # Evaluar U (dx/dt) y V (dy/dt) con las expresiones compiladas; con
+    # parámetros, lo que no depende de ellos queda en caché para esta malla
+    U, V = evaluar_campo(fx_str, fy_str, X, Y, parametros, ('malla', xmax, ymax, puntos))
+    
+    # Calcular magnitud
+    magnitude = np.sqrt(U**2 + V**2)
     
-    except Exception as e:
-        print(f"Error al evaluar las funciones: {e}")
-        # Retornar campo cero en caso de error
-        return X, Y, np.zeros_like(X), np.zeros_like(Y), np.zeros_like(X)
+    return X, Y, U, V, magnitude
+
+
+def leer_parametros(config, valores, ids):
+    """
+    {nombre: valor} de los deslizadores que son parámetros de las
+    expresiones dibujadas.
+    """
+    if not config or not ids:
+        return {}
+    nombres = parametros_de(config['fx'], config['fy'])
+    return {
+        id_['nombre']: float(valor)
+        for id_, valor in zip(ids, valores)
+        if id_['nombre'] in nombres and valor is not None
+    }
+
+
+def informacion_campo(config, parametros, magnitude, valores_capa=None, equilibrios=None):
+    """
+    Contenido del panel de información.
+    """
+    fx, fy, xmax, ymax, n = config['fx'], config['fy'], config['xmax'], config['ymax'], config['n']
+    info_content = [
+        html.H4("Información del Campo Vectorial"),
+        html.P(f"Ecuaciones: dx/dt = {fx}, dy/dt = {fy}"),
+        html.P(f"Magnitud: min = {np.min(magnitude):.2f}, max = {np.max(magnitude):.2f}"),
+        html.P(f"Rango X: [-{xmax}, {xmax}], Rango Y: [-{ymax}, {ymax}]"),
+        html.P(f"Mallado: {n} x {n} puntos")
+    ]
+    if parametros:
+        info_content.append(html.P(
+            "Parámetros: " + ", ".join(f"{nombre} = {valor:g}" for nombre, valor in parametros.items())
+        ))
+    if valores_capa is not None:
+        info_content.append(html.P(
+            f"{CAPAS[config['capa']][0]}: min = {np.nanmin(valores_capa):.2f}, max = {np.nanmax(valores_capa):.2f}"
+        ))
+    if equilibrios is not None:
+        info_content.append(html.H4(f"Equilibrios en la región: {len(equilibrios)}"))
+        info_content.append(html.Ul([
+            html.Li(f"({e['x']:.4g}, {e['y']:.4g}): {e['clase']}") for e in equilibrios
+        ]))
+    return info_content
+
 
 # SOLUCIÓN: Un solo callback que maneje tanto la inicialización como las actualizaciones
-@callback(
+# (en segundo plano: con mallas grandes evaluar el campo puede tomar tiempo)
+@callback_largo(
     [Output('grafico-campo-vectorial', 'figure'),
-     Output('info-campo', 'children')],
+     Output('info-campo', 'children'),
+     Output('campo-config', 'data')],
     Input('btn-generar', 'n_clicks'),
     [State('input-fx', 'value'),
      State('input-fy', 'value'),
      State('input-xmax', 'value'),
      State('input-ymax', 'value'),
-     State('input-n', 'value')],
-    prevent_initial_call=False  # Permitir llamada inicial
+     State('input-n', 'value'),
+     State('opciones-campo', 'value'),
+     State('capa-campo', 'value'),
+     State({'type': 'parametro-campo', 'nombre': ALL}, 'value'),
+     State({'type': 'parametro-campo', 'nombre': ALL}, 'id')],
+    prevent_initial_call=False,  # Permitir llamada inicial
+    prefijo="campo",
+    boton="btn-generar"
 )
-def actualizar_campo_vectorial(n_clicks, fx, fy, xmax, ymax, n):
+@figuras_compactas
+def actualizar_campo_vectorial(set_progreso, n_clicks, fx, fy, xmax, ymax, n, opciones=None, capa=None,
+                               valores=None, ids=None):
     # Si es la primera carga (n_clicks es None), usar valores por defecto
     if n_clicks is None:
         fx = "np.sin(Y)"
@@ -132,48 +206,30 @@ def actualizar_campo_vectorial(n_clicks, fx, fy, xmax, ymax, n):
     if n is None or n < 5:
         n = 15
     
-    X, Y, U, V, magnitude = generar_campo_vectorial(fx, fy, xmax, ymax, n)
+    # Con análisis o capa de fondo se evalúa una sola malla fina y las
+    # flechas toman uno de cada `refinamiento` puntos
+    analisis = 'analisis' in (opciones or [])
+    capa = capa if capa in CAPAS else None
+    refinamiento = -(-(RESOLUCION_ANALISIS - 1) // (n - 1)) if analisis or capa else 1
+    # Índice de la traza de flechas (la que se redibuja al hacer zoom o al
+    # mover un parámetro); las del análisis van detrás
+    config = {'fx': fx, 'fy': fy, 'xmax': xmax, 'ymax': ymax, 'n': n, 'refinamiento': refinamiento,
+              'capa': capa, 'analisis': analisis, 'flechas': 1 if capa else 0}
+    parametros = leer_parametros(config, valores, ids)
+    X, Y, U, V, magnitude = generar_campo_vectorial(fx, fy, xmax, ymax, n, refinamiento, parametros)
     
-    # Crear la figura para campo vectorial 2D
-    fig = go.Figure()
+    # Crear la figura para campo vectorial 2D: todas las flechas en una
+    # sola traza, normalizadas por la magnitud máxima (la capa de fondo va
+    # antes para quedar debajo de las flechas)
+    trazas = [traza_capa(capa, X, Y, U, V)] if capa else []
+    trazas.append(flechas_iniciales(config, X, Y, U, V))
+    fig = go.Figure(trazas)
     
-    # Normalizar vectores para mejor visualización
-    max_magnitude = np.max(magnitude)
-    if max_magnitude > 0:
-        U_norm = U / max_magnitude
-        V_norm = V / max_magnitude
-    else:
-        U_norm = U
-        V_norm = V
-    
-    # Crear flechas para el campo vectorial
-    arrow_scale = 0.8 * min(xmax, ymax) / n  # Escala automática
-    
-    for i in range(X.shape[0]):
-        for j in range(X.shape[1]):
-            if magnitude[i, j] > 0:  # Solo dibujar flechas donde hay magnitud
-                x_start = X[i, j]
-                y_start = Y[i, j]
-                x_end = x_start + U_norm[i, j] * arrow_scale
-                y_end = y_start + V_norm[i, j] * arrow_scale
-                
-                # Añadir flecha
-                fig.add_trace(go.Scatter(
-                    x=[x_start, x_end],
-                    y=[y_start, y_end],
-                    mode='lines+markers',
-                    line=dict(
-                        color='blue',
-                        width=2
-                    ),
-                    marker=dict(
-                        symbol='arrow',
-                        size=10,
-                        angleref='previous',
-                        color='red'
-                    ),
-                    showlegend=False
-                ))
+    equilibrios = None
+    if analisis:
+        resultado = analizar_campo(fx, fy, X, Y, U, V, parametros)
+        equilibrios = resultado['equilibrios']
+        fig.add_traces(trazas_analisis(resultado))
     
     # Configurar el layout
     fig.update_layout(
@@ -184,19 +240,194 @@ def actualizar_campo_vectorial(n_clicks, fx, fy, xmax, ymax, n):
         yaxis=dict(range=[-ymax, ymax], scaleanchor="x", scaleratio=1),
         margin=dict(l=0, r=0, t=50, b=0),
         height=650,
-        showlegend=False
+        showlegend=analisis,
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="right", x=1),
+        # Conserva el zoom mientras se re-evalúa la vista
+        uirevision=n_clicks or 0
     )
     
     # Crear información del campo
-    magnitud_min = np.min(magnitude)
-    magnitud_max = np.max(magnitude)
-    
-    info_content = [
-        html.H4("Información del Campo Vectorial"),
-        html.P(f"Ecuaciones: dx/dt = {fx}, dy/dt = {fy}"),
-        html.P(f"Magnitud: min = {magnitud_min:.2f}, max = {magnitud_max:.2f}"),
-        html.P(f"Rango X: [-{xmax}, {xmax}], Rango Y: [-{ymax}, {ymax}]"),
-        html.P(f"Mallado: {n} x {n} puntos")
+    valores_capa = fig.data[0].z if capa else None
+    info_content = informacion_campo(config, parametros, magnitude, valores_capa, equilibrios)
+    return fig, info_content, config
+
+
+def flechas_iniciales(config, X, Y, U, V):
+    # Flechas de la malla inicial a partir de la malla evaluada (fina si
+    # hay análisis o capa de fondo)
+    r = config['refinamiento']
+    arrow_scale = 0.8 * min(config['xmax'], config['ymax']) / config['n']  # Escala automática
+    return traza_flechas(X[::r, ::r], Y[::r, ::r], U[::r, ::r], V[::r, ::r], arrow_scale)
+
+
+# ==========================================
+# PARÁMETROS: DESLIZADORES Y RE-EVALUACIÓN
+# ==========================================
+
+@callback(
+    Output('parametros-campo', 'children'),
+    [Input('input-fx', 'value'),
+     Input('input-fy', 'value')],
+    [State({'type': 'parametro-campo', 'nombre': ALL}, 'value'),
+     State({'type': 'parametro-campo', 'nombre': ALL}, 'id')]
+)
+def crear_parametros(fx, fy, valores, ids):
+    """
+    Un deslizador por cada parámetro libre de las expresiones; los que ya
+    existían conservan su valor.
+    """
+    anteriores = {id_['nombre']: valor for id_, valor in zip(ids or [], valores or [])}
+    nombres = parametros_de(fx, fy)
+    if nombres == [id_['nombre'] for id_ in ids or []]:
+        return no_update
+    return [
+        html.Div([
+            html.Label(f"Parámetro {nombre} =", className="input-label"),
+            dcc.Slider(
+                id={'type': 'parametro-campo', 'nombre': nombre},
+                min=-5, max=5, step=0.1,
+                value=anteriores.get(nombre, 1),
+                marks={-5: '-5', 0: '0', 5: '5'},
+                tooltip={'placement': 'bottom', 'always_visible': True}
+            )
+        ], className="input-group")
+        for nombre in nombres
     ]
-    
-    return fig, info_content
\ No newline at end of file
+
+
+@callback(
+    Output('grafico-campo-vectorial', 'figure', allow_duplicate=True),
+    Input({'type': 'parametro-campo', 'nombre': ALL}, 'drag_value'),
+    [State({'type': 'parametro-campo', 'nombre': ALL}, 'id'),
+     State('campo-vista', 'data'),
+     State('campo-config', 'data')],
+    prevent_initial_call=True
+)
+def mover_parametros(valores, ids, vista, config):
+    """
+    Mientras se arrastra un deslizador: redibuja solo las flechas (y la
+    capa de fondo) con los subtérminos de la malla ya en caché.
+    """
+    parametros = leer_parametros(config, valores, ids)
+    if not parametros:
+        return no_update
+    parche = Patch()
+    if config['capa'] or not config.get('zoom'):
+        X, Y, U, V, _ = generar_campo_vectorial(config['fx'], config['fy'], config['xmax'], config['ymax'],
+                                                config['n'], config['refinamiento'], parametros)
+    if config['capa']:
+        parche['data'][0] = compactar_figura(go.Figure(traza_capa(config['capa'], X, Y, U, V)))['data'][0]
+    if config.get('zoom') and vista:
+        traza = flechas_vista(config, vista, parametros)
+    else:
+        traza = flechas_iniciales(config, X, Y, U, V)
+    parche['data'][config['flechas']] = compactar_figura(go.Figure(traza))['data'][0]
+    return parche
+
+
+@callback(
+    [Output('grafico-campo-vectorial', 'figure', allow_duplicate=True),
+     Output('info-campo', 'children', allow_duplicate=True)],
+    Input({'type': 'parametro-campo', 'nombre': ALL}, 'value'),
+    [State({'type': 'parametro-campo', 'nombre': ALL}, 'id'),
+     State('campo-config', 'data')],
+    prevent_initial_call=True
+)
+def soltar_parametros(valores, ids, config):
+    """
+    Al soltar un deslizador: nulclinas, equilibrios e información del campo
+    con los nuevos parámetros.
+    """
+    parametros = leer_parametros(config, valores, ids)
+    if not parametros:
+        return no_update, no_update
+    fx, fy = config['fx'], config['fy']
+    X, Y, U, V, magnitude = generar_campo_vectorial(fx, fy, config['xmax'], config['ymax'], config['n'],
+                                                    config['refinamiento'], parametros)
+    valores_capa = traza_capa(config['capa'], X, Y, U, V).z if config['capa'] else None
+    if not config['analisis']:
+        return no_update, informacion_campo(config, parametros, magnitude, valores_capa)
+
+    resultado = analizar_campo(fx, fy, X, Y, U, V, parametros)
+    parche = Patch()
+    # Siempre el mismo número de trazas de análisis, detrás de las flechas
+    for indice, traza in enumerate(compactar_figura(go.Figure(trazas_analisis(resultado)))['data']):
+        parche['data'][config['flechas'] + 1 + indice] = traza
+    return parche, informacion_campo(config, parametros, magnitude, valores_capa, resultado['equilibrios'])
+
+
+# ==========================================
+# ZOOM: RE-EVALUACIÓN DE LA VISTA
+# ==========================================
+
+# El navegador informa los rangos visibles tras cada zoom o desplazamiento
+clientside_callback(
+    """
+    function(relayout, vista) {
+        var contenedor = document.getElementById('grafico-campo-vectorial');
+        var grafica = contenedor && contenedor.querySelector('.js-plotly-plot');
+        if (!grafica || !grafica._fullLayout) {
+            return window.dash_clientside.no_update;
+        }
+        var nueva = {x: grafica._fullLayout.xaxis.range.slice(), y: grafica._fullLayout.yaxis.range.slice()};
+        if (JSON.stringify(nueva) === JSON.stringify(vista)) {
+            return window.dash_clientside.no_update;
+        }
+        return nueva;
+    }
+    """,
+    Output('campo-vista', 'data'),
+    Input('grafico-campo-vectorial', 'relayoutData'),
+    State('campo-vista', 'data'),
+    prevent_initial_call=True
+)
+
+
+def es_vista_inicial(vista, config):
+    # Con scaleanchor Plotly ensancha el eje y para mantener la proporción:
+    # basta que el eje x sea el inicial y el y contenga el inicial
+    x0, x1 = sorted(vista['x'])
+    y0, y1 = sorted(vista['y'])
+    tolerancia = 1e-6 * config['xmax']
+    return (abs(x0 + config['xmax']) <= tolerancia and abs(x1 - config['xmax']) <= tolerancia
+            and y0 <= -config['ymax'] + tolerancia and y1 >= config['ymax'] - tolerancia)
+
+
+def flechas_vista(config, vista, parametros=None):
+    # Flechas de la vista ampliada a partir de teselas, con la misma
+    # proporción flecha/separación que la malla inicial
+    X, Y, U, V, paso = malla_vista(config['fx'], config['fy'], vista['x'], vista['y'], config['n'], parametros)
+    return traza_flechas(X, Y, U, V, 0.4 * paso)
+
+
+@callback(
+    [Output('grafico-campo-vectorial', 'figure', allow_duplicate=True),
+     Output('campo-config', 'data', allow_duplicate=True)],
+    Input('campo-vista', 'data'),
+    [State('campo-config', 'data'),
+     State({'type': 'parametro-campo', 'nombre': ALL}, 'value'),
+     State({'type': 'parametro-campo', 'nombre': ALL}, 'id')],
+    prevent_initial_call=True
+)
+def detallar_campo_vectorial(vista, config, valores=None, ids=None):
+    """
+    Vuelve a dibujar las flechas para la vista actual con la misma densidad
+    en pantalla, a partir de teselas del campo (ver utils/campo.py).
+    """
+    if not vista or not config:
+        return no_update, no_update
+    parametros = leer_parametros(config, valores, ids)
+    if es_vista_inicial(vista, config):
+        # La malla inicial ya está dibujada salvo que se vuelva de un zoom
+        if not config.get('zoom'):
+            return no_update, no_update
+        X, Y, U, V, _ = generar_campo_vectorial(config['fx'], config['fy'], config['xmax'], config['ymax'],
+                                                config['n'], config['refinamiento'], parametros)
+        traza = flechas_iniciales(config, X, Y, U, V)
+        zoom = False
+    else:
+        traza = flechas_vista(config, vista, parametros)
+        zoom = True
+    parche = Patch()
+    parche['data'][config.get('flechas', 0)] = compactar_figura(go.Figure(traza))['data'][0]
+    return parche, {**config, 'zoom': zoom}
@@ -1,8 +1,14 @@
 import dash
-from dash import html, dcc, Input, Output, State, callback
+from dash import html, dcc, Input, Output, State, callback, no_update, set_props
 import numpy as np
 import plotly.graph_objects as go
 
+from utils.estocastico import MAXIMO_DIAS, simular_ensamble, resumir_ensamble, limitar_ensamble
+from utils.funciones import generar_grafico_ensamble
+from utils.segundo_plano import callback_largo, controles_progreso
+from utils.compactar import figuras_compactas
+from utils.submuestreo import series_reducidas, controles_resolucion
+
 dash.register_page(__name__, path='/modelo-sir', name='Modelo SIR')
 
 # Layout de la aplicación
@@ -38,7 +44,27 @@ layout = html.Div(children=[
                     dcc.Input(id="input-tiempo", type="number", value=100, min=10, className="input-field")
                 ], className="input-group"),
                 
-                html.Button("Simular Epidemia", id="btn-simular", className="btn-generar")
+                html.Div([
+                    html.Label("Modo de simulación:"),
+                    dcc.RadioItems(
+                        id="modo-sir",
+                        options=[
+                            {'label': ' Determinista', 'value': 'determinista'},
+                            {'label': ' Estocástico', 'value': 'estocastico'},
+                        ],
+                        value='determinista',
+                        className="input-field"
+                    )
+                ], className="input-group"),
+                
+                html.Div([
+                    html.Label("Realizaciones (modo estocástico):"),
+                    dcc.Input(id="realizaciones-sir", type="number", value=1000, min=10, max=20000, className="input-field")
+                ], className="input-group"),
+                
+                html.Button("Simular Epidemia", id="btn-simular", className="btn-generar"),
+                controles_progreso("ensamble-sir"),
+                dcc.Store(id="solicitud-ensamble-sir")
             ], className="controls-container"),
             
             # Información de la epidemia
@@ -56,7 +82,15 @@ layout = html.Div(children=[
                 html.P("Ecuaciones diferenciales:"),
                 html.P("dS/dt = -β * S * I / N"),
                 html.P("dI/dt = β * S * I / N - γ * I"),
-                html.P("dR/dt = γ * I")
+                html.P("dR/dt = γ * I"),
+                # Misma epidemia con cada persona simulada por separado
+                html.A("Ver el SIR con agentes que se mueven →", href="/sir-agentes"),
+                html.Br(),
+                # β(t) variable en lugar de constante
+                html.A("Ver el SIR con intervenciones en el tiempo →", href="/intervenciones"),
+                html.Br(),
+                # Qué parámetro pesa más en el pico y la tasa de ataque
+                html.A("Ver la sensibilidad del SIR a sus parámetros →", href="/sensibilidad")
             ], className="info-container")
             
         ], className="left-container"),
@@ -69,7 +103,8 @@ layout = html.Div(children=[
                     id='grafico-sir',
                     config={'displayModeBar': True},
                     style={'height': '600px', 'width': '100%'}
-                )
+                ),
+                controles_resolucion('grafico-sir')
             ], className="graph-container")
         ], className="right-container")
     ], className="main-container")
@@ -108,10 +143,14 @@ def simular_sir_euler(N, beta, gamma, I0, t_max):
      State('input-beta', 'value'),
      State('input-gamma', 'value'),
      State('input-infectados', 'value'),
-     State('input-tiempo', 'value')],
+     State('input-tiempo', 'value'),
+     State('modo-sir', 'value'),
+     State('realizaciones-sir', 'value')],
     prevent_initial_call=False
 )
-def actualizar_simulacion_sir(n_clicks, N, beta, gamma, I0, t_max):
+@figuras_compactas
+@series_reducidas('grafico-sir')
+def actualizar_simulacion_sir(n_clicks, N, beta, gamma, I0, t_max, modo='determinista', realizaciones=1000):
     # Valores por defecto si es la primera carga
     if n_clicks is None:
         N = 1000
@@ -123,6 +162,18 @@ def actualizar_simulacion_sir(n_clicks, N, beta, gamma, I0, t_max):
     # Validar entradas
     if I0 >= N:
         I0 = N - 1
+    t_max = int(min(max(t_max or 100, 10), MAXIMO_DIAS))
+    
+    if modo == 'estocastico':
+        t_max, realizaciones, error = limitar_ensamble(t_max, realizaciones or 1000)
+        if error is not None:
+            return no_update, html.P(f"Error: {error}")
+        # El ensamble corre en segundo plano (ver ejecutar_ensamble_sir)
+        set_props("solicitud-ensamble-sir", {'data': {
+            'N': N, 'beta': beta, 'gamma': gamma, 'I0': I0, 't_max': t_max,
+            'realizaciones': realizaciones
+        }})
+        return no_update, html.P("Simulando ensamble estocástico...")
     
     # Simular modelo SIR
     t, S, I, R = simular_sir_euler(N, beta, gamma, I0, t_max)
@@ -186,4 +237,52 @@ def actualizar_simulacion_sir(n_clicks, N, beta, gamma, I0, t_max):
         html.P("🔴 R₀ > 1: Epidemia creciente" if R0 > 1 else "🟢 R₀ ≤ 1: Epidemia controlada")
     ]
     
+    return fig_sir, info_content
+
+
+@callback_largo(
+    [Output('grafico-sir', 'figure', allow_duplicate=True),
+     Output('info-epidemia', 'children', allow_duplicate=True)],
+    Input('solicitud-ensamble-sir', 'data'),
+    prevent_initial_call=True,
+    prefijo="ensamble-sir",
+    boton="btn-simular"
+)
+@figuras_compactas
+@series_reducidas('grafico-sir')
+def ejecutar_ensamble_sir(set_progreso, solicitud):
+    return simulacion_sir_estocastica(**solicitud, progreso=set_progreso)
+
+
+def simulacion_sir_estocastica(N, beta, gamma, I0, t_max, realizaciones, progreso=None):
+    """
+    Ensamble de realizaciones estocásticas del mismo modelo SIR:
+    mediana, bandas de cuantiles y probabilidad de extinción temprana.
+    """
+    ensamble = simular_ensamble(N - I0, I0, 0, beta, gamma, t_max, N=N,
+                                realizaciones=int(realizaciones), progreso=progreso)
+    resumen = resumir_ensamble(ensamble)
+    
+    R0 = beta / gamma if gamma > 0 else float('inf')
+    prob_teorica = min(1.0, (1 / R0) ** I0) if R0 > 0 else 1.0
+    
+    fig_sir = generar_grafico_ensamble(resumen, [
+        ('S', 'Susceptibles (S)', 'blue'),
+        ('I', 'Infectados (I)', 'red'),
+        ('R', 'Recuperados (R)', 'green'),
+    ])
+    fig_sir.update_layout(title=f"Modelo SIR estocástico ({resumen['realizaciones']} realizaciones)")
+    
+    info_content = [
+        html.H4("Métricas del Ensamble Estocástico:"),
+        html.P(f"Método: {'Gillespie (exacto)' if resumen['metodo'] == 'gillespie' else 'Tau-leaping'}"),
+        html.P(f"Tasa básica de reproducción (R₀): {R0:.2f}"),
+        html.P(f"Probabilidad de extinción temprana: {resumen['prob_extincion']*100:.1f}% "
+               f"(teórica (1/R₀)^I₀ = {prob_teorica*100:.1f}%)"),
+        html.P(f"Pico de infección (mediana): {np.median(resumen['picos']):.0f} personas "
+               f"(P5-P95: {np.percentile(resumen['picos'], 5):.0f} - {np.percentile(resumen['picos'], 95):.0f})"),
+        html.P(f"Día del pico (mediana): {np.median(resumen['dias_pico']):.0f}"),
+        html.P(f"Total recuperados (mediana): {resumen['R'][50][-1]:.0f} personas")
+    ]
+    
     return fig_sir, info_content
\ No newline at end of file
@@ -1,8 +1,14 @@
 import dash
-from dash import html, dcc, Input, Output, State, callback
+from dash import html, dcc, Input, Output, State, callback, no_update, set_props
 import numpy as np
 import plotly.graph_objects as go
 
+from utils.estocastico import MAXIMO_DIAS, simular_ensamble, resumir_ensamble, limitar_ensamble
+from utils.funciones import generar_grafico_ensamble
+from utils.segundo_plano import callback_largo, controles_progreso
+from utils.compactar import figuras_compactas
+from utils.submuestreo import series_reducidas, controles_resolucion
+
 dash.register_page(__name__, path='/modelo-seir', name='Modelo SEIR', suppress_callback_exceptions=True)
 
 layout = html.Div(children=[  
@@ -47,10 +53,42 @@ layout = html.Div(children=[
                     dcc.Input(id="input-tiempo", type="number", value=150, min=10, className="input-field")
                 ], className="input-group"),
                 
-                html.Button("Simular Epidemia", id="btn-simular", className="btn-generar")
+                html.Div([
+                    html.Label("Modo de simulación:"),
+                    dcc.RadioItems(
+                        id="modo-seir",
+                        options=[
+                            {'label': ' Determinista', 'value': 'determinista'},
+                            {'label': ' Estocástico', 'value': 'estocastico'},
+                        ],
+                        value='determinista',
+                        className="input-field"
+                    )
+                ], className="input-group"),
+                
+                html.Div([
+                    html.Label("Realizaciones (modo estocástico):"),
+                    dcc.Input(id="realizaciones-seir", type="number", value=1000, min=10, max=20000, className="input-field")
+                ], className="input-group"),
+                
+                html.Button("Simular Epidemia", id="btn-simular", className="btn-generar"),
+                controles_progreso("ensamble-seir"),
+                dcc.Store(id="solicitud-ensamble-seir")
             ], className="controls-container"),
             
             html.Div(id="info-epidemia-seir", className="info-container"),
+
+            # β(t) variable en lugar de constante
+            html.Div(
+                html.A("Ver el SEIR con intervenciones en el tiempo →", href="/intervenciones"),
+                className="content"
+            ),
+
+            # Qué parámetro pesa más en el pico y la tasa de ataque
+            html.Div(
+                html.A("Ver la sensibilidad del SEIR a sus parámetros →", href="/sensibilidad"),
+                className="content"
+            ),
             
         ], className="left-container"),
         
@@ -61,7 +99,8 @@ layout = html.Div(children=[
                     id='grafico-seir',
                     config={'displayModeBar': True},
                     style={'height': '600px', 'width': '100%'}
-                )
+                ),
+                controles_resolucion('grafico-seir')
             ], className="graph-container")
         ], className="right-container")
     ], className="main-container")
@@ -103,10 +142,14 @@ def simular_seir_euler(N, beta, sigma, gamma, E0, I0, t_max):
      Input('input-gamma', 'value'),
      Input('input-expuestos', 'value'),
      Input('input-infectados', 'value'),
-     Input('input-tiempo', 'value')],
+     Input('input-tiempo', 'value'),
+     Input('modo-seir', 'value'),
+     State('realizaciones-seir', 'value')],
     prevent_initial_call=False
 )
-def actualizar_simulacion_seir(n_clicks, N, beta, sigma, gamma, E0, I0, t_max):
+@figuras_compactas
+@series_reducidas('grafico-seir')
+def actualizar_simulacion_seir(n_clicks, N, beta, sigma, gamma, E0, I0, t_max, modo='determinista', realizaciones=1000):
     ctx = dash.callback_context
     trigger_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else ''
     
@@ -128,12 +171,24 @@ def actualizar_simulacion_seir(n_clicks, N, beta, sigma, gamma, E0, I0, t_max):
     if E0 is None or E0 < 0: E0 = 1
     if I0 is None or I0 < 0: I0 = 0
     if t_max is None or t_max < 10: t_max = 150
+    t_max = int(min(t_max, MAXIMO_DIAS))
     
     if E0 + I0 >= N:
         E0 = min(E0, N - 1)
         I0 = 0
     
     try:
+        if modo == 'estocastico':
+            t_max, realizaciones, error = limitar_ensamble(t_max, realizaciones or 1000)
+            if error is not None:
+                return no_update, html.P(f"Error: {error}")
+            # El ensamble corre en segundo plano (ver ejecutar_ensamble_seir)
+            set_props("solicitud-ensamble-seir", {'data': {
+                'N': N, 'beta': beta, 'sigma': sigma, 'gamma': gamma, 'E0': E0, 'I0': I0,
+                't_max': t_max, 'realizaciones': realizaciones
+            }})
+            return no_update, html.P("Simulando ensamble estocástico...")
+        
         t, S, E, I, R = simular_seir_euler(N, beta, sigma, gamma, E0, I0, t_max)
         
         R0 = beta / gamma if gamma > 0 else float('inf')
@@ -234,4 +289,53 @@ def actualizar_simulacion_seir(n_clicks, N, beta, sigma, gamma, E0, I0, t_max):
             html.P("Por favor, revisa los parámetros ingresados.")
         ]
         
-        return error_fig, error_content
\ No newline at end of file
+        return error_fig, error_content
+
+
+@callback_largo(
+    [Output('grafico-seir', 'figure', allow_duplicate=True),
+     Output('info-epidemia-seir', 'children', allow_duplicate=True)],
+    Input('solicitud-ensamble-seir', 'data'),
+    prevent_initial_call=True,
+    prefijo="ensamble-seir",
+    boton="btn-simular"
+)
+@figuras_compactas
+@series_reducidas('grafico-seir')
+def ejecutar_ensamble_seir(set_progreso, solicitud):
+    return simulacion_seir_estocastica(**solicitud, progreso=set_progreso)
+
+
+def simulacion_seir_estocastica(N, beta, sigma, gamma, E0, I0, t_max, realizaciones, progreso=None):
+    """
+    Ensamble estocástico del modelo SEIR con bandas de cuantiles y
+    probabilidad de extinción temprana.
+    """
+    ensamble = simular_ensamble(
+        N - E0 - I0, I0, 0, beta, gamma, t_max, N=N, sigma=sigma, E0=E0,
+        realizaciones=int(realizaciones), progreso=progreso
+    )
+    resumen = resumir_ensamble(ensamble)
+    
+    R0 = beta / gamma if gamma > 0 else float('inf')
+    
+    fig_seir = generar_grafico_ensamble(resumen, [
+        ('S', 'Susceptibles (S)', 'blue'),
+        ('E', 'Expuestos (E)', 'orange'),
+        ('I', 'Infectados (I)', 'red'),
+        ('R', 'Recuperados (R)', 'green'),
+    ])
+    fig_seir.update_layout(title=f"Modelo SEIR estocástico ({resumen['realizaciones']} realizaciones)")
+    
+    info_content = [
+        html.H4("Métricas del Ensamble Estocástico:"),
+        html.P(f"Método: {'Gillespie (exacto)' if resumen['metodo'] == 'gillespie' else 'Tau-leaping'}"),
+        html.P(f"Tasa básica de reproducción (R₀): {R0:.2f}"),
+        html.P(f"Probabilidad de extinción temprana: {resumen['prob_extincion']*100:.1f}%"),
+        html.P(f"Pico de infección (mediana): {np.median(resumen['picos']):.0f} personas "
+               f"(P5-P95: {np.percentile(resumen['picos'], 5):.0f} - {np.percentile(resumen['picos'], 95):.0f})"),
+        html.P(f"Día del pico (mediana): {np.median(resumen['dias_pico']):.0f}"),
+        html.P(f"Total recuperados (mediana): {resumen['R'][50][-1]:.0f} personas")
+    ]
+    
+    return fig_seir, info_content
\ No newline at end of file
@@ -3,7 +3,14 @@ from dash import html, dcc, callback, Input, Output, State
 import plotly.graph_objects as go
 import requests
 from datetime import datetime
-import pandas as pd
+
+from utils.api import obtener_json
+from utils.compactar import figuras_compactas
+from utils.submuestreo import series_reducidas, controles_resolucion
+from utils.segundo_plano import callback_largo, controles_progreso
+
+# Días de cada ventana de ajuste para estimar R_t
+VENTANA_RT = 21
 
 dash.register_page(__name__, path='/covid', name='COVID-19', suppress_callback_exceptions=True)
 
@@ -49,6 +56,21 @@ layout = html.Div([
             )
         ], className="input-group"),
 
+        html.Div([
+            html.Label("Modelo para estimar R_t:"),
+            dcc.Dropdown(
+                id="dropdown-modelo-rt",
+                options=[
+                    {'label': 'SIR', 'value': 'sir'},
+                    {'label': 'SEIR', 'value': 'seir'},
+                ],
+                value='sir',
+                clearable=False,
+                className="input-field",
+                style={'width': '100%'}
+            )
+        ], className="input-group"),
+
         html.Button("Actualizar Datos", id="btn-actualizar-covid", className="btn-generar"),
         
         html.Div(id="info-actualizado-covid", style={
@@ -120,6 +142,12 @@ layout = html.Div([
         ], style={'display': 'flex', 'marginBottom': '20px', 'flexWrap': 'wrap'}),
         
         dcc.Graph(id="grafica-covid", style={"height": "380px", "width": "100%"}),
+        controles_resolucion("grafica-covid"),
+
+        html.H2("Número Reproductivo Efectivo R_t", className="title"),
+        dcc.Graph(id="grafica-rt-covid", style={"height": "320px", "width": "100%"}),
+        controles_resolucion("grafica-rt-covid"),
+        controles_progreso("rt-covid"),
     ], className="content right")
 ], className="page-container")
 
@@ -135,9 +163,7 @@ def obtener_datos_pais(pais):
     """
     try:
         url = f"https://disease.sh/v3/covid-19/countries/{pais}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()  # Lanza error si status code no es 200
-        return response.json()
+        return obtener_json(url, timeout=10, ttl=60)
     except requests.exceptions.RequestException as e:
         print(f"❌ Error obteniendo datos del país: {e}")
         return None
@@ -153,9 +179,7 @@ def obtener_historico_pais(pais, dias):
     try:
         url = f"https://disease.sh/v3/covid-19/historical/{pais}"
         params = {'lastdays': dias}
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        return obtener_json(url, params=params, timeout=10)
     except requests.exceptions.RequestException as e:
         print(f"❌ Error obteniendo histórico: {e}")
         return None
@@ -187,6 +211,8 @@ def formatear_numero(numero):
      State("dropdown-dias-covid", "value")],
     prevent_initial_call=False
 )
+@figuras_compactas
+@series_reducidas("grafica-covid")
 def actualizar_dashboard_covid(n_clicks, pais, dias):
     """
     Callback que actualiza todo el dashboard cuando cambian los inputs
@@ -327,4 +353,116 @@ def actualizar_dashboard_covid(n_clicks, pais, dias):
         total_muertes_texto,
         total_recuperados_texto,
         mensaje
-    )
\ No newline at end of file
+    )
+
+
+# ==========================================
+# CALLBACK DE ESTIMACIÓN DE R_t
+# ==========================================
+
+def figura_aviso_rt(texto):
+    """
+    Figura vacía con un aviso en el centro, para cuando no se puede estimar R_t
+    """
+    fig = go.Figure()
+    fig.add_annotation(
+        text=texto,
+        xref="paper", yref="paper",
+        x=0.5, y=0.5, showarrow=False,
+        font=dict(size=16, color="red")
+    )
+    fig.update_layout(paper_bgcolor="lightcyan", plot_bgcolor="white")
+    return fig
+
+
+# (en segundo plano: la primera estimación de un país ajusta decenas de
+# ventanas y toma varios segundos)
+@callback_largo(
+    Output("grafica-rt-covid", "figure"),
+    [Input("btn-actualizar-covid", "n_clicks"),
+     Input("dropdown-modelo-rt", "value")],
+    [State("dropdown-pais", "value"),
+     State("dropdown-dias-covid", "value")],
+    prevent_initial_call=False,
+    prefijo="rt-covid"
+)
+@figuras_compactas
+@series_reducidas("grafica-rt-covid")
+def actualizar_rt_covid(set_progreso, n_clicks, modelo, pais, dias):
+    """
+    Ajusta el modelo SIR/SEIR sobre ventanas móviles del histórico y
+    grafica β(t) y R_t. Las ventanas ya ajustadas se reutilizan.
+    """
+    # Se piden días extra para que la primera fecha mostrada tenga ventana completa
+    dias_api = dias if dias == 'all' else dias + VENTANA_RT
+    datos_actuales = obtener_datos_pais(pais)
+    historico = obtener_historico_pais(pais, dias_api)
+    
+    if not datos_actuales or not historico or not datos_actuales.get('population'):
+        return figura_aviso_rt("⚠️ No hay datos suficientes para estimar R_t.")
+    
+    casos_historicos = historico.get('timeline', {}).get('cases', {})
+    fechas_dt = [datetime.strptime(fecha, '%m/%d/%y') for fecha in casos_historicos]
+    valores_casos = list(casos_historicos.values())
+    
+    # scipy (integrate, optimize) se importa con la primera estimación
+    from utils.estimacion import estimar_rt
+
+    desde = 0 if dias == 'all' else max(len(fechas_dt) - dias, 0)
+    try:
+        estimacion = estimar_rt(
+            pais, fechas_dt, valores_casos, datos_actuales['population'],
+            modelo=modelo, ventana=VENTANA_RT, desde=desde, progreso=set_progreso
+        )
+    except Exception as e:
+        print(f"❌ Error estimando R_t: {e}")
+        return figura_aviso_rt(f"⚠️ No se pudo estimar R_t: {e}")
+    if not estimacion['fechas']:
+        return figura_aviso_rt("⚠️ No hay datos suficientes para estimar R_t.")
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=estimacion['fechas'],
+        y=estimacion['rt'],
+        mode='lines+markers',
+        name='R_t',
+        line=dict(color='#6a1b9a', width=2.5),
+        hovertemplate='<b>Fecha:</b> %{x|%d/%m/%Y}<br><b>R_t:</b> %{y:.2f}<extra></extra>'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=estimacion['fechas'],
+        y=estimacion['beta'],
+        mode='lines',
+        name='β(t)',
+        line=dict(color='#f57c00', width=2, dash='dot'),
+        yaxis='y2',
+        hovertemplate='<b>β:</b> %{y:.3f}<extra></extra>'
+    ))
+    
+    fig.add_hline(y=1, line=dict(color='black', width=1, dash='dash'))
+    
+    fig.update_layout(
+        title=dict(
+            text=f"<b>R_t estimado ({modelo.upper()}, ventanas de {VENTANA_RT} días)</b>",
+            x=0.5,
+            font=dict(size=14, color="darkblue")
+        ),
+        xaxis_title="Fecha",
+        yaxis_title="R_t",
+        yaxis2=dict(
+            title="β",
+            overlaying='y',
+            side='right',
+            showgrid=False
+        ),
+        paper_bgcolor="lightcyan",
+        plot_bgcolor="white",
+        font=dict(family="Outfit", size=12),
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+        margin=dict(l=60, r=60, t=60, b=40)
+    )
+    
+    return fig
\ No newline at end of file
@@ -4,6 +4,9 @@ import plotly.graph_objects as go
 import requests
 from datetime import datetime
 
+from utils.api import obtener_json
+from utils.compactar import figuras_compactas
+
 dash.register_page(__name__, path='/clima', name='Dashboard Clima', suppress_callback_exceptions=True)
 
 layout = html.Div([
@@ -154,11 +157,8 @@ def obtener_datos_clima(ciudad_key):
             'forecast_days': 7
         }
         
-        # Hacer la petición GET
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()  # Lanza error si hay problema
-        
-        return response.json()
+        # Hacer la petición GET (compartida y con caché, ver utils/api.py)
+        return obtener_json(url, params=params, timeout=10)
         
     except requests.exceptions.RequestException as e:
         print(f"❌ Error al obtener datos del clima: {e}")
@@ -180,6 +180,7 @@ def obtener_datos_clima(ciudad_key):
      State("radio-tipo-grafica", "value")],
     prevent_initial_call=False
 )
+@figuras_compactas
 def actualizar_dashboard_clima(n_clicks, ciudad_key, tipo_grafica):
     """
     Actualiza el dashboard con datos del clima en tiempo real
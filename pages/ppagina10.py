@@ -1,9 +1,12 @@
 import dash
-from dash import html, dcc, callback, Input, Output
+from dash import html, dcc, Input, Output
 import plotly.graph_objects as go
 import numpy as np
-from scipy.optimize import curve_fit
-import requests
+
+from utils.api import obtener_json
+from utils.ajuste import comparar_modelos, MODELOS_CANDIDATOS
+from utils.segundo_plano import callback_largo, controles_progreso
+from utils.compactar import figuras_compactas
 
 dash.register_page(__name__, path='/malaria-ajuste', name='SEIR-SEI')
 
@@ -14,8 +17,7 @@ def obtener_datos_malaria_api(pais_codigo):
     url = "https://data360api.worldbank.org/data360/data?DATABASE_ID=WEF_GCIHH&INDICATOR=WEF_GCIHH_MALARIAPC&skip=0"
     
     try:
-        response = requests.get(url, timeout=10)
-        data = response.json()
+        data = obtener_json(url, timeout=10)
         
         años = []
         rankings = []
@@ -53,24 +55,6 @@ def transformar_ranking_a_casos(rankings):
     casos_estimados = 100000 / (rankings + 10)
     return casos_estimados * 80
 
-def modelo_ranking_malaria(t, a, b, c, d):
-    """
-    Modelo para ajustar la evolución de rankings/casos de malaria
-    """
-    return a * np.exp(-b * t) + c * t + d
-
-def ajuste_minimos_cuadrados(x_data, y_data, modelo, parametros_iniciales):
-    try:
-        parametros_optimos, pcov = curve_fit(
-            modelo, x_data, y_data, 
-            p0=parametros_iniciales,
-            maxfev=5000
-        )
-        y_pred = modelo(x_data, *parametros_optimos)
-        return parametros_optimos, y_pred, pcov
-    except Exception as e:
-        raise Exception(f"Error en ajuste: {str(e)}")
-
 paises = [
     {"label": "Argentina", "value": "ARG"},
     {"label": "Brazil", "value": "BRA"},
@@ -93,6 +77,7 @@ layout = html.Div([
         html.P("• Fuente: API Banco Mundial - Rankings de Malaria"),
         html.P("• Período: 2007-2017"),
         html.P("• Método: Mínimos cuadrados no lineales"),
+        html.P("• Selección de modelo: AIC / BIC entre varios candidatos"),
         html.P("• Transformación: Rankings → Casos estimados")
     ], style={
         'backgroundColor': '#f8f9fa', 
@@ -111,6 +96,19 @@ layout = html.Div([
         )
     ], style={'marginBottom': '20px'}),
     
+    html.Div([
+        html.Label("Criterio de selección:", style={'fontWeight': 'bold', 'marginRight': '10px'}),
+        dcc.RadioItems(
+            id='criterio-modelo',
+            options=[
+                {'label': ' AIC', 'value': 'aic'},
+                {'label': ' BIC', 'value': 'bic'},
+            ],
+            value='aic',
+            inline=True
+        )
+    ], style={'marginBottom': '20px'}),
+    
     html.Button("Ejecutar Mínimos Cuadrados con API Real", 
                 id="btn-ajuste", 
                 style={
@@ -122,6 +120,8 @@ layout = html.Div([
                     'cursor': 'pointer'
                 }),
     
+    controles_progreso("ajuste"),
+    
     html.Br(), html.Br(),
     
     dcc.Graph(id="grafica-ajuste"),
@@ -129,13 +129,18 @@ layout = html.Div([
     html.Div(id="resultados-ajuste", style={'marginTop': '30px'})
 ])
 
-@callback(
+# Descarga + ajustes en segundo plano, con progreso por modelo ajustado
+@callback_largo(
     [Output("grafica-ajuste", "figure"),
      Output("resultados-ajuste", "children")],
     [Input("btn-ajuste", "n_clicks"),
-     Input("selector-pais", "value")]
+     Input("selector-pais", "value"),
+     Input("criterio-modelo", "value")],
+    prefijo="ajuste",
+    boton="btn-ajuste"
 )
-def ejecutar_ajuste_api_real(n_clicks, pais_seleccionado):
+@figuras_compactas
+def ejecutar_ajuste_api_real(set_progreso, n_clicks, pais_seleccionado, criterio):
     if n_clicks is None:
         fig = go.Figure()
         fig.update_layout(
@@ -146,7 +151,10 @@ def ejecutar_ajuste_api_real(n_clicks, pais_seleccionado):
         return fig, ""
     
     try:
+        total_pasos = len(MODELOS_CANDIDATOS) + 1
+        set_progreso(0, total_pasos)
         años, rankings = obtener_datos_malaria_api(pais_seleccionado)
+        set_progreso(1, total_pasos)
         
         if años is None or rankings is None:
             return go.Figure(), html.Div([
@@ -160,20 +168,18 @@ def ejecutar_ajuste_api_real(n_clicks, pais_seleccionado):
         t = np.array(años) - min(años)
         y = casos_estimados
         
-        parametros_iniciales = [max(y)-min(y), 0.1, 0.1, min(y)]
-        
-        parametros_optimos, y_pred, covarianza = ajuste_minimos_cuadrados(
-            t, y, modelo_ranking_malaria, parametros_iniciales
+        resultados = comparar_modelos(
+            t, y, criterio=criterio,
+            progreso=lambda hechos, total: set_progreso(hechos + 1, total_pasos)
         )
+        validos = [r for r in resultados if 'error' not in r]
         
-        a_opt, b_opt, c_opt, d_opt = parametros_optimos
+        if not validos:
+            raise Exception("Ningún modelo candidato pudo ajustarse a los datos")
         
-        ss_res = np.sum((y - y_pred) ** 2)
-        ss_tot = np.sum((y - np.mean(y)) ** 2)
-        r_cuadrado = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
+        mejor = validos[0]
         
         t_suave = np.linspace(min(t), max(t), 300)
-        y_suave = modelo_ranking_malaria(t_suave, *parametros_optimos)
         años_suave = t_suave + min(años)
         
         fig = go.Figure()
@@ -187,13 +193,18 @@ def ejecutar_ajuste_api_real(n_clicks, pais_seleccionado):
             customdata=rankings
         ))
         
-        fig.add_trace(go.Scatter(
-            x=años_suave, y=y_suave,
-            mode='lines',
-            name='bestfit',
-            line=dict(color='blue', width=3),
-            hovertemplate='<b>Año:</b> %{x:.1f}<br><b>Modelo:</b> %{y:,.0f} casos<extra></extra>'
-        ))
+        # Los candidatos se dibujan tenues y el ganador resaltado al final
+        for resultado in reversed(validos):
+            es_mejor = resultado is mejor
+            y_suave = MODELOS_CANDIDATOS[resultado['nombre']]['funcion'](t_suave, *resultado['valores'])
+            fig.add_trace(go.Scatter(
+                x=años_suave, y=y_suave,
+                mode='lines',
+                name=f"bestfit: {resultado['nombre']}" if es_mejor else resultado['nombre'],
+                line=dict(color='blue', width=3) if es_mejor else dict(width=1.5, dash='dot'),
+                opacity=1 if es_mejor else 0.6,
+                hovertemplate=f"<b>{resultado['nombre']}:</b> " + '%{y:,.0f} casos<extra></extra>'
+            ))
         
         nombre_pais = next((p["label"] for p in paises if p["value"] == pais_seleccionado), pais_seleccionado)
         
@@ -211,7 +222,7 @@ def ejecutar_ajuste_api_real(n_clicks, pais_seleccionado):
                 dict(
                     x=0.02, y=0.98,
                     xref="paper", yref="paper",
-                    text="• data<br>— bestfit",
+                    text=f"• data<br>— bestfit ({mejor['nombre']}, {criterio.upper()})",
                     showarrow=False,
                     bgcolor="white",
                     bordercolor="black",
@@ -231,21 +242,40 @@ def ejecutar_ajuste_api_real(n_clicks, pais_seleccionado):
             ], style={'backgroundColor': '#e3f2fd', 'padding': '15px', 'borderRadius': '5px'}),
             
             html.Div([
-                html.H5("Parámetros Estimados por Mínimos Cuadrados:"),
-                html.P(f"• a (componente exponencial): {a_opt:.4f}"),
-                html.P(f"• b (tasa de cambio): {b_opt:.4f}"),
-                html.P(f"• c (tendencia lineal): {c_opt:.4f}"),
-                html.P(f"• d (nivel base): {d_opt:.4f}")
+                html.H5(f"Parámetros Estimados por Mínimos Cuadrados ({mejor['nombre']}):"),
+                *[html.P(f"• {nombre}: {valor:.4f}") for nombre, valor in zip(mejor['parametros'], mejor['valores'])]
             ], style={'backgroundColor': '#e8f5e9', 'padding': '15px', 'borderRadius': '5px', 'marginTop': '10px'}),
             
             html.Div([
                 html.H5("Métricas de Ajuste:"),
-                html.P(f"• R² (bondad de ajuste): {r_cuadrado:.4f}"),
-                html.P(f"• Suma de cuadrados de residuos: {ss_res:.2f}"),
+                html.P(f"• R² (bondad de ajuste): {mejor['r_cuadrado']:.4f}"),
+                html.P(f"• Suma de cuadrados de residuos: {mejor['rss']:.2f}"),
                 html.P(f"• Número de puntos: {len(años)}"),
                 html.P("• Método: Mínimos cuadrados no lineales")
             ], style={'backgroundColor': '#fff3e0', 'padding': '15px', 'borderRadius': '5px', 'marginTop': '10px'}),
             
+            html.Div([
+                html.H5(f"Comparación de Modelos (ordenados por {criterio.upper()}):"),
+                html.Table([
+                    html.Thead(html.Tr([html.Th(c) for c in ["Modelo", "k", "R²", "AIC", "BIC", f"Δ{criterio.upper()}"]])),
+                    html.Tbody([
+                        html.Tr([
+                            html.Td(r['nombre']),
+                            html.Td(r['k']),
+                            html.Td(f"{r['r_cuadrado']:.4f}"),
+                            html.Td(f"{r['aic']:.2f}"),
+                            html.Td(f"{r['bic']:.2f}"),
+                            html.Td(f"{r[criterio] - mejor[criterio]:.2f}")
+                        ], style={'fontWeight': 'bold', 'backgroundColor': '#c8e6c9'} if r is mejor else {})
+                        for r in validos
+                    ] + [
+                        html.Tr([html.Td(r['nombre']), html.Td(r['k']), html.Td("No convergió", colSpan=4)],
+                                style={'color': 'gray'})
+                        for r in resultados if 'error' in r
+                    ])
+                ], style={'width': '100%', 'textAlign': 'center'})
+            ], style={'backgroundColor': '#ede7f6', 'padding': '15px', 'borderRadius': '5px', 'marginTop': '10px'}),
+            
             html.Div([
                 html.H5("Interpretación:"),
                 html.P("• Ranking 1 = mejor posición (menos malaria)"),
@@ -1,8 +1,13 @@
 import dash
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc, Input, Output, callback, no_update
 import numpy as np
 import plotly.graph_objects as go
-from scipy.integrate import odeint
+
+from utils.modelos import sir_rhs, sir_jac
+from utils.estocastico import MAXIMO_DIAS, simular_ensamble, resumir_ensamble, limitar_ensamble
+from utils.funciones import generar_grafico_ensamble
+from utils.compactar import figuras_compactas
+from utils.submuestreo import series_reducidas, controles_resolucion
 
 # ==================================================
 # Registro de página
@@ -42,6 +47,20 @@ layout = html.Div([
                 html.Label("Duración de la simulación (días):", className="input-label"),
                 dcc.Input(id="sirTmax", type="number", value=15, className="input-field"),
 
+                html.Label("Modo de simulación:", className="input-label"),
+                dcc.RadioItems(
+                    id="sirModo",
+                    options=[
+                        {'label': ' Determinista', 'value': 'determinista'},
+                        {'label': ' Estocástico', 'value': 'estocastico'},
+                    ],
+                    value='determinista',
+                    inline=True
+                ),
+
+                html.Label("Realizaciones (modo estocástico):", className="input-label"),
+                dcc.Input(id="sirRealizaciones", type="number", value=2000, min=10, max=20000, className="input-field"),
+
                 html.Br(),
                 html.Button("Reiniciar valores", id="btnResetSir6", className="btn-generar"),
 
@@ -50,6 +69,12 @@ layout = html.Div([
                 html.Div(
                     "Se simula la propagación de un rumor con los valores iniciales observados en un grupo de 275 personas.",
                     className="content"
+                ),
+
+                # Misma dinámica cuando cada persona solo habla con sus contactos
+                html.Div(
+                    html.A("Ver el rumor en una red de contactos →", href="/red-de-contactos"),
+                    className="content"
                 )
             ], className="controls-container")
         ], className="left-container"),
@@ -58,7 +83,8 @@ layout = html.Div([
         html.Div([
             html.H2("Evolución del rumor", className="title"),
             html.Div([
-                dcc.Graph(id='graficaSIR6', className="graph-container")
+                dcc.Graph(id='graficaSIR6', className="graph-container"),
+                controles_resolucion('graficaSIR6')
             ]),
             html.Div(id="interpretacionSIR6", className="content", style={
                 "marginTop": "25px",
@@ -84,9 +110,13 @@ layout = html.Div([
     Input('sirS0', 'value'),
     Input('sirI0', 'value'),
     Input('sirR0', 'value'),
-    Input('sirTmax', 'value')
+    Input('sirTmax', 'value'),
+    Input('sirModo', 'value'),
+    Input('sirRealizaciones', 'value')
 )
-def actualizar_sir_modificado(N, b, k, S0, I0, R0, tmax):
+@figuras_compactas
+@series_reducidas('graficaSIR6')
+def actualizar_sir_modificado(N, b, k, S0, I0, R0, tmax, modo='determinista', realizaciones=2000):
 
     N = float(N or 275)
     b = float(b or 0.004)
@@ -94,42 +124,57 @@ def actualizar_sir_modificado(N, b, k, S0, I0, R0, tmax):
     S0 = float(S0 or 266)
     I0 = float(I0 or 1)
     R0 = float(R0 or 8)
-    tmax = int(tmax or 15)
-
-    # Modelo SIR del rumor
-    def sir_rumor(y, t, b, k):
-        S, I, R = y
-        dSdt = -b * S * I
-        dIdt = b * S * I - k * I
-        dRdt = k * I
-        return [dSdt, dIdt, dRdt]
-
-    t = np.linspace(0, tmax, 500)
-    sol = odeint(sir_rumor, (S0, I0, R0), t, args=(b, k))
-    S, I, R = sol.T
-
-    # Pico del rumor
-    pico_idx = np.argmax(I)
-    dia_pico = t[pico_idx]
-    maxI = I[pico_idx]
+    tmax = int(min(tmax or 15, MAXIMO_DIAS))
+    if modo == 'estocastico':
+        tmax, realizaciones, error = limitar_ensamble(tmax, realizaciones or 2000)
+        if error is not None:
+            return no_update, html.Div(f"Error: {error}")
+
+    # scipy.integrate se importa con la primera simulación, no al arrancar
+    from utils.solver import resolver_ode
+
+    # Modelo SIR del rumor (acción de masas: N = 1 en el lado derecho)
+    # Pico del rumor: instante exacto en que dI/dt = 0
+    resultado = resolver_ode(sir_rhs, (S0, I0, R0), tmax, args=(b, k, 1.0), jac=sir_jac)
+    t = resultado['t']
+    S, I, R = resultado['y']
+    dia_pico = resultado['t_pico']
+    maxI = resultado['valor_pico']
 
     # ==================================================
     # GRÁFICA - Manteniendo tus colores pero con estructura mejorada
     # ==================================================
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatter(
-        x=t, y=S, mode='lines', name='Ignorantes (S)',
-        line=dict(color='rgb(69,133,136)', width=3)
-    ))
-    fig.add_trace(go.Scatter(
-        x=t, y=I, mode='lines', name='Divulgadores (I)',
-        line=dict(color='rgb(251,73,52)', width=3)
-    ))
-    fig.add_trace(go.Scatter(
-        x=t, y=R, mode='lines', name='Racionales (R)',
-        line=dict(color='rgb(184,187,38)', width=3)
-    ))
+    if modo == 'estocastico':
+        # Con 275 personas el azar domina: ensamble exacto (Gillespie) con
+        # tasa b·S·I, es decir β = b·N en la forma β·S·I/N
+        resumen = resumir_ensamble(simular_ensamble(
+            S0, I0, R0, b * N, k, tmax, N=N, realizaciones=realizaciones
+        ))
+        fig = generar_grafico_ensamble(resumen, [
+            ('S', 'Ignorantes (S)', 'rgb(69,133,136)'),
+            ('I', 'Divulgadores (I)', 'rgb(251,73,52)'),
+            ('R', 'Racionales (R)', 'rgb(184,187,38)'),
+        ])
+        fig.add_trace(go.Scatter(
+            x=t, y=I, mode='lines', name='Divulgadores (determinista)',
+            line=dict(color='rgb(251,73,52)', width=2, dash='dash')
+        ))
+    else:
+        resumen = None
+        fig = go.Figure()
+
+        fig.add_trace(go.Scatter(
+            x=t, y=S, mode='lines', name='Ignorantes (S)',
+            line=dict(color='rgb(69,133,136)', width=3)
+        ))
+        fig.add_trace(go.Scatter(
+            x=t, y=I, mode='lines', name='Divulgadores (I)',
+            line=dict(color='rgb(251,73,52)', width=3)
+        ))
+        fig.add_trace(go.Scatter(
+            x=t, y=R, mode='lines', name='Racionales (R)',
+            line=dict(color='rgb(184,187,38)', width=3)
+        ))
 
     # Línea del pico
     fig.add_vline(
@@ -182,6 +227,14 @@ def actualizar_sir_modificado(N, b, k, S0, I0, R0, tmax):
         html.Span("Posteriormente, la cantidad de racionales aumenta a medida que el rumor pierde interés.")
     ])
 
+    if resumen is not None:
+        interpretacion.children.append(html.Span(
+            f" En {resumen['realizaciones']} realizaciones estocásticas el pico mediano es de "
+            f"{np.median(resumen['picos']):.0f} divulgadores (P5-P95: {np.percentile(resumen['picos'], 5):.0f}"
+            f" - {np.percentile(resumen['picos'], 95):.0f}) y el rumor se extingue sin propagarse en el "
+            f"{resumen['prob_extincion']*100:.1f}% de los casos."
+        ))
+
     return fig, interpretacion
 
 
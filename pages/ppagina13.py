@@ -1,29 +1,35 @@
 import dash
-from dash import html, dcc, Input, Output, State, callback
+from dash import html, dcc, Input, Output, State, callback, no_update, set_props
 import numpy as np
 import plotly.graph_objects as go
-from scipy.integrate import odeint
 
-dash.register_page(__name__, path='/Proyecto2.3', name='PROYECTO 2.3')
+from utils.modelos import sir_rhs, sir_jac
+from utils.estocastico import simular_ensamble, resumir_ensamble, limitar_ensamble
+from utils.funciones import generar_grafico_ensamble
+from utils.segundo_plano import callback_largo, controles_progreso
+from utils.compactar import figuras_compactas
+from utils.submuestreo import series_reducidas, controles_resolucion
 
-def modelo_sir(y, t, beta, gamma, N):
-    S, I, R = y
-    dSdt = -beta * S * I / N
-    dIdt = beta * S * I / N - gamma * I
-    dRdt = gamma * I
-    return [dSdt, dIdt, dRdt]
+dash.register_page(__name__, path='/Proyecto2.3', name='PROYECTO 2.3')
 
 def generar_grafico_sir(S0, I0, R0, beta, gamma, t_max):
+    # scipy.integrate se importa con la primera simulación, no al arrancar
+    from utils.solver import resolver_ode
+
     N = S0 + I0 + R0
-    t = np.linspace(0, t_max, 1000)
     y0 = [S0, I0, R0]
-    solucion = odeint(modelo_sir, y0, t, args=(beta, gamma, N))
-    S, I, R = solucion.T
+    # Fin de la epidemia: los infectados bajan de una persona
+    solucion = resolver_ode(
+        sir_rhs, y0, t_max, args=(beta, gamma, N), jac=sir_jac,
+        umbrales={'fin': (1, 1.0, -1)}
+    )
+    t = solucion['t']
+    S, I, R = solucion['y']
     
     R0_val = beta / gamma if gamma != 0 else float('inf')
-    idx_pico = np.argmax(I)
-    tiempo_pico = t[idx_pico]
-    valor_pico = I[idx_pico]
+    tiempo_pico = solucion['t_pico']
+    valor_pico = solucion['valor_pico']
+    tiempo_fin = solucion['cruces']['fin'][0] if solucion['cruces']['fin'] else None
     S_final = S[-1]
     R_final = R[-1]
     tasa_ataque_final = (R_final / N) * 100
@@ -45,7 +51,27 @@ def generar_grafico_sir(S0, I0, R0, beta, gamma, t_max):
         legend=dict(orientation="h", yanchor="bottom", y=0.98, xanchor="right", x=1)
     )
     
-    return fig, R0_val, tiempo_pico, valor_pico, S_final, R_final, tasa_ataque_final
+    return fig, R0_val, tiempo_pico, valor_pico, S_final, R_final, tasa_ataque_final, tiempo_fin
+
+def generar_grafico_sir_estocastico(S0, I0, R0, beta, gamma, t_max, realizaciones, progreso=None):
+    N = S0 + I0 + R0
+    ensamble = simular_ensamble(S0, I0, R0, beta, gamma, t_max, N=N, realizaciones=int(realizaciones),
+                                progreso=progreso)
+    resumen = resumir_ensamble(ensamble)
+    
+    fig = generar_grafico_ensamble(resumen, [
+        ('S', 'Susceptibles (S)', 'blue'),
+        ('I', 'Infectados (I)', 'red'),
+        ('R', 'Recuperados (R)', 'green'),
+    ])
+    fig.update_layout(
+        title=f"Modelo SIR estocástico - {resumen['realizaciones']} realizaciones",
+        hovermode='x unified',
+        template='plotly_white',
+        legend=dict(orientation="h", yanchor="bottom", y=0.98, xanchor="right", x=1)
+    )
+    
+    return fig, resumen
 
 layout = html.Div(children=[  
     html.Div(children=[
@@ -99,13 +125,31 @@ layout = html.Div(children=[
                     html.Label("Tiempo máximo (días):", className="sir-input-label"),
                     dcc.Input(id="input-t-max-sir", type="number", value=365, min=10, className="sir-input-field")
                 ], className="sir-input-group"),
+                html.Div([
+                    html.Label("Modo de simulación:", className="sir-input-label"),
+                    dcc.RadioItems(
+                        id="modo-sir-interactivo",
+                        options=[
+                            {'label': ' Determinista', 'value': 'determinista'},
+                            {'label': ' Estocástico', 'value': 'estocastico'},
+                        ],
+                        value='determinista',
+                        inline=True
+                    )
+                ], className="sir-input-group"),
+                html.Div([
+                    html.Label("Realizaciones (estocástico):", className="sir-input-label"),
+                    dcc.Input(id="input-realizaciones-sir", type="number", value=500, min=10, max=20000, className="sir-input-field")
+                ], className="sir-input-group"),
             ], className="controls-container"),
             html.Div([
                 html.Div([
                     html.Div("Número Reproductivo Básico:", className="r0-label"),
                     html.Div(id="r0-value-display", className="r0-value")
                 ], className="r0-display-panel"),
-                html.Button("Generar simulación", id="btn-generar", className="btn-generar", n_clicks=0)
+                html.Button("Generar simulación", id="btn-generar", className="btn-generar", n_clicks=0),
+                controles_progreso("ensamble-sir-interactivo"),
+                dcc.Store(id="solicitud-ensamble-sir-interactivo")
             ], className="controls-footer")
         ], className="left-container"),
         html.Div(children=[
@@ -115,11 +159,14 @@ layout = html.Div(children=[
                     id='grafico-sir-interactivo',
                     config={'displayModeBar': True},
                     style={'height': '500px', 'width': '100%'}
-                )
+                ),
+                controles_resolucion('grafico-sir-interactivo')
             ], className="sir-graph-container"),
             html.Div([
                 html.H3("Información de la Simulación"),
-                html.Div(id="simulation-info", className="sir-info-panel")
+                html.Div(id="simulation-info", className="sir-info-panel"),
+                # La pregunta que sigue a la curva: cómo aplanarla al menor costo
+                html.A("Calcular el calendario óptimo de vacunación y distanciamiento →", href="/control-optimo")
             ])
         ], className="right-container")
     ], className="main-container")
@@ -168,9 +215,13 @@ def actualizar_poblacion_total(N, S0, I0, R0):
      State('input-r0-sir', 'value'),
      State('input-beta-sir', 'value'),
      State('input-gamma-sir', 'value'),
-     State('input-t-max-sir', 'value')]
+     State('input-t-max-sir', 'value'),
+     State('modo-sir-interactivo', 'value'),
+     State('input-realizaciones-sir', 'value')]
 )
-def actualizar_grafica_sir(n_clicks, S0, I0, R0, beta, gamma, t_max):
+@figuras_compactas
+@series_reducidas('grafico-sir-interactivo')
+def actualizar_grafica_sir(n_clicks, S0, I0, R0, beta, gamma, t_max, modo='determinista', realizaciones=500):
     if None in [S0, I0, R0, beta, gamma, t_max]:
         fig = go.Figure()
         fig.update_layout(
@@ -196,7 +247,18 @@ def actualizar_grafica_sir(n_clicks, S0, I0, R0, beta, gamma, t_max):
     N = S0 + I0 + R0
     
     try:
-        fig, R0_val, tiempo_pico, valor_pico, S_final, R_final, tasa_ataque_final = generar_grafico_sir(
+        if modo == 'estocastico':
+            t_max, realizaciones, error = limitar_ensamble(t_max, realizaciones or 500)
+            if error is not None:
+                return no_update, f"Error: {error}"
+            # El ensamble corre en segundo plano (ver ejecutar_ensamble_sir_interactivo)
+            set_props("solicitud-ensamble-sir-interactivo", {'data': {
+                'S0': S0, 'I0': I0, 'R0': R0, 'beta': beta, 'gamma': gamma, 't_max': t_max,
+                'realizaciones': realizaciones
+            }})
+            return no_update, html.P("Simulando ensamble estocástico...")
+        
+        fig, R0_val, tiempo_pico, valor_pico, S_final, R_final, tasa_ataque_final, tiempo_fin = generar_grafico_sir(
             S0, I0, R0, beta, gamma, t_max
         )
         
@@ -217,6 +279,8 @@ def actualizar_grafica_sir(n_clicks, S0, I0, R0, beta, gamma, t_max):
                     html.Hr(),
                     html.P([html.Strong("Pico de infección: "), f"{valor_pico:,.0f} jugadores activos"]),
                     html.P([html.Strong("Día del pico: "), f"día {tiempo_pico:.1f}"]),
+                    html.P([html.Strong("Fin de la epidemia (I < 1): "),
+                            f"día {tiempo_fin:.1f}" if tiempo_fin is not None else "después del horizonte simulado"]),
                     html.Hr(),
                     html.P([html.Strong("Susceptibles finales: "), f"{S_final:,.0f} personas ({S_final/N*100:.1f}%)"]),
                     html.P([html.Strong("Recuperados finales: "), f"{R_final:,.0f} personas ({tasa_ataque_final:.1f}%)"]),
@@ -236,4 +300,48 @@ def actualizar_grafica_sir(n_clicks, S0, I0, R0, beta, gamma, t_max):
             template='plotly_white',
             height=500
         )
-        return fig, f"Error: {str(e)}"
\ No newline at end of file
+        return fig, f"Error: {str(e)}"
+
+
+@callback_largo(
+    [Output('grafico-sir-interactivo', 'figure', allow_duplicate=True),
+     Output('simulation-info', 'children', allow_duplicate=True)],
+    Input('solicitud-ensamble-sir-interactivo', 'data'),
+    prevent_initial_call=True,
+    prefijo="ensamble-sir-interactivo",
+    boton="btn-generar"
+)
+@figuras_compactas
+@series_reducidas('grafico-sir-interactivo')
+def ejecutar_ensamble_sir_interactivo(set_progreso, solicitud):
+    return simulacion_sir_estocastica(**solicitud, progreso=set_progreso)
+
+
+def simulacion_sir_estocastica(S0, I0, R0, beta, gamma, t_max, realizaciones, progreso=None):
+    """
+    Ensamble estocástico con bandas de cuantiles y resumen del brote.
+    """
+    N = S0 + I0 + R0
+    fig, resumen = generar_grafico_sir_estocastico(S0, I0, R0, beta, gamma, t_max, realizaciones, progreso)
+    R0_val = beta / gamma if gamma != 0 else float('inf')
+    info_content = [
+        html.Div([
+            html.H4("Resumen del Ensamble Estocástico", className="info-title"),
+            html.Div([
+                html.P([html.Strong("Población total: "), f"{N:,} personas"]),
+                html.P([html.Strong("Número reproductivo básico: "), f"R₀ = {R0_val:.2f}"]),
+                html.P([html.Strong("Realizaciones: "), f"{resumen['realizaciones']} "
+                        f"({'Gillespie' if resumen['metodo'] == 'gillespie' else 'tau-leaping'})"]),
+                html.P([html.Strong("Probabilidad de extinción temprana: "), f"{resumen['prob_extincion']*100:.1f}%"]),
+                html.Hr(),
+                html.P([html.Strong("Pico de infección (mediana): "), f"{np.median(resumen['picos']):,.0f} jugadores activos"]),
+                html.P([html.Strong("Pico P5-P95: "),
+                        f"{np.percentile(resumen['picos'], 5):,.0f} - {np.percentile(resumen['picos'], 95):,.0f}"]),
+                html.P([html.Strong("Día del pico (mediana): "), f"día {np.median(resumen['dias_pico']):.0f}"]),
+                html.Hr(),
+                html.P([html.Strong("Recuperados finales (mediana): "),
+                        f"{resumen['R'][50][-1]:,.0f} personas ({resumen['R'][50][-1]/N*100:.1f}%)"])
+            ], className="info-details")
+        ], className="simulation-summary")
+    ]
+    return fig, info_content
\ No newline at end of file
@@ -0,0 +1,130 @@
+import dash
+from dash import html, dcc, Input, Output, callback
+import plotly.graph_objects as go
+
+dash.register_page(__name__, path='/diagnostico', name='Diagnóstico')
+
+FASES = {
+    'calculo': ('Cálculo', '#2E86AB'),
+    'figura': ('Figuras', '#F18F01'),
+    'serializacion': ('Serialización', '#C73E1D'),
+}
+
+
+def _ms(segundos):
+    return "-" if segundos is None else f"{1000 * segundos:.1f}"
+
+
+def _kb(n):
+    return "-" if n is None else f"{n / 1024:.1f}"
+
+
+def grafico_fases(filas):
+    """
+    Barras apiladas con el tiempo medio de cada fase por callback.
+    """
+    fig = go.Figure()
+    nombres = [fila['callback'].removeprefix('pages.') for fila in filas]
+    for fase, (etiqueta, color) in FASES.items():
+        fig.add_trace(go.Bar(
+            y=nombres,
+            x=[1000 * (fila[f"{fase}_medio"] or 0) for fila in filas],
+            name=etiqueta,
+            orientation='h',
+            marker_color=color
+        ))
+    fig.update_layout(
+        barmode='stack',
+        title='Tiempo medio por fase (ms)',
+        xaxis_title='ms',
+        template='plotly_white',
+        height=max(300, 40 * len(filas) + 120),
+        margin=dict(l=250),
+        yaxis=dict(autorange='reversed')
+    )
+    return fig
+
+
+def tabla_callbacks(filas):
+    return html.Table([
+        html.Thead(html.Tr([html.Th(c) for c in [
+            "Callback", "Llamadas", "p50 (ms)", "p95 (ms)", "Cálculo (ms)", "Figuras (ms)", "Serialización (ms)", "JSON medio (KB)", "JSON máx. (KB)", "Caché (aciertos/fallos)"
+        ]])),
+        html.Tbody([
+            html.Tr([
+                html.Td(fila['callback'].removeprefix('pages.')),
+                html.Td(fila['llamadas']),
+                html.Td(_ms(fila['p50'])),
+                html.Td(_ms(fila['p95'])),
+                html.Td(_ms(fila['calculo_medio'])),
+                html.Td(_ms(fila['figura_medio'])),
+                html.Td(_ms(fila['serializacion_medio'])),
+                html.Td(_kb(fila['bytes_medio'])),
+                html.Td(_kb(fila['bytes_maximo'])),
+                html.Td(f"{fila['aciertos']}/{fila['fallos']}")
+            ]) for fila in filas
+        ])
+    ], className="sensibilidad-table")
+
+
+def tabla_caches(caches):
+    espacios = sorted({espacio for espacio, _ in caches})
+    aciertos = {espacio: caches.get((espacio, 'acierto'), 0) for espacio in espacios}
+    fallos = {espacio: caches.get((espacio, 'fallo'), 0) for espacio in espacios}
+    return html.Table([
+        html.Thead(html.Tr([html.Th(c) for c in ["Caché", "Aciertos", "Fallos", "Tasa de acierto"]])),
+        html.Tbody([
+            html.Tr([
+                html.Td(espacio),
+                html.Td(aciertos[espacio]),
+                html.Td(fallos[espacio]),
+                html.Td(f"{100 * aciertos[espacio] / max(aciertos[espacio] + fallos[espacio], 1):.0f} %")
+            ]) for espacio in espacios
+        ])
+    ], className="sensibilidad-table")
+
+
+def contenido_diagnostico():
+    # Con METRICAS=0 la instrumentación no se carga hasta abrir esta página
+    from utils.metricas import resumen
+
+    datos = resumen()
+    filas = datos['callbacks']
+    if not filas:
+        return html.P("Aún no se ha ejecutado ningún callback en este proceso.")
+    return html.Div([
+        html.P(f"Proceso {datos['pid']}: {sum(fila['llamadas'] for fila in filas)} llamadas medidas."),
+        dcc.Graph(figure=grafico_fases(filas), config={'displayModeBar': False}),
+        tabla_callbacks(filas),
+        html.H3("Cachés"),
+        tabla_caches(datos['caches']),
+    ])
+
+
+def layout(**kwargs):
+    return html.Div([
+        html.Div([
+            html.Div([
+                html.H1("Diagnóstico"),
+                html.P("Tiempo y tamaño de respuesta de los callbacks del servidor, separados en "
+                       "el cálculo de la página, la construcción de las figuras y la serialización "
+                       "a JSON, junto con los aciertos de las cachés."),
+                html.P("Los datos son del worker que atiende esta página; las mismas métricas "
+                       "están en /metrics en formato Prometheus."),
+                html.Button("Actualizar", id="btn-diagnostico", className="btn-generar"),
+            ], className="left-container"),
+            html.Div([
+                html.H1("Callbacks"),
+                html.Div(contenido_diagnostico(), id="contenido-diagnostico", className="info-container"),
+            ], className="right-container"),
+        ], className="main-container")
+    ])
+
+
+@callback(
+    Output("contenido-diagnostico", "children"),
+    Input("btn-diagnostico", "n_clicks"),
+    prevent_initial_call=True
+)
+def actualizar_diagnostico(n_clicks):
+    return contenido_diagnostico()
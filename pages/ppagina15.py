@@ -0,0 +1,246 @@
+import dash
+from dash import html, dcc, Input, Output, State
+import numpy as np
+import plotly.graph_objects as go
+import requests
+
+from utils.api import obtener_json
+from utils.segundo_plano import callback_largo, controles_progreso
+from utils.compactar import figuras_compactas
+
+dash.register_page(__name__, path='/metapoblacion', name='Metapoblación')
+
+# Misma fuente que el dashboard de COVID-19 (pagina8), con todos los países
+URL_PAISES = "https://disease.sh/v3/covid-19/countries"
+
+# Regiones cuya curva de infectados se dibuja por separado
+REGIONES_DESTACADAS = 5
+
+# Límites de los controles, también en el servidor
+MAXIMO_REGIONES = 20000
+MAXIMO_VECINOS = 50
+MAXIMO_DIAS = 2000
+
+# Por debajo de esta tasa de ataque la región no tuvo brote (sin día del pico)
+ATAQUE_MINIMO = 0.01
+
+
+def obtener_paises():
+    """
+    Lista de países de disease.sh con población, coordenadas y casos
+    activos, o None si la API no responde.
+    """
+    try:
+        return obtener_json(URL_PAISES, timeout=10)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error obteniendo países: {e}")
+        return None
+
+
+layout = html.Div(children=[
+    html.Div(children=[
+        # Contenedor izquierdo - Controles
+        html.Div(children=[
+            html.H1("SIR Metapoblacional"),
+            html.P("Regiones acopladas por la movilidad: una fracción de los residentes de cada "
+                   "región viaja a sus regiones vecinas según un modelo de gravedad."),
+
+            html.Div([
+                html.Div([
+                    html.Label("Regiones:", className="input-label"),
+                    dcc.RadioItems(
+                        id="modo-metapoblacion",
+                        options=[
+                            {'label': ' Sintéticas', 'value': 'sinteticas'},
+                            {'label': ' Países (COVID-19)', 'value': 'paises'},
+                        ],
+                        value='sinteticas',
+                        inline=True
+                    )
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Número de regiones (sintéticas):", className="input-label"),
+                    dcc.Input(id="input-regiones-meta", type="number", value=1000, min=2, max=MAXIMO_REGIONES,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Tasa de infección (β):", className="input-label"),
+                    dcc.Input(id="input-beta-meta", type="number", value=0.3, min=0, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Tasa de recuperación (γ):", className="input-label"),
+                    dcc.Input(id="input-gamma-meta", type="number", value=0.1, min=0, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Movilidad (fracción que viaja):", className="input-label"),
+                    dcc.Input(id="input-movilidad-meta", type="number", value=0.05, min=0, max=1, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Destinos por región (vecinos):", className="input-label"),
+                    dcc.Input(id="input-vecinos-meta", type="number", value=8, min=1, max=MAXIMO_VECINOS,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Días:", className="input-label"),
+                    dcc.Input(id="input-dias-meta", type="number", value=365, min=10, max=MAXIMO_DIAS,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Button("Simular", id="btn-metapoblacion", className="btn-generar"),
+                controles_progreso("metapoblacion")
+            ], className="controls-container"),
+
+            html.Div(id="info-metapoblacion", className="info-container")
+        ], className="left-container"),
+
+        # Contenedor derecho - Gráficos
+        html.Div(children=[
+            html.H1("Propagación entre regiones"),
+            html.Div([
+                dcc.Graph(id='grafico-mapa-meta', style={'height': '500px', 'width': '100%'}),
+                dcc.Graph(id='grafico-curvas-meta', style={'height': '450px', 'width': '100%'})
+            ], className="graph-container"),
+        ], className="right-container")
+    ], className="main-container")
+])
+
+
+def grafico_mapa(regiones, resultado):
+    """
+    Regiones coloreadas por el día del pico de infectados (en gris las que
+    no tuvieron brote) y con tamaño según su población.
+    """
+    N = regiones['poblacion']
+    ataque = resultado['final'][:, 2] / N
+    dia_pico = resultado['dia_pico']
+    tamano = 4 + 16 * np.sqrt(N / N.max())
+    # Datos numéricos por región (viajan como binario); los nombres solo
+    # con países, con miles de regiones sintéticas basta su posición
+    detalle = "Población: %{customdata[0]:,.0f}<br>Ataque: %{customdata[1]:.1f} %"
+    if regiones['geografico']:
+        traza, posicion, detalle = go.Scattergeo, ('lon', 'lat'), f"%{{text}}<br>{detalle}"
+    else:
+        traza, posicion, detalle = go.Scattergl, ('x', 'y'), f"(%{{x:.0f}}, %{{y:.0f}}) km<br>{detalle}"
+
+    fig = go.Figure()
+    for brote in (False, True):
+        k = (ataque >= ATAQUE_MINIMO) == brote
+        marcador = dict(size=tamano[k], color='lightgray', line=dict(width=0))
+        if brote:
+            marcador.update(color=dia_pico[k], colorscale='Plasma',
+                            colorbar=dict(title=dict(text='Día del pico', side='right')))
+        fig.add_trace(traza(
+            mode='markers',
+            marker=marcador,
+            name='Con brote' if brote else 'Sin brote',
+            customdata=np.column_stack([N[k], 100 * ataque[k]]),
+            text=[regiones['nombres'][i] for i in np.flatnonzero(k)] if regiones['geografico'] else None,
+            hovertemplate=detalle + ("<br>Pico: día %{marker.color:.0f}" if brote else "") + "<extra></extra>",
+            **{posicion[0]: regiones['x'][k], posicion[1]: regiones['y'][k]}
+        ))
+
+    if regiones['geografico']:
+        fig.update_geos(projection_type='natural earth', showcountries=True)
+    else:
+        fig.update_layout(xaxis_title='km', yaxis=dict(title='km', scaleanchor='x', scaleratio=1))
+    fig.update_layout(
+        title='Día del pico por región',
+        template='plotly_white',
+        height=500,
+        showlegend=False,
+        margin=dict(l=10, r=10, t=50, b=10)
+    )
+    return fig
+
+
+def grafico_curvas(regiones, resultado, destacadas):
+    """
+    Proporción de infectados en total y en las regiones más pobladas
+    (las `destacadas` de la simulación, en el mismo orden).
+    """
+    N = regiones['poblacion']
+    t = resultado['t']
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=t, y=resultado['I_total'] / N.sum(), mode='lines', name='Total',
+        line=dict(color='black', width=3)
+    ))
+    for k, i in enumerate(destacadas):
+        fig.add_trace(go.Scatter(
+            x=t, y=resultado['I_destacadas'][:, k] / N[i], mode='lines', name=regiones['nombres'][i],
+            line=dict(width=1.5)
+        ))
+    fig.update_layout(
+        title='Proporción de infectados (total y regiones más pobladas)',
+        xaxis_title='Tiempo (días)',
+        yaxis_title='I / N',
+        hovermode='x unified',
+        template='plotly_white',
+        height=450,
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="right", x=1)
+    )
+    return fig
+
+
+@callback_largo(
+    [Output('grafico-mapa-meta', 'figure'),
+     Output('grafico-curvas-meta', 'figure'),
+     Output('info-metapoblacion', 'children')],
+    Input('btn-metapoblacion', 'n_clicks'),
+    [State('modo-metapoblacion', 'value'),
+     State('input-regiones-meta', 'value'),
+     State('input-beta-meta', 'value'),
+     State('input-gamma-meta', 'value'),
+     State('input-movilidad-meta', 'value'),
+     State('input-vecinos-meta', 'value'),
+     State('input-dias-meta', 'value')],
+    prevent_initial_call=False,
+    prefijo="metapoblacion",
+    boton="btn-metapoblacion"
+)
+@figuras_compactas
+def actualizar_metapoblacion(set_progreso, n_clicks, modo, n_regiones, beta, gamma, movilidad, vecinos, dias):
+    if None in [n_regiones, beta, gamma, movilidad, vecinos, dias]:
+        return go.Figure(), go.Figure(), html.P("Error: Todos los campos deben estar completos")
+
+    # scipy (sparse, spatial, integrate) se importa con la primera simulación
+    from utils.metapoblacion import regiones_sinteticas, regiones_paises, simular_metapoblacion
+
+    if modo == 'paises':
+        datos = obtener_paises()
+        if not datos:
+            return go.Figure(), go.Figure(), html.P("⚠️ Error al conectar con la API de países.")
+        regiones = regiones_paises(datos)
+    else:
+        regiones = regiones_sinteticas(int(min(max(n_regiones, 2), MAXIMO_REGIONES)))
+
+    N = regiones['poblacion']
+    destacadas = np.argsort(N)[::-1][:REGIONES_DESTACADAS]
+    resultado = simular_metapoblacion(regiones, beta, gamma, min(max(movilidad, 0), 1),
+                                      int(min(max(dias, 10), MAXIMO_DIAS)),
+                                      vecinos=int(min(max(vecinos, 1), MAXIMO_VECINOS)), destacadas=destacadas,
+                                      progreso=set_progreso)
+
+    I_total = resultado['I_total']
+    R_final = resultado['final'][:, 2]
+    con_brote = int(np.sum(R_final / N >= ATAQUE_MINIMO))
+    info = [
+        html.H4("Resultados"),
+        html.P(f"Regiones: {len(N):,} (población total {N.sum():,.0f})"),
+        html.P(f"Conexiones de movilidad: {resultado['M'].nnz:,} (matriz dispersa)"),
+        html.P(f"R₀ local = β/γ = {beta / gamma:.2f}" if gamma > 0 else "R₀ local no definido"),
+        html.P(f"Pico global: {I_total.max():,.0f} infectados el día {resultado['t'][np.argmax(I_total)]:.0f}"),
+        html.P(f"Regiones con brote (ataque ≥ {100 * ATAQUE_MINIMO:.0f} %): {con_brote:,}"),
+        html.P(f"Tasa de ataque global: {100 * R_final.sum() / N.sum():.1f} %"),
+        html.P(f"Evaluaciones del lado derecho: {resultado['nfev']}")
+    ]
+    return grafico_mapa(regiones, resultado), grafico_curvas(regiones, resultado, destacadas), info
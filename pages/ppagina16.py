@@ -0,0 +1,249 @@
+import time
+
+import dash
+from dash import html, dcc, Input, Output, State
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.redes import TIPOS_RED, MODELOS, generar_red, simular_sincrono, simular_eventos
+from utils.segundo_plano import callback_largo, controles_progreso
+from utils.compactar import figuras_compactas
+
+dash.register_page(__name__, path='/red-de-contactos', name='Red de contactos')
+
+MAXIMO_NODOS = 10 ** 6
+
+layout = html.Div(children=[
+    html.Div(children=[
+        # Contenedor izquierdo - Controles
+        html.Div(children=[
+            html.H1("Epidemias en redes"),
+            html.P("El SIR y el rumor del proyecto 2.1 suponen que todos se mezclan con todos. "
+                   "Aquí cada persona solo contagia (o cuenta el rumor) a sus contactos en la red."),
+
+            html.Div([
+                html.Div([
+                    html.Label("Tipo de red:", className="input-label"),
+                    dcc.Dropdown(
+                        id="tipo-red",
+                        options=[{'label': nombre, 'value': tipo} for tipo, nombre in TIPOS_RED.items()],
+                        value='libre-escala',
+                        clearable=False,
+                        className="input-field"
+                    )
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Nodos:", className="input-label"),
+                    dcc.Input(id="input-nodos-red", type="number", value=100000, min=10, max=MAXIMO_NODOS,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Grado medio:", className="input-label"),
+                    dcc.Input(id="input-grado-red", type="number", value=10, min=2, max=100, className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Recableado (mundo pequeño):", className="input-label"),
+                    dcc.Input(id="input-recableado-red", type="number", value=0.1, min=0, max=1, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Modelo:", className="input-label"),
+                    dcc.RadioItems(
+                        id="modelo-red",
+                        options=[{'label': f" {nombre}", 'value': modelo} for modelo, nombre in MODELOS.items()],
+                        value='sir',
+                        inline=True
+                    )
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Simulación:", className="input-label"),
+                    dcc.RadioItems(
+                        id="metodo-red",
+                        options=[
+                            {'label': ' Por eventos (tiempo continuo, solo SIR)', 'value': 'eventos'},
+                            {'label': ' Síncrona (pasos de un día)', 'value': 'sincrono'},
+                        ],
+                        value='eventos'
+                    )
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Tasa de contagio por contacto (β) [1/día]:", className="input-label"),
+                    dcc.Input(id="input-beta-red", type="number", value=0.05, min=0, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Recuperación / racionalización (γ) [1/día]:", className="input-label"),
+                    dcc.Input(id="input-gamma-red", type="number", value=0.1, min=0, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Infectados iniciales:", className="input-label"),
+                    dcc.Input(id="input-semillas-red", type="number", value=10, min=1, className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Días:", className="input-label"),
+                    dcc.Input(id="input-dias-red", type="number", value=150, min=1, max=2000,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Button("Simular", id="btn-red", className="btn-generar"),
+                controles_progreso("red")
+            ], className="controls-container"),
+
+            html.Div(id="info-red", className="info-container")
+        ], className="left-container"),
+
+        # Contenedor derecho - Gráficos
+        html.Div(children=[
+            html.H1("Propagación en la red"),
+            html.Div([
+                dcc.Graph(id='grafico-red-sir', style={'height': '420px', 'width': '100%'}),
+                dcc.Graph(id='grafico-red-grados', style={'height': '420px', 'width': '100%'}),
+                dcc.Graph(id='grafico-red-distribucion', style={'height': '380px', 'width': '100%'})
+            ], className="graph-container"),
+        ], className="right-container")
+    ], className="main-container")
+])
+
+
+def grafico_curvas_red(resultado, modelo):
+    """
+    Fracción de la red en cada estado.
+    """
+    nombres = (('Ignorantes', 'Divulgadores', 'Racionales') if modelo == 'rumor'
+               else ('Susceptibles', 'Infectados', 'Recuperados'))
+    fig = go.Figure()
+    for compartimento, nombre, color in zip('SIR', nombres, ('blue', 'red', 'green')):
+        fig.add_trace(go.Scatter(x=resultado['t'], y=resultado[compartimento], mode='lines',
+                                 name=f"{nombre} ({compartimento})", line=dict(color=color, width=2)))
+    fig.update_layout(
+        title=f"{MODELOS[modelo]} en una red de {resultado['nodos']:,} nodos",
+        xaxis_title='Tiempo (días)',
+        yaxis_title='Fracción de la red',
+        hovermode='x unified',
+        template='plotly_white',
+        height=420,
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="right", x=1)
+    )
+    return fig
+
+
+def grafico_por_grado(resultado):
+    """
+    Prevalencia (línea continua) y fracción alcanzada (punteada) por clase
+    de grado: los nodos con más contactos se infectan antes y más.
+    """
+    fig = go.Figure()
+    colores = np.linspace(0.1, 0.9, len(resultado['clases']))
+    for c, etiqueta in enumerate(resultado['clases']):
+        if resultado['nodos_clase'][c] == 0:
+            continue
+        color = f"rgba({int(255 * colores[c])}, 60, {int(255 * (1 - colores[c]))}, 1)"
+        grupo = f"grado {etiqueta}"
+        fig.add_trace(go.Scatter(
+            x=resultado['t'], y=resultado['I_clase'][:, c], mode='lines', line=dict(color=color, width=2),
+            name=f"Grado {etiqueta} ({resultado['nodos_clase'][c]:,} nodos)", legendgroup=grupo
+        ))
+        fig.add_trace(go.Scatter(
+            x=resultado['t'], y=resultado['ataque_clase'][:, c], mode='lines',
+            line=dict(color=color, width=1, dash='dot'), name=f"Alcanzados, grado {etiqueta}",
+            legendgroup=grupo, showlegend=False
+        ))
+    fig.update_layout(
+        title='Por clase de grado: infectados (—) y alcanzados acumulados (···)',
+        xaxis_title='Tiempo (días)',
+        yaxis_title='Fracción de la clase',
+        template='plotly_white',
+        height=420
+    )
+    return fig
+
+
+def grafico_distribucion(grados):
+    """
+    Distribución de grados en escala log-log.
+    """
+    conteo = np.bincount(grados)
+    k = np.flatnonzero(conteo)
+    fig = go.Figure(go.Scatter(x=k, y=conteo[k] / len(grados), mode='markers',
+                               marker=dict(color='#2E86AB', size=6), name='P(k)'))
+    fig.update_layout(
+        title='Distribución de grados',
+        xaxis=dict(title='Grado k', type='log'),
+        yaxis=dict(title='P(k)', type='log'),
+        template='plotly_white',
+        height=380
+    )
+    return fig
+
+
+@callback_largo(
+    [Output('grafico-red-sir', 'figure'),
+     Output('grafico-red-grados', 'figure'),
+     Output('grafico-red-distribucion', 'figure'),
+     Output('info-red', 'children')],
+    Input('btn-red', 'n_clicks'),
+    [State('tipo-red', 'value'),
+     State('input-nodos-red', 'value'),
+     State('input-grado-red', 'value'),
+     State('input-recableado-red', 'value'),
+     State('modelo-red', 'value'),
+     State('metodo-red', 'value'),
+     State('input-beta-red', 'value'),
+     State('input-gamma-red', 'value'),
+     State('input-semillas-red', 'value'),
+     State('input-dias-red', 'value')],
+    prevent_initial_call=False,
+    prefijo="red",
+    boton="btn-red"
+)
+@figuras_compactas
+def actualizar_red(set_progreso, n_clicks, tipo, nodos, grado, recableado, modelo, metodo, beta, gamma,
+                   semillas, dias):
+    if None in [tipo, nodos, grado, recableado, beta, gamma, semillas, dias]:
+        vacia = go.Figure()
+        return vacia, vacia, vacia, html.P("Error: Todos los campos deben estar completos")
+
+    nodos = int(min(max(nodos, 10), MAXIMO_NODOS))
+    inicio = time.perf_counter()
+    A = generar_red(tipo, nodos, float(grado), recableado=float(recableado))
+    generacion = time.perf_counter() - inicio
+
+    # El método por eventos es exacto solo para SIR: el rumor va por pasos
+    metodo = metodo if modelo == 'sir' else 'sincrono'
+    inicio = time.perf_counter()
+    if metodo == 'eventos':
+        resultado = simular_eventos(A, beta, gamma, int(dias), semillas)
+    else:
+        resultado = simular_sincrono(A, beta, gamma, int(dias), semillas, modelo, progreso=set_progreso)
+    simulacion = time.perf_counter() - inicio
+
+    grados = resultado['grados']
+    k1, k2 = grados.mean(), (grados.astype(float) ** 2).mean()
+    info = [
+        html.H4("Red"),
+        html.P(f"{TIPOS_RED[tipo]}: {nodos:,} nodos, {A.nnz // 2:,} aristas"),
+        html.P(f"Grado medio {k1:.2f}, máximo {grados.max():,}"),
+        html.P(f"Generada en {generacion:.2f} s, simulada en {simulacion:.2f} s "
+               f"({'por eventos' if metodo == 'eventos' else 'síncrona'})"),
+        html.H4("Propagación"),
+        html.P(f"Pico: {100 * resultado['I'].max():.1f} % de la red el día {resultado['t'][np.argmax(resultado['I'])]}"),
+        html.P(f"Alcanzados al final: {100 * (1 - resultado['S'][-1]):.1f} %"),
+    ]
+    if modelo == 'sir' and gamma > 0 and k1 > 0:
+        # Umbral de la red: T·<k²-k>/<k> > 1, con T = β/(β+γ) la transmisibilidad
+        r0_red = beta / (beta + gamma) * (k2 - k1) / k1
+        info.append(html.P(f"R₀ de la red = T·(⟨k²⟩ − ⟨k⟩)/⟨k⟩ = {r0_red:.2f} "
+                           f"(mezcla homogénea: β⟨k⟩/γ = {beta * k1 / gamma:.2f})"))
+
+    return (grafico_curvas_red(resultado, modelo), grafico_por_grado(resultado),
+            grafico_distribucion(grados), info)
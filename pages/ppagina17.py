@@ -0,0 +1,305 @@
+import time
+import uuid
+
+import dash
+from dash import html, dcc, Input, Output, State, Patch, callback, no_update, set_props
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.agentes import ESTADOS, VECINOS_MAXIMOS, crear_simulacion, avanzar, muestra, limitar_radio
+from utils.cache_compartido import obtener_cache
+from utils.compactar import figuras_compactas, compactar_arreglo
+
+dash.register_page(__name__, path='/sir-agentes', name='SIR de agentes')
+
+MAXIMO_AGENTES = 10 ** 5
+MAXIMO_DIBUJADOS = 20000
+
+# La simulación vive en la caché compartida entre actualizaciones
+ESPACIO_CACHE = 'agentes'
+TTL_SIMULACION = 30 * 60
+
+# Milisegundos entre actualizaciones de la animación
+INTERVALO = 250
+
+COLORES = ('#2E86AB', '#E63946', '#2A9D8F')
+NOMBRES = ('Susceptibles', 'Infectados', 'Recuperados')
+
+# Mientras un worker avanza una simulación guarda una marca en la caché:
+# si otra actualización (de cualquier worker) llega antes de que termine,
+# se descarta. La marca vence sola si el worker muere a mitad de camino
+TTL_EN_CURSO = 30
+
+layout = html.Div(children=[
+    html.Div(children=[
+        # Contenedor izquierdo - Controles
+        html.Div(children=[
+            html.H1("SIR de agentes"),
+            html.P("Cada persona se mueve al azar por un plano (que se cierra sobre sí mismo) y "
+                   "contagia a los susceptibles que pasan a menos de un radio de contagio."),
+
+            html.Div([
+                html.Div([
+                    html.Label("Agentes:", className="input-label"),
+                    dcc.Input(id="input-agentes", type="number", value=20000, min=100, max=MAXIMO_AGENTES,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Densidad (agentes por unidad de área):", className="input-label"),
+                    dcc.Input(id="input-densidad-agentes", type="number", value=1.0, min=0.01, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Radio de contagio:", className="input-label"),
+                    dcc.Input(id="input-radio-agentes", type="number", value=1.0, min=0.05, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Probabilidad de contagio por contacto y paso:", className="input-label"),
+                    dcc.Input(id="input-contagio-agentes", type="number", value=0.05, min=0, max=1, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Duración media de la infección (pasos):", className="input-label"),
+                    dcc.Input(id="input-duracion-agentes", type="number", value=14, min=1, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Velocidad (distancia por paso):", className="input-label"),
+                    dcc.Input(id="input-velocidad-agentes", type="number", value=0.3, min=0, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Infectados iniciales:", className="input-label"),
+                    dcc.Input(id="input-infectados-agentes", type="number", value=10, min=1, className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Agentes dibujados:", className="input-label"),
+                    dcc.Input(id="input-dibujados-agentes", type="number", value=5000, min=100,
+                              max=MAXIMO_DIBUJADOS, className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Pasos por actualización:", className="input-label"),
+                    dcc.Input(id="input-pasos-agentes", type="number", value=2, min=1, max=20,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Button("Reiniciar", id="btn-reiniciar-agentes", className="btn-generar"),
+                html.Button("Iniciar", id="btn-animar-agentes", className="btn-generar"),
+                dcc.Interval(id="intervalo-agentes", interval=INTERVALO, disabled=True),
+                dcc.Store(id="simulacion-agentes")
+            ], className="controls-container"),
+
+            html.Div(id="info-agentes", className="info-container")
+        ], className="left-container"),
+
+        # Contenedor derecho - Gráficos
+        html.Div(children=[
+            html.H1("Agentes y curvas"),
+            html.Div([
+                dcc.Graph(id='grafico-agentes', style={'height': '520px', 'width': '100%'}),
+                dcc.Graph(id='grafico-curvas-agentes', style={'height': '380px', 'width': '100%'})
+            ], className="graph-container"),
+        ], className="right-container")
+    ], className="main-container")
+])
+
+
+def leer_parametros(radio, contagio, duracion, velocidad):
+    """
+    Parámetros de avanzar() a partir de los controles.
+    """
+    return dict(radio=max(float(radio), 0.05), contagio=min(max(float(contagio), 0.0), 1.0),
+                duracion=max(float(duracion), 1.0), velocidad=max(float(velocidad), 0.0))
+
+
+def grafico_agentes(simulacion, indices):
+    """
+    Posición y estado de una muestra fija de agentes.
+    """
+    lado = simulacion['lado']
+    fig = go.Figure(go.Scattergl(
+        x=simulacion['x'][indices], y=simulacion['y'][indices], mode='markers',
+        marker=dict(color=simulacion['estado'][indices], cmin=0, cmax=2, size=4,
+                    colorscale=[[0, COLORES[0]], [0.33, COLORES[0]], [0.34, COLORES[1]],
+                                [0.66, COLORES[1]], [0.67, COLORES[2]], [1, COLORES[2]]]),
+        hoverinfo='skip'
+    ))
+    fig.update_layout(
+        title=f"{len(indices):,} de {len(simulacion['x']):,} agentes "
+              f"(azul: susceptible, rojo: infectado, verde: recuperado)",
+        xaxis=dict(range=[0, lado], showgrid=False, zeroline=False),
+        yaxis=dict(range=[0, lado], showgrid=False, zeroline=False, scaleanchor='x', scaleratio=1),
+        template='plotly_white',
+        height=520,
+        margin=dict(l=10, r=10, t=50, b=10),
+        uirevision='agentes'
+    )
+    return fig
+
+
+def grafico_curvas_agentes(simulacion):
+    """
+    Agentes en cada estado por paso, de la misma corrida.
+    """
+    historial = simulacion['historial']
+    t = np.arange(len(historial['S']))
+    fig = go.Figure()
+    for c, nombre, color in zip(ESTADOS, NOMBRES, COLORES):
+        fig.add_trace(go.Scatter(x=t, y=historial[c], mode='lines', name=f"{nombre} ({c})",
+                                 line=dict(color=color, width=2)))
+    fig.update_layout(
+        xaxis_title='Paso',
+        yaxis_title='Agentes',
+        hovermode='x unified',
+        template='plotly_white',
+        height=380,
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="right", x=1),
+        uirevision='agentes'
+    )
+    return fig
+
+
+def informacion_agentes(simulacion, parametros, ms_por_paso=None):
+    """
+    Estado actual, pico y R₀ aproximado.
+    """
+    historial = simulacion['historial']
+    n = len(simulacion['x'])
+    densidad = n / simulacion['lado'] ** 2
+    radio = limitar_radio(parametros['radio'], n, simulacion['lado'])
+    # Con mezcla rápida cada infectado tiene densidad·π·r² contactos por paso
+    r0 = parametros['contagio'] * densidad * np.pi * radio ** 2 * parametros['duracion']
+    pico = int(np.argmax(historial['I']))
+    info = [
+        html.H4(f"Paso {simulacion['paso']}"),
+        html.P(", ".join(f"{c}: {historial[c][-1]:,}" for c in ESTADOS)),
+        html.P(f"Pico: {historial['I'][pico]:,} infectados en el paso {pico}"),
+        html.P(f"Alcanzados: {100 * (1 - historial['S'][-1] / n):.1f} %"),
+        html.P(f"R₀ aproximado = p·densidad·π·r²·duración = {r0:.2f}"),
+    ]
+    if radio < parametros['radio']:
+        info.append(html.P(f"Radio limitado a {radio:.2f} (a lo sumo {VECINOS_MAXIMOS} vecinos por agente)"))
+    if ms_por_paso is not None:
+        info.append(html.P(f"{ms_por_paso:.1f} ms por paso con {n:,} agentes"))
+    return info
+
+
+@callback(
+    [Output('grafico-agentes', 'figure'),
+     Output('grafico-curvas-agentes', 'figure'),
+     Output('info-agentes', 'children'),
+     Output('simulacion-agentes', 'data')],
+    Input('btn-reiniciar-agentes', 'n_clicks'),
+    [State('input-agentes', 'value'),
+     State('input-densidad-agentes', 'value'),
+     State('input-infectados-agentes', 'value'),
+     State('input-dibujados-agentes', 'value'),
+     State('input-radio-agentes', 'value'),
+     State('input-contagio-agentes', 'value'),
+     State('input-duracion-agentes', 'value'),
+     State('input-velocidad-agentes', 'value'),
+     State('simulacion-agentes', 'data')],
+    prevent_initial_call=False
+)
+@figuras_compactas
+def reiniciar_agentes(n_clicks, n, densidad, infectados, dibujados, radio, contagio, duracion, velocidad,
+                      anterior):
+    if None in [n, densidad, infectados, dibujados, radio, contagio, duracion, velocidad]:
+        return no_update, no_update, html.P("Error: Todos los campos deben estar completos"), no_update
+
+    parametros = leer_parametros(radio, contagio, duracion, velocidad)
+    n = int(min(max(n, 100), MAXIMO_AGENTES))
+    simulacion = crear_simulacion(n, int(infectados), max(float(densidad), 0.01), parametros['duracion'])
+    simulacion['muestra'] = muestra(simulacion, int(min(max(dibujados, 100), MAXIMO_DIBUJADOS)))
+    # Cada reinicio es una simulación nueva: la anterior vence sola en la caché
+    clave = uuid.uuid4().hex
+    obtener_cache().guardar(ESPACIO_CACHE, clave, simulacion, TTL_SIMULACION)
+    return (grafico_agentes(simulacion, simulacion['muestra']), grafico_curvas_agentes(simulacion),
+            informacion_agentes(simulacion, parametros), {'clave': clave, 'dibujados': simulacion['paso'] + 1})
+
+
+@callback(
+    [Output('intervalo-agentes', 'disabled'),
+     Output('btn-animar-agentes', 'children')],
+    Input('btn-animar-agentes', 'n_clicks'),
+    State('intervalo-agentes', 'disabled'),
+    prevent_initial_call=True
+)
+def animar_agentes(n_clicks, detenido):
+    return (False, "Pausar") if detenido else (True, "Iniciar")
+
+
+@callback(
+    [Output('grafico-agentes', 'figure', allow_duplicate=True),
+     Output('grafico-curvas-agentes', 'figure', allow_duplicate=True),
+     Output('info-agentes', 'children', allow_duplicate=True),
+     Output('simulacion-agentes', 'data', allow_duplicate=True)],
+    Input('intervalo-agentes', 'n_intervals'),
+    [State('simulacion-agentes', 'data'),
+     State('input-pasos-agentes', 'value'),
+     State('input-radio-agentes', 'value'),
+     State('input-contagio-agentes', 'value'),
+     State('input-duracion-agentes', 'value'),
+     State('input-velocidad-agentes', 'value')],
+    prevent_initial_call=True
+)
+def avanzar_agentes(n_intervals, datos, pasos, radio, contagio, duracion, velocidad):
+    """
+    Avanza unos pasos la simulación guardada y envía solo lo que cambió:
+    posiciones y estados de la muestra y los pasos de las curvas que el
+    navegador todavía no tiene (`dibujados` en el Store).
+    """
+    if not datos or None in [pasos, radio, contagio, duracion, velocidad]:
+        return no_update, no_update, no_update, no_update
+    clave = datos['clave']
+    cache = obtener_cache()
+    if not cache.tomar(ESPACIO_CACHE, f"en-curso:{clave}", TTL_EN_CURSO):
+        return no_update, no_update, no_update, no_update
+    try:
+        simulacion = cache.obtener(ESPACIO_CACHE, clave)
+        if simulacion is None:
+            set_props('intervalo-agentes', {'disabled': True})
+            set_props('btn-animar-agentes', {'children': "Iniciar"})
+            return no_update, no_update, html.P("La simulación venció: reiníciala."), no_update
+
+        parametros = leer_parametros(radio, contagio, duracion, velocidad)
+        pasos = int(min(max(pasos, 1), 20))
+        inicio = time.perf_counter()
+        avanzar(simulacion, pasos, **parametros)
+        ms_por_paso = 1000 * (time.perf_counter() - inicio) / pasos
+        cache.guardar(ESPACIO_CACHE, clave, simulacion, TTL_SIMULACION)
+    finally:
+        cache.borrar(ESPACIO_CACHE, f"en-curso:{clave}")
+
+    if simulacion['historial']['I'][-1] == 0:
+        # Sin infectados ya no cambia nada más que las posiciones
+        set_props('intervalo-agentes', {'disabled': True})
+        set_props('btn-animar-agentes', {'children': "Iniciar"})
+
+    indices = simulacion['muestra']
+    agentes = Patch()
+    agentes['data'][0]['x'] = compactar_arreglo(simulacion['x'][indices])
+    agentes['data'][0]['y'] = compactar_arreglo(simulacion['y'][indices])
+    agentes['data'][0]['marker']['color'] = compactar_arreglo(simulacion['estado'][indices])
+
+    # El Store y la figura se actualizan en la misma respuesta: si una se
+    # descarta, la otra también, y `dibujados` sigue siendo el largo real
+    historial = simulacion['historial']
+    dibujados = datos.get('dibujados', 0)
+    total = len(historial['S'])
+    curvas = Patch()
+    for k, c in enumerate(ESTADOS):
+        curvas['data'][k]['x'].extend(list(range(dibujados, total)))
+        curvas['data'][k]['y'].extend(historial[c][dibujados:])
+    estado = Patch()
+    estado['dibujados'] = total
+    return agentes, curvas, informacion_agentes(simulacion, parametros, ms_por_paso), estado
@@ -0,0 +1,391 @@
+import time
+import uuid
+
+import dash
+from dash import html, dcc, Input, Output, State, Patch, callback, no_update, set_props
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.difusion import (MODELOS, METODOS, CAMPOS, CAMPO_DIBUJADO, MAXIMO_CUADROS, MAXIMO_SUBPASOS,
+                            crear_dominio, avanzar, metodo_efectivo, guardar_cuadro, ranura_cuadro)
+from utils.cache_compartido import obtener_cache
+from utils.compactar import figuras_compactas, compactar_arreglo
+
+dash.register_page(__name__, path='/reaccion-difusion', name='Reacción-difusión')
+
+# Celdas por lado de la imagen que se envía (las mallas más finas se
+# promedian por bloques)
+RESOLUCION = 256
+
+# La simulación vive en la caché compartida entre cuadros; cada imagen
+# del búfer va en su propia entrada ("<clave>:cuadro:<ranura>") y solo se
+# escribe cuando cambia
+ESPACIO_CACHE = 'difusion'
+TTL_SIMULACION = 30 * 60
+
+# Milisegundos entre cuadros de la animación
+INTERVALO = 200
+
+COLORES = {'S': '#2E86AB', 'I': '#E63946', 'u': '#6A4C93'}
+NOMBRES = {'S': 'Susceptibles', 'I': 'Infectados', 'u': 'Densidad'}
+
+# Mientras un worker avanza una simulación guarda una marca en la caché:
+# si otro cuadro (de cualquier worker) llega antes de que termine, se
+# descarta. La marca vence sola si el worker muere a mitad de camino
+TTL_EN_CURSO = 30
+
+layout = html.Div(children=[
+    html.Div(children=[
+        # Contenedor izquierdo - Controles
+        html.Div(children=[
+            html.H1("Reacción-difusión"),
+            html.P("La epidemia (o la población logística) crece en cada punto y se difunde a los "
+                   "puntos vecinos: desde cada foco avanza un frente con velocidad constante."),
+
+            html.Div([
+                html.Div([
+                    html.Label("Modelo:", className="input-label"),
+                    dcc.RadioItems(
+                        id="modelo-difusion",
+                        options=[{'label': f" {nombre}", 'value': modelo} for modelo, nombre in MODELOS.items()],
+                        value='sir',
+                        inline=True
+                    )
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Difusión:", className="input-label"),
+                    dcc.RadioItems(
+                        id="metodo-difusion",
+                        options=[{'label': f" {nombre}", 'value': metodo} for metodo, nombre in METODOS.items()],
+                        value='fft'
+                    )
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Malla (celdas por lado):", className="input-label"),
+                    dcc.Dropdown(id="malla-difusion", options=[128, 256, 512, 1024], value=512, clearable=False,
+                                 className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Lado del dominio (km):", className="input-label"),
+                    dcc.Input(id="input-lado-difusion", type="number", value=200, min=1, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Coeficiente de difusión D (km²/día):", className="input-label"),
+                    dcc.Input(id="input-d-difusion", type="number", value=1.0, min=0, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Tasa de infección (β) / crecimiento (r):", className="input-label"),
+                    dcc.Input(id="input-beta-difusion", type="number", value=0.5, min=0, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Tasa de recuperación (γ, solo SIR):", className="input-label"),
+                    dcc.Input(id="input-gamma-difusion", type="number", value=0.1, min=0, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Paso de tiempo (días):", className="input-label"),
+                    dcc.Input(id="input-dt-difusion", type="number", value=0.5, min=0.01, max=5, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Focos iniciales:", className="input-label"),
+                    dcc.Input(id="input-focos-difusion", type="number", value=3, min=1, max=50,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Pasos por cuadro:", className="input-label"),
+                    dcc.Input(id="input-pasos-difusion", type="number", value=2, min=1, max=20,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Button("Reiniciar", id="btn-reiniciar-difusion", className="btn-generar"),
+                html.Button("Iniciar", id="btn-animar-difusion", className="btn-generar"),
+                dcc.Interval(id="intervalo-difusion", interval=INTERVALO, disabled=True),
+                dcc.Store(id="simulacion-difusion")
+            ], className="controls-container"),
+
+            html.Div(id="info-difusion", className="info-container")
+        ], className="left-container"),
+
+        # Contenedor derecho - Gráficos
+        html.Div(children=[
+            html.H1("Propagación en el espacio"),
+            html.Div([
+                dcc.Graph(id='grafico-difusion', style={'height': '560px', 'width': '100%'}),
+                html.Label(f"Cuadros recientes (los últimos {MAXIMO_CUADROS}, en pausa):", className="input-label"),
+                dcc.Slider(id="cuadro-difusion", min=0, max=0, step=1, value=0, marks=None),
+                dcc.Graph(id='grafico-medias-difusion', style={'height': '340px', 'width': '100%'})
+            ], className="graph-container"),
+        ], className="right-container")
+    ], className="main-container")
+])
+
+
+def leer_parametros(d, beta, gamma):
+    """
+    Parámetros de avanzar() a partir de los controles: en el logístico la
+    tasa de crecimiento r es el mismo control que β.
+    """
+    return dict(D=max(float(d), 0.0), beta=max(float(beta), 0.0), gamma=max(float(gamma), 0.0),
+                r=max(float(beta), 0.0))
+
+
+def maximo_color(modelo, parametros):
+    """
+    Valor del campo dibujado que corresponde al extremo de la escala de
+    colores: en SIR el pico de infectados del modelo bien mezclado,
+    1 - (1 + ln R₀)/R₀, para que el frente se vea con contraste.
+    """
+    if modelo != 'sir' or parametros['gamma'] <= 0 or parametros['beta'] <= parametros['gamma']:
+        return 1.0
+    r0 = parametros['beta'] / parametros['gamma']
+    return max(1 - (1 + np.log(r0)) / r0, 0.01)
+
+
+def grafico_difusion(dominio, imagen, maximo):
+    """
+    Mapa de calor del campo dibujado (cuantizado a uint8).
+    """
+    m = imagen.shape[0]
+    paso = dominio['lado'] / m
+    campo = CAMPO_DIBUJADO[dominio['modelo']]
+    marcas = np.linspace(0, 255, 5)
+    fig = go.Figure(go.Heatmap(
+        z=imagen, x0=paso / 2, dx=paso, y0=paso / 2, dy=paso, zmin=0, zmax=255, colorscale='Inferno',
+        colorbar=dict(title=dict(text=NOMBRES[campo], side='right'), tickvals=marcas,
+                      ticktext=[f"{maximo * v / 255:.2g}" for v in marcas]),
+        hovertemplate="(%{x:.0f}, %{y:.0f}) km<extra></extra>"
+    ))
+    fig.update_layout(
+        title=f"{MODELOS[dominio['modelo']]}: día {dominio['t']:.1f}",
+        xaxis=dict(title='km', range=[0, dominio['lado']]),
+        yaxis=dict(title='km', range=[0, dominio['lado']], scaleanchor='x', scaleratio=1),
+        template='plotly_white',
+        height=560,
+        margin=dict(l=10, r=10, t=50, b=10),
+        uirevision='difusion'
+    )
+    return fig
+
+
+def grafico_medias(dominio, dt):
+    """
+    Promedio de cada campo en todo el dominio.
+    """
+    fig = go.Figure()
+    for c in CAMPOS[dominio['modelo']]:
+        medias = dominio['medias'][c]
+        fig.add_trace(go.Scatter(x=dt * np.arange(len(medias)), y=medias, mode='lines', name=NOMBRES[c],
+                                 line=dict(color=COLORES[c], width=2)))
+    fig.update_layout(
+        title='Promedio en el dominio',
+        xaxis_title='Tiempo (días)',
+        yaxis_title='Fracción',
+        hovermode='x unified',
+        template='plotly_white',
+        height=340,
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="right", x=1),
+        uirevision='difusion'
+    )
+    return fig
+
+
+def guardar_imagen(cache, clave, dominio):
+    """
+    Cuantiza el campo dibujado y, si cambió, lo guarda en su ranura del
+    búfer. Devuelve la imagen nueva o None.
+    """
+    nuevo = guardar_cuadro(dominio, RESOLUCION, dominio['maximo'])
+    if nuevo is None:
+        return None
+    ranura, imagen = nuevo
+    cache.guardar(ESPACIO_CACHE, f"{clave}:cuadro:{ranura}", (dominio['paso'], dominio['t'], imagen),
+                  TTL_SIMULACION)
+    return imagen
+
+
+def informacion_difusion(dominio, parametros, metodo, dt, ms_por_paso=None):
+    """
+    Estado, velocidad teórica del frente y costo por paso.
+    """
+    medias = dominio['medias']
+    modelo = dominio['modelo']
+    info = [
+        html.H4(f"Día {dominio['t']:.1f} (paso {dominio['paso']})"),
+        html.P(", ".join(f"{NOMBRES[c]}: {100 * medias[c][-1]:.2f} %" for c in CAMPOS[modelo])),
+    ]
+    # Velocidad de Fisher del frente: 2√(D·tasa de crecimiento al frente)
+    crecimiento = parametros['beta'] - parametros['gamma'] if modelo == 'sir' else parametros['r']
+    if crecimiento > 0:
+        info.append(html.P(f"Velocidad del frente ≈ 2√(D·{'(β-γ)' if modelo == 'sir' else 'r'}) = "
+                           f"{2 * np.sqrt(parametros['D'] * crecimiento):.2f} km/día"))
+    else:
+        info.append(html.P("Sin frente: la tasa de crecimiento es ≤ 0"))
+    efectivo = metodo_efectivo(dominio, dt, parametros['D'], metodo)
+    if efectivo != metodo:
+        info.append(html.P(f"El estencil necesitaría más de {MAXIMO_SUBPASOS} subpasos por paso: "
+                           f"se usa {METODOS[efectivo]}"))
+    if ms_por_paso is not None:
+        info.append(html.P(f"{METODOS[efectivo]}: {ms_por_paso:.1f} ms por paso en una malla de "
+                           f"{dominio['n']}×{dominio['n']}"))
+    return info
+
+
+@callback(
+    [Output('grafico-difusion', 'figure'),
+     Output('grafico-medias-difusion', 'figure'),
+     Output('info-difusion', 'children'),
+     Output('simulacion-difusion', 'data'),
+     Output('cuadro-difusion', 'max'),
+     Output('cuadro-difusion', 'value')],
+    Input('btn-reiniciar-difusion', 'n_clicks'),
+    [State('modelo-difusion', 'value'),
+     State('metodo-difusion', 'value'),
+     State('malla-difusion', 'value'),
+     State('input-lado-difusion', 'value'),
+     State('input-d-difusion', 'value'),
+     State('input-beta-difusion', 'value'),
+     State('input-gamma-difusion', 'value'),
+     State('input-dt-difusion', 'value'),
+     State('input-focos-difusion', 'value')],
+    prevent_initial_call=False
+)
+@figuras_compactas
+def reiniciar_difusion(n_clicks, modelo, metodo, n, lado, d, beta, gamma, dt, focos):
+    if None in [n, lado, d, beta, gamma, dt, focos]:
+        return (no_update, no_update, html.P("Error: Todos los campos deben estar completos"),
+                no_update, no_update, no_update)
+
+    # Los mismos límites del formulario: un dt negativo invertiría el tiempo
+    # y miles de focos o una malla enorme bloquearían el worker
+    n = int(min(max(n, 128), 1024))
+    dt = float(min(max(dt, 0.01), 5))
+    focos = int(min(max(focos, 1), 50))
+    parametros = leer_parametros(d, beta, gamma)
+    dominio = crear_dominio(n, max(float(lado), 1.0), modelo, focos)
+    dominio['maximo'] = maximo_color(modelo, parametros)
+    # Cada reinicio es una simulación nueva: la anterior vence sola en la caché
+    clave = uuid.uuid4().hex
+    cache = obtener_cache()
+    imagen = guardar_imagen(cache, clave, dominio)
+    cache.guardar(ESPACIO_CACHE, clave, dominio, TTL_SIMULACION)
+    datos = {'clave': clave, 'modelo': modelo, 'dt': dt, 'dibujados': 1, 'cuadros': dominio['cuadros']}
+    return (grafico_difusion(dominio, imagen, dominio['maximo']), grafico_medias(dominio, dt),
+            informacion_difusion(dominio, parametros, metodo, dt), datos, 0, 0)
+
+
+@callback(
+    [Output('intervalo-difusion', 'disabled'),
+     Output('btn-animar-difusion', 'children')],
+    Input('btn-animar-difusion', 'n_clicks'),
+    State('intervalo-difusion', 'disabled'),
+    prevent_initial_call=True
+)
+def animar_difusion(n_clicks, detenido):
+    return (False, "Pausar") if detenido else (True, "Iniciar")
+
+
+@callback(
+    [Output('grafico-difusion', 'figure', allow_duplicate=True),
+     Output('grafico-medias-difusion', 'figure', allow_duplicate=True),
+     Output('info-difusion', 'children', allow_duplicate=True),
+     Output('cuadro-difusion', 'max', allow_duplicate=True),
+     Output('cuadro-difusion', 'value', allow_duplicate=True),
+     Output('simulacion-difusion', 'data', allow_duplicate=True)],
+    Input('intervalo-difusion', 'n_intervals'),
+    [State('simulacion-difusion', 'data'),
+     State('metodo-difusion', 'value'),
+     State('input-pasos-difusion', 'value'),
+     State('input-d-difusion', 'value'),
+     State('input-beta-difusion', 'value'),
+     State('input-gamma-difusion', 'value')],
+    prevent_initial_call=True
+)
+def avanzar_difusion(n_intervals, datos, metodo, pasos, d, beta, gamma):
+    """
+    Avanza unos pasos y envía el cuadro nuevo solo si cambió la imagen
+    cuantizada; de las medias van los pasos que el navegador todavía no
+    tiene (`dibujados` en el Store) y la información va siempre.
+    """
+    sin_cambios = (no_update,) * 6
+    if not datos or None in [pasos, d, beta, gamma]:
+        return sin_cambios
+    clave = datos['clave']
+    cache = obtener_cache()
+    if not cache.tomar(ESPACIO_CACHE, f"en-curso:{clave}", TTL_EN_CURSO):
+        return sin_cambios
+    try:
+        dominio = cache.obtener(ESPACIO_CACHE, clave)
+        if dominio is None:
+            set_props('intervalo-difusion', {'disabled': True})
+            set_props('btn-animar-difusion', {'children': "Iniciar"})
+            return (no_update, no_update, html.P("La simulación venció: reiníciala."), no_update, no_update,
+                    no_update)
+
+        parametros = leer_parametros(d, beta, gamma)
+        pasos = int(min(max(pasos, 1), 20))
+        inicio = time.perf_counter()
+        avanzar(dominio, pasos, datos['dt'], parametros, metodo)
+        ms_por_paso = 1000 * (time.perf_counter() - inicio) / pasos
+        imagen = guardar_imagen(cache, clave, dominio)
+        cache.guardar(ESPACIO_CACHE, clave, dominio, TTL_SIMULACION)
+    finally:
+        cache.borrar(ESPACIO_CACHE, f"en-curso:{clave}")
+
+    if imagen is None:
+        figura = no_update
+    else:
+        figura = Patch()
+        figura['data'][0]['z'] = compactar_arreglo(imagen)
+        figura['layout']['title']['text'] = f"{MODELOS[dominio['modelo']]}: día {dominio['t']:.1f}"
+
+    # El Store y las figuras se actualizan en la misma respuesta: si una se
+    # descarta, las demás también, y `dibujados` sigue siendo el largo real
+    dibujados = datos.get('dibujados', 0)
+    total = dominio['paso'] + 1
+    medias = Patch()
+    for k, c in enumerate(CAMPOS[dominio['modelo']]):
+        medias['data'][k]['x'].extend((datos['dt'] * np.arange(dibujados, total)).tolist())
+        medias['data'][k]['y'].extend(dominio['medias'][c][dibujados:])
+    estado = Patch()
+    estado['dibujados'] = total
+    estado['cuadros'] = dominio['cuadros']
+    ultimo = min(dominio['cuadros'], MAXIMO_CUADROS) - 1
+    return (figura, medias, informacion_difusion(dominio, parametros, metodo, datos['dt'], ms_por_paso),
+            ultimo, ultimo, estado)
+
+
+@callback(
+    Output('grafico-difusion', 'figure', allow_duplicate=True),
+    Input('cuadro-difusion', 'value'),
+    [State('simulacion-difusion', 'data'),
+     State('intervalo-difusion', 'disabled')],
+    prevent_initial_call=True
+)
+def repasar_difusion(indice, datos, detenido):
+    """
+    En pausa, muestra uno de los cuadros recientes del búfer.
+    """
+    if not datos or not detenido or indice is None or indice >= min(datos['cuadros'], MAXIMO_CUADROS):
+        return no_update
+    ranura = ranura_cuadro(datos['cuadros'], indice)
+    guardado = obtener_cache().obtener(ESPACIO_CACHE, f"{datos['clave']}:cuadro:{ranura}")
+    if guardado is None:
+        return no_update
+    paso, t, imagen = guardado
+    figura = Patch()
+    figura['data'][0]['z'] = compactar_arreglo(imagen)
+    figura['layout']['title']['text'] = f"{MODELOS[datos['modelo']]}: día {t:.1f} (paso {paso})"
+    return figura
@@ -0,0 +1,278 @@
+import time
+
+import dash
+from dash import html, dcc, Input, Output, State, callback, ctx, no_update
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.intervenciones import TIPOS, MODELOS, simular_calendario, calendario_predefinido, beta_en
+from utils.compactar import figuras_compactas
+
+dash.register_page(__name__, path='/intervenciones', name='Intervenciones')
+
+COLORES = {'S': 'blue', 'E': 'orange', 'I': 'red', 'R': 'green'}
+NOMBRES = {'S': 'Susceptibles', 'E': 'Expuestos', 'I': 'Infectados', 'R': 'Recuperados'}
+
+# Celdas de la rejilla invisible que recibe los clics en la gráfica de β(t)
+REJILLA_T = 200
+REJILLA_BETA = 60
+
+# Dos puntos dibujados más cerca que esta fracción del horizonte son el mismo
+TOLERANCIA_PUNTO = 0.01
+
+layout = html.Div(children=[
+    html.Div(children=[
+        # Contenedor izquierdo - Controles
+        html.Div(children=[
+            html.H1("Intervenciones"),
+            html.P("La tasa de transmisión cambia con el tiempo: cuarentenas en escalón, medidas que "
+                   "se endurecen poco a poco o un calendario dibujado sobre la gráfica de β(t)."),
+
+            html.Div([
+                html.Div([
+                    html.Label("Modelo:", className="input-label"),
+                    dcc.RadioItems(
+                        id="modelo-intervencion",
+                        options=[{'label': ' SIR', 'value': 'sir'}, {'label': ' SEIR', 'value': 'seir'}],
+                        value='sir',
+                        inline=True
+                    )
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Población Total (N):", className="input-label"),
+                    dcc.Input(id="input-poblacion-intervencion", type="number", value=1000000, min=1,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Infectados iniciales (I₀):", className="input-label"),
+                    dcc.Input(id="input-infectados-intervencion", type="number", value=10, min=1,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Tasa de transmisión sin intervención (β):", className="input-label"),
+                    dcc.Input(id="input-beta-intervencion", type="number", value=0.3, min=0, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Tasa de incubación (σ, solo SEIR):", className="input-label"),
+                    dcc.Input(id="input-sigma-intervencion", type="number", value=0.2, min=0.001, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Tasa de recuperación (γ):", className="input-label"),
+                    dcc.Input(id="input-gamma-intervencion", type="number", value=0.1, min=0, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Tiempo de simulación (días):", className="input-label"),
+                    dcc.Input(id="input-tiempo-intervencion", type="number", value=365, min=10, max=3650,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Calendario de β(t):", className="input-label"),
+                    dcc.RadioItems(
+                        id="tipo-intervencion",
+                        options=[{'label': f" {nombre}", 'value': tipo} for tipo, nombre in TIPOS.items()],
+                        value='escalon'
+                    )
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Inicio y fin de la intervención (días):", className="input-label"),
+                    dcc.RangeSlider(id="rango-intervencion", min=0, max=365, step=1, value=[40, 120],
+                                    marks=None, tooltip={'placement': 'bottom'}, updatemode='drag')
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Reducción de β (%):", className="input-label"),
+                    dcc.Slider(id="reduccion-intervencion", min=0, max=100, step=1, value=60,
+                               marks={0: '0', 50: '50', 100: '100'}, tooltip={'placement': 'bottom'},
+                               updatemode='drag')
+                ], className="input-group"),
+
+                html.Div([
+                    html.Small("En el modo dibujado, haz clic en la gráfica de β(t) para agregar un punto "
+                               "(o moverlo, si ya hay uno en ese día).", style={"color": "gray"}),
+                    html.Button("Borrar puntos", id="btn-borrar-intervencion", className="btn-generar")
+                ], className="input-group"),
+
+                dcc.Store(id="puntos-intervencion", data=[])
+            ], className="controls-container"),
+
+            html.Div(id="info-intervencion", className="info-container")
+        ], className="left-container"),
+
+        # Contenedor derecho - Gráficos
+        html.Div(children=[
+            html.H1("Epidemia con intervenciones"),
+            html.Div([
+                dcc.Graph(id='grafico-intervencion', style={'height': '480px', 'width': '100%'}),
+                dcc.Graph(id='grafico-beta-intervencion', style={'height': '320px', 'width': '100%'})
+            ], className="graph-container"),
+        ], className="right-container")
+    ], className="main-container")
+])
+
+
+def armar_calendario(tipo, beta, rango, reduccion, puntos):
+    """
+    Calendario a partir de los controles: el predefinido en escalón o
+    rampa, o los puntos dibujados unidos por rectas (con β base en t = 0
+    si no se dibujó ese día).
+    """
+    if tipo == 'dibujada':
+        dibujados = sorted((float(t), float(b)) for t, b in puntos)
+        if not dibujados or dibujados[0][0] > 0:
+            dibujados.insert(0, (0.0, beta))
+        return {'tipo': 'rampa', 'puntos': dibujados}
+    inicio, fin = sorted(float(v) for v in rango)
+    return calendario_predefinido(tipo, beta, inicio, fin, reduccion / 100)
+
+
+def grafico_compartimentos(resultado, compartimentos, modelo, calendario):
+    """
+    Curvas del modelo con líneas verticales en los puntos del calendario.
+    """
+    fig = go.Figure()
+    for k, c in enumerate(compartimentos):
+        fig.add_trace(go.Scatter(x=resultado['t'], y=resultado['y'][k], mode='lines',
+                                 name=f"{NOMBRES[c]} ({c})", line=dict(color=COLORES[c], width=2)))
+    for t, _ in calendario['puntos']:
+        if 0 < t < resultado['t'][-1]:
+            fig.add_vline(x=t, line_dash='dot', line_color='gray', line_width=1)
+    fig.update_layout(
+        title=f"Modelo {modelo.upper()} con β(t)",
+        xaxis_title='Tiempo (días)',
+        yaxis_title='Población',
+        hovermode='x unified',
+        template='plotly_white',
+        height=480,
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="right", x=1),
+        uirevision='intervencion'
+    )
+    return fig
+
+
+def grafico_beta(resultado, calendario, beta, t_max):
+    """
+    β(t) y sus puntos. Debajo va una rejilla transparente para que un
+    clic en cualquier lugar de la gráfica entregue sus coordenadas.
+    """
+    maximo = max(max(b for _, b in calendario['puntos']), beta) * 1.5 or 1.0
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        x=np.linspace(0, t_max, REJILLA_T), y=np.linspace(0, maximo, REJILLA_BETA),
+        z=np.zeros((REJILLA_BETA, REJILLA_T)), opacity=0, showscale=False, hoverinfo='none'
+    ))
+    fig.add_trace(go.Scatter(x=resultado['t'], y=resultado['beta'], mode='lines', name='β(t)',
+                             line=dict(color='purple', width=2, shape='linear')))
+    puntos = np.asarray(calendario['puntos'], dtype=float)
+    fig.add_trace(go.Scatter(x=puntos[:, 0], y=puntos[:, 1], mode='markers', name='Puntos',
+                             marker=dict(color='purple', size=9)))
+    fig.update_layout(
+        title='Tasa de transmisión β(t)',
+        xaxis=dict(title='Tiempo (días)', range=[0, t_max]),
+        yaxis=dict(title='β', range=[0, maximo]),
+        template='plotly_white',
+        height=320,
+        showlegend=False,
+        margin=dict(t=50, b=40)
+    )
+    return fig
+
+
+@callback(
+    [Output('rango-intervencion', 'max'),
+     Output('rango-intervencion', 'value')],
+    Input('input-tiempo-intervencion', 'value'),
+    State('rango-intervencion', 'value'),
+    prevent_initial_call=True
+)
+def ajustar_rango(t_max, rango):
+    if not t_max:
+        return no_update, no_update
+    return t_max, [min(v, t_max) for v in rango]
+
+
+@callback(
+    Output('puntos-intervencion', 'data'),
+    [Input('grafico-beta-intervencion', 'clickData'),
+     Input('btn-borrar-intervencion', 'n_clicks')],
+    [State('puntos-intervencion', 'data'),
+     State('tipo-intervencion', 'value'),
+     State('input-tiempo-intervencion', 'value')],
+    prevent_initial_call=True
+)
+def dibujar_punto(clic, n_clicks, puntos, tipo, t_max):
+    """
+    Agrega el punto del clic (o reemplaza el que esté en el mismo día).
+    """
+    if ctx.triggered_id == 'btn-borrar-intervencion':
+        return []
+    if tipo != 'dibujada' or not clic or not t_max:
+        return no_update
+    t, beta = round(clic['points'][0]['x']), round(max(clic['points'][0]['y'], 0.0), 4)
+    puntos = [p for p in puntos if abs(p[0] - t) > TOLERANCIA_PUNTO * t_max]
+    return sorted(puntos + [[t, beta]])
+
+
+@callback(
+    [Output('grafico-intervencion', 'figure'),
+     Output('grafico-beta-intervencion', 'figure'),
+     Output('info-intervencion', 'children')],
+    [Input('modelo-intervencion', 'value'),
+     Input('input-poblacion-intervencion', 'value'),
+     Input('input-infectados-intervencion', 'value'),
+     Input('input-beta-intervencion', 'value'),
+     Input('input-sigma-intervencion', 'value'),
+     Input('input-gamma-intervencion', 'value'),
+     Input('input-tiempo-intervencion', 'value'),
+     Input('tipo-intervencion', 'value'),
+     Input('rango-intervencion', 'value'),
+     Input('reduccion-intervencion', 'value'),
+     Input('puntos-intervencion', 'data')]
+)
+@figuras_compactas
+def actualizar_intervencion(modelo, N, I0, beta, sigma, gamma, t_max, tipo, rango, reduccion, puntos):
+    if None in [N, I0, beta, sigma, gamma, t_max, rango, reduccion]:
+        return no_update, no_update, html.P("Error: Todos los campos deben estar completos")
+
+    N, t_max = float(N), float(min(max(t_max, 10), 3650))
+    I0 = min(float(I0), N)
+    calendario = armar_calendario(tipo, float(beta), rango, reduccion, puntos or [])
+    if modelo == 'seir':
+        y0, parametros = (N - I0, 0.0, I0, 0.0), (float(sigma), float(gamma), N)
+    else:
+        y0, parametros = (N - I0, I0, 0.0), (float(gamma), N)
+
+    inicio = time.perf_counter()
+    resultado = simular_calendario(modelo, y0, parametros, calendario, t_max)
+    duracion = time.perf_counter() - inicio
+
+    compartimentos = MODELOS[modelo][2]
+    I = resultado['y'][compartimentos.index('I')]
+    pico = int(np.argmax(I))
+    S_final = resultado['y'][0][-1]
+    info = [
+        html.H4("Resultados"),
+        html.P(f"R₀ sin intervención = β/γ = {beta / gamma:.2f}" if gamma > 0 else "R₀ no definido"),
+        html.P(f"R₀ mínimo del calendario = {min(b for _, b in calendario['puntos']) / gamma:.2f}"
+               if gamma > 0 else ""),
+        html.P(f"Pico: {I[pico]:,.0f} infectados el día {resultado['t'][pico]:.0f}"),
+        html.P(f"Tasa de ataque: {100 * (1 - S_final / N):.1f} %"),
+        html.P(f"R_t al final = β(t)·S/(γN) = "
+               f"{float(beta_en(calendario, t_max)) * S_final / (gamma * N):.2f}" if gamma > 0 else ""),
+        html.H4("Integración por tramos"),
+        html.P(f"Tramos recalculados: {resultado['recalculados']} de {len(resultado['tramos'])} "
+               f"(los demás salieron de la caché)"),
+        html.P(f"Evaluaciones del lado derecho: {resultado['nfev']}, en {1000 * duracion:.1f} ms"),
+    ]
+    return (grafico_compartimentos(resultado, compartimentos, modelo, calendario),
+            grafico_beta(resultado, calendario, float(beta), t_max), info)
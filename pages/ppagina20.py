@@ -0,0 +1,254 @@
+import time
+
+import dash
+from dash import html, dcc, Input, Output, State
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.control import CONTROLES, ESCALAS, optimizar_control
+from utils.segundo_plano import callback_largo, controles_progreso
+from utils.compactar import figuras_compactas
+
+dash.register_page(__name__, path='/control-optimo', name='Control óptimo')
+
+# Columna del lote con los costos pedidos (escala 1)
+PEDIDA = int(np.argmin(np.abs(np.log(ESCALAS))))
+
+layout = html.Div(children=[
+    html.Div(children=[
+        # Contenedor izquierdo - Controles
+        html.Div(children=[
+            html.H1("Control óptimo"),
+            html.P("¿Cuándo y cuánto vacunar o distanciar? Se busca el calendario que minimiza las "
+                   "personas-día infectadas más el costo de las medidas (principio de Pontryagin)."),
+
+            html.Div([
+                html.Div([
+                    html.Label("Población Total (N):", className="input-label"),
+                    dcc.Input(id="input-poblacion-control", type="number", value=100000, min=1,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Infectados iniciales (I₀):", className="input-label"),
+                    dcc.Input(id="input-infectados-control", type="number", value=10, min=1,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Tasa de transmisión (β) [1/día]:", className="input-label"),
+                    dcc.Input(id="input-beta-control", type="number", value=0.3, min=0, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Tasa de recuperación (γ) [1/día]:", className="input-label"),
+                    dcc.Input(id="input-gamma-control", type="number", value=0.1, min=0, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Horizonte (días):", className="input-label"),
+                    dcc.Input(id="input-horizonte-control", type="number", value=365, min=10, max=1000,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Medidas:", className="input-label"),
+                    dcc.Checklist(
+                        id="medidas-control",
+                        options=[{'label': f" {nombre}", 'value': control} for control, nombre in CONTROLES.items()],
+                        value=list(CONTROLES),
+                        inline=True
+                    )
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Vacunación máxima (% de susceptibles por día):", className="input-label"),
+                    dcc.Input(id="input-vmax-control", type="number", value=2, min=0, max=100, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Distanciamiento máximo (% de reducción de β):", className="input-label"),
+                    dcc.Input(id="input-umax-control", type="number", value=70, min=0, max=100, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Peso de las infecciones (A):", className="input-label"),
+                    dcc.Input(id="input-a-control", type="number", value=1, min=0, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Costo de vacunar (B):", className="input-label"),
+                    dcc.Input(id="input-b-control", type="number", value=50, min=0.001, step="any",
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Costo de distanciar (C):", className="input-label"),
+                    dcc.Input(id="input-c-control", type="number", value=0.5, min=0.001, step="any",
+                              className="input-field"),
+                    html.Small("J = ∫ (A·I + B/2·v² + C/2·u²) dt, con I en fracción de la población",
+                               style={"color": "gray"})
+                ], className="input-group"),
+
+                html.Button("Optimizar", id="btn-control", className="btn-generar"),
+                controles_progreso("control")
+            ], className="controls-container"),
+
+            html.Div(id="info-control", className="info-container")
+        ], className="left-container"),
+
+        # Contenedor derecho - Gráficos
+        html.Div(children=[
+            html.H1("Calendario óptimo"),
+            html.Div([
+                dcc.Graph(id='grafico-control-estados', style={'height': '420px', 'width': '100%'}),
+                dcc.Graph(id='grafico-control-medidas', style={'height': '320px', 'width': '100%'}),
+                dcc.Graph(id='grafico-control-frontera', style={'height': '380px', 'width': '100%'})
+            ], className="graph-container"),
+        ], className="right-container")
+    ], className="main-container")
+])
+
+
+def grafico_estados(resultado, N):
+    """
+    Infectados con y sin control, susceptibles y vacunados acumulados.
+    """
+    t, x, sin_control = resultado['t'], resultado['x'][:, :, PEDIDA], resultado['sin_control']
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=t, y=N * sin_control[1], mode='lines', name='Infectados sin control',
+                             line=dict(color='red', width=2, dash='dash')))
+    fig.add_trace(go.Scatter(x=t, y=N * x[1], mode='lines', name='Infectados con control',
+                             line=dict(color='red', width=3)))
+    fig.add_trace(go.Scatter(x=t, y=N * x[0], mode='lines', name='Susceptibles con control',
+                             line=dict(color='blue', width=2)))
+    fig.add_trace(go.Scatter(x=t, y=N * x[3], mode='lines', name='Vacunados (acumulado)',
+                             line=dict(color='purple', width=2)))
+    fig.update_layout(
+        title='Epidemia con el calendario óptimo',
+        xaxis_title='Tiempo (días)',
+        yaxis_title='Personas',
+        hovermode='x unified',
+        template='plotly_white',
+        height=420,
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="right", x=1)
+    )
+    return fig
+
+
+def grafico_medidas(resultado):
+    """
+    Intensidad de cada medida en el tiempo.
+    """
+    t = resultado['t']
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=t, y=100 * resultado['v'][:, PEDIDA], mode='lines',
+                             name='Vacunación (% de S por día)', line=dict(color='purple', width=2)))
+    fig.add_trace(go.Scatter(x=t, y=100 * resultado['u'][:, PEDIDA], mode='lines',
+                             name='Distanciamiento (% de reducción de β)', line=dict(color='orange', width=2),
+                             yaxis='y2'))
+    fig.update_layout(
+        title='Medidas óptimas',
+        xaxis_title='Tiempo (días)',
+        yaxis=dict(title='Vacunación (%/día)', rangemode='tozero'),
+        yaxis2=dict(title='Distanciamiento (%)', overlaying='y', side='right', rangemode='tozero'),
+        hovermode='x unified',
+        template='plotly_white',
+        height=320,
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="right", x=1)
+    )
+    return fig
+
+
+def grafico_frontera(resultado, N):
+    """
+    Personas-día infectadas frente al costo de las medidas para cada
+    escala de costos resuelta en el mismo barrido.
+    """
+    escalas = resultado['escalas']
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=resultado['costo_controles'], y=N * resultado['infecciones'], mode='lines+markers',
+        name='Óptimos', line=dict(color='gray'),
+        # Huecos: escalas cuyo barrido no convergió
+        marker=dict(size=8, color=np.log10(escalas), colorscale='Viridis',
+                    symbol=np.where(resultado['convergio'], 'circle', 'circle-open')),
+        customdata=escalas, hovertemplate="Costos × %{customdata:.2g}<br>Costo: %{x:.3g}<br>"
+                                          "Personas-día infectadas: %{y:,.0f}<extra></extra>"
+    ))
+    fig.add_trace(go.Scatter(
+        x=[resultado['costo_controles'][PEDIDA]], y=[N * resultado['infecciones'][PEDIDA]], mode='markers',
+        name='Costos pedidos', marker=dict(size=14, color='red', symbol='star')
+    ))
+    fig.update_layout(
+        title='Frontera: infecciones frente al costo de las medidas',
+        xaxis_title='Costo de las medidas (∫ B/2·v² + C/2·u² dt)',
+        yaxis_title='Personas-día infectadas',
+        template='plotly_white',
+        height=380
+    )
+    return fig
+
+
+@callback_largo(
+    [Output('grafico-control-estados', 'figure'),
+     Output('grafico-control-medidas', 'figure'),
+     Output('grafico-control-frontera', 'figure'),
+     Output('info-control', 'children')],
+    Input('btn-control', 'n_clicks'),
+    [State('input-poblacion-control', 'value'),
+     State('input-infectados-control', 'value'),
+     State('input-beta-control', 'value'),
+     State('input-gamma-control', 'value'),
+     State('input-horizonte-control', 'value'),
+     State('medidas-control', 'value'),
+     State('input-vmax-control', 'value'),
+     State('input-umax-control', 'value'),
+     State('input-a-control', 'value'),
+     State('input-b-control', 'value'),
+     State('input-c-control', 'value')],
+    prevent_initial_call=False,
+    prefijo="control",
+    boton="btn-control"
+)
+@figuras_compactas
+def actualizar_control(set_progreso, n_clicks, N, I0, beta, gamma, horizonte, medidas, vmax, umax, A, B, C):
+    if None in [N, I0, beta, gamma, horizonte, vmax, umax, A, B, C]:
+        vacia = go.Figure()
+        return vacia, vacia, vacia, html.P("Error: Todos los campos deben estar completos")
+
+    N = float(N)
+    inicio = time.perf_counter()
+    resultado = optimizar_control(
+        float(beta), float(gamma), min(float(I0), N) / N, float(min(max(horizonte, 10), 1000)),
+        A=float(A), B=max(float(B), 1e-3), C=max(float(C), 1e-3), v_max=min(max(vmax, 0), 100) / 100,
+        u_max=min(max(umax, 0), 100) / 100, controles=tuple(medidas or ()), progreso=set_progreso
+    )
+    duracion = time.perf_counter() - inicio
+
+    x, sin_control = resultado['x'][:, :, PEDIDA], resultado['sin_control']
+    # Alcanzados: los que pasaron por I (recuperados más los que siguen infectados)
+    ataque = x[1, -1] + x[2, -1]
+    ataque_sin = sin_control[1, -1] + sin_control[2, -1]
+    info = [
+        html.H4("Resultados"),
+        html.P(f"R₀ = β/γ = {beta / gamma:.2f}" if gamma > 0 else "R₀ no definido"),
+        html.P(f"Infectados en el pico: {N * x[1].max():,.0f} (sin control {N * sin_control[1].max():,.0f})"),
+        html.P(f"Alcanzados: {100 * ataque:.1f} % (sin control {100 * ataque_sin:.1f} %), "
+               f"{N * (ataque_sin - ataque):,.0f} infecciones evitadas"),
+        html.P(f"Vacunados: {100 * x[3, -1]:.1f} % de la población"),
+        html.P(f"Costo total J = {resultado['J'][PEDIDA]:.4g} "
+               f"(infecciones {A * resultado['infecciones'][PEDIDA]:.4g}, "
+               f"medidas {resultado['costo_controles'][PEDIDA]:.4g})"),
+        html.H4("Barrido adelante-atrás"),
+        html.P("Solución guardada (misma combinación de parámetros)" if resultado['desde_cache'] else
+               f"{resultado['iteraciones']} iteraciones para {len(ESCALAS)} escalas de costo a la vez"
+               f"{'' if resultado['convergio'][PEDIDA] else ' (sin converger del todo con los costos pedidos)'}"),
+        html.P(f"Tiempo: {duracion:.2f} s"),
+    ]
+    return grafico_estados(resultado, N), grafico_medidas(resultado), grafico_frontera(resultado, N), info
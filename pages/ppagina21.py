@@ -0,0 +1,227 @@
+import time
+
+import dash
+from dash import html, dcc, Input, Output, State
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from utils.sensibilidad import PARAMETROS, NOMBRES_PARAMETROS, SALIDAS, METODOS, analizar_sensibilidad
+from utils.segundo_plano import callback_largo, controles_progreso
+from utils.compactar import figuras_compactas
+
+dash.register_page(__name__, path='/sensibilidad', name='Sensibilidad')
+
+COLORES = {'beta': 'red', 'sigma': 'orange', 'gamma': 'green', 'i0': 'purple'}
+
+# Tamaños de A y B (Sobol) o trayectorias (Morris)
+TAMANOS = [2 ** k for k in range(8, 15)]
+
+
+def _rango(id_, minimo, maximo, paso, valor, marcas):
+    return dcc.RangeSlider(id=id_, min=minimo, max=maximo, step=paso, value=valor, marks=marcas,
+                           tooltip={'placement': 'bottom'})
+
+
+layout = html.Div(children=[
+    html.Div(children=[
+        # Contenedor izquierdo - Controles
+        html.Div(children=[
+            html.H1("Sensibilidad"),
+            html.P("¿Qué parámetro decide el tamaño del pico, su fecha y cuántos se contagian? "
+                   "Se integran miles de epidemias con parámetros muestreados en sus rangos y se "
+                   "reparte la varianza de cada resultado entre los parámetros."),
+
+            html.Div([
+                html.Div([
+                    html.Label("Modelo:", className="input-label"),
+                    dcc.RadioItems(
+                        id="modelo-sensibilidad",
+                        options=[{'label': ' SIR', 'value': 'sir'}, {'label': ' SEIR', 'value': 'seir'}],
+                        value='sir',
+                        inline=True
+                    )
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Método:", className="input-label"),
+                    dcc.RadioItems(
+                        id="metodo-sensibilidad",
+                        options=[{'label': f" {nombre}", 'value': metodo} for metodo, nombre in METODOS.items()],
+                        value='sobol'
+                    )
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Muestras base (Sobol) o trayectorias (Morris):", className="input-label"),
+                    dcc.Dropdown(id="tamano-sensibilidad", options=[{'label': f"{n:,}", 'value': n} for n in TAMANOS],
+                                 value=4096, clearable=False),
+                    html.Small("Sobol integra base·(d + 2) epidemias y Morris trayectorias·(d + 1), "
+                               "con d el número de parámetros", style={"color": "gray"})
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Tasa de transmisión (β) [1/día]:", className="input-label"),
+                    _rango("rango-beta-sensibilidad", 0.05, 1.5, 0.01, [0.15, 0.6], {0.05: '0.05', 1.5: '1.5'})
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Tasa de incubación (σ, solo SEIR) [1/día]:", className="input-label"),
+                    _rango("rango-sigma-sensibilidad", 0.05, 1, 0.01, [0.1, 0.5], {0.05: '0.05', 1: '1'})
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Tasa de recuperación (γ) [1/día]:", className="input-label"),
+                    _rango("rango-gamma-sensibilidad", 0.02, 1, 0.01, [0.05, 0.2], {0.02: '0.02', 1: '1'})
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Infectados iniciales (fracción de N, escala log):", className="input-label"),
+                    _rango("rango-i0-sensibilidad", -7, -1, 0.5, [-5, -3],
+                           {k: f"10^{k}" for k in range(-7, 0, 2)})
+                ], className="input-group"),
+
+                html.Div([
+                    html.Label("Horizonte (días):", className="input-label"),
+                    dcc.Input(id="input-horizonte-sensibilidad", type="number", value=365, min=10, max=1000,
+                              className="input-field")
+                ], className="input-group"),
+
+                html.Button("Analizar", id="btn-sensibilidad", className="btn-generar"),
+                controles_progreso("sensibilidad")
+            ], className="controls-container"),
+
+            html.Div(id="info-sensibilidad", className="info-container")
+        ], className="left-container"),
+
+        # Contenedor derecho - Gráficos
+        html.Div(children=[
+            html.H1("Índices de sensibilidad"),
+            html.Div([
+                dcc.Graph(id='grafico-sensibilidad-indices', style={'height': '420px', 'width': '100%'}),
+                dcc.Graph(id='grafico-sensibilidad-dispersion', style={'height': '360px', 'width': '100%'})
+            ], className="graph-container"),
+        ], className="right-container")
+    ], className="main-container")
+])
+
+
+def grafico_sobol(resultado):
+    """
+    Índices de primer orden y totales de cada salida, con su intervalo.
+    """
+    nombres = [NOMBRES_PARAMETROS[p] for p in resultado['parametros']]
+    fig = make_subplots(rows=1, cols=len(SALIDAS), subplot_titles=list(SALIDAS.values()), shared_yaxes=True)
+    for columna, salida in enumerate(SALIDAS, start=1):
+        indices = resultado['indices'][salida]
+        for indice, color, nombre in [('S1', 'steelblue', 'Primer orden (S₁)'), ('ST', 'darkorange', 'Total (S_T)')]:
+            fig.add_trace(go.Bar(x=nombres, y=indices[indice], name=nombre, marker_color=color,
+                                 error_y=dict(type='data', array=indices[f'{indice}_ic']),
+                                 legendgroup=indice, showlegend=columna == 1), row=1, col=columna)
+    fig.update_yaxes(range=[0, 1.05], row=1, col=1, title='Fracción de la varianza')
+    fig.update_layout(
+        title='Índices de Sobol (S_T - S₁: parte debida a interacciones)',
+        barmode='group',
+        template='plotly_white',
+        height=420,
+        legend=dict(orientation="h", yanchor="bottom", y=1.08, xanchor="right", x=1)
+    )
+    return fig
+
+
+def grafico_morris(resultado):
+    """
+    μ* frente a σ de los efectos elementales de cada salida: lejos del
+    origen importa, arriba de la diagonal actúa con interacciones o de
+    forma no lineal.
+    """
+    parametros = resultado['parametros']
+    fig = make_subplots(rows=1, cols=len(SALIDAS), subplot_titles=list(SALIDAS.values()))
+    for columna, salida in enumerate(SALIDAS, start=1):
+        indices = resultado['indices'][salida]
+        for k, p in enumerate(parametros):
+            fig.add_trace(go.Scatter(x=[indices['mu_estrella'][k]], y=[indices['sigma'][k]], mode='markers+text',
+                                     text=[NOMBRES_PARAMETROS[p]], textposition='top center', name=NOMBRES_PARAMETROS[p],
+                                     marker=dict(size=12, color=COLORES[p]), legendgroup=p,
+                                     showlegend=columna == 1), row=1, col=columna)
+        maximo = 1.1 * max(indices['mu_estrella'].max(), indices['sigma'].max(), 1e-12)
+        fig.add_trace(go.Scatter(x=[0, maximo], y=[0, maximo], mode='lines', line=dict(color='gray', dash='dot'),
+                                 hoverinfo='skip', showlegend=False), row=1, col=columna)
+        fig.update_xaxes(title='μ*', range=[0, maximo], row=1, col=columna)
+        fig.update_yaxes(range=[0, maximo], row=1, col=columna)
+    fig.update_yaxes(title='σ', row=1, col=1)
+    fig.update_layout(
+        title='Efectos elementales de Morris (por recorrido completo del rango)',
+        template='plotly_white',
+        height=420,
+        legend=dict(orientation="h", yanchor="bottom", y=1.08, xanchor="right", x=1)
+    )
+    return fig
+
+
+def grafico_dispersion(resultado, metodo):
+    """
+    Cada salida frente a su parámetro más influyente en una submuestra de
+    las corridas.
+    """
+    parametros = resultado['parametros']
+    fig = make_subplots(rows=1, cols=len(SALIDAS), subplot_titles=list(SALIDAS.values()))
+    for columna, salida in enumerate(SALIDAS, start=1):
+        indices = resultado['indices'][salida]
+        importancia = np.nan_to_num(indices['ST'] if metodo == 'sobol' else indices['mu_estrella'])
+        p = parametros[int(np.argmax(importancia))]
+        fig.add_trace(go.Scattergl(x=resultado['muestras'][p], y=resultado['salidas'][salida], mode='markers',
+                                   marker=dict(size=3, color=COLORES[p], opacity=0.4), showlegend=False,
+                                   name=SALIDAS[salida]), row=1, col=columna)
+        fig.update_xaxes(title=NOMBRES_PARAMETROS[p], type='log' if p == 'i0' else 'linear', row=1, col=columna)
+    fig.update_layout(
+        title='Cada resultado frente a su parámetro más influyente',
+        template='plotly_white',
+        height=360
+    )
+    return fig
+
+
+@callback_largo(
+    [Output('grafico-sensibilidad-indices', 'figure'),
+     Output('grafico-sensibilidad-dispersion', 'figure'),
+     Output('info-sensibilidad', 'children')],
+    Input('btn-sensibilidad', 'n_clicks'),
+    [State('modelo-sensibilidad', 'value'),
+     State('metodo-sensibilidad', 'value'),
+     State('tamano-sensibilidad', 'value'),
+     State('rango-beta-sensibilidad', 'value'),
+     State('rango-sigma-sensibilidad', 'value'),
+     State('rango-gamma-sensibilidad', 'value'),
+     State('rango-i0-sensibilidad', 'value'),
+     State('input-horizonte-sensibilidad', 'value')],
+    prevent_initial_call=False,
+    prefijo="sensibilidad",
+    boton="btn-sensibilidad"
+)
+@figuras_compactas
+def actualizar_sensibilidad(set_progreso, n_clicks, modelo, metodo, tamano, beta, sigma, gamma, i0, horizonte):
+    if None in [tamano, beta, sigma, gamma, i0, horizonte]:
+        vacia = go.Figure()
+        return vacia, vacia, html.P("Error: Todos los campos deben estar completos")
+
+    rangos = {'beta': tuple(beta), 'sigma': tuple(sigma), 'gamma': tuple(gamma),
+              'i0': (10.0 ** i0[0], 10.0 ** i0[1])}
+    inicio = time.perf_counter()
+    resultado = analizar_sensibilidad(modelo, rangos, float(min(max(horizonte, 10), 1000)), metodo, int(tamano),
+                                      progreso=set_progreso)
+    duracion = time.perf_counter() - inicio
+
+    indices = grafico_sobol(resultado) if metodo == 'sobol' else grafico_morris(resultado)
+    r0 = (beta[0] / gamma[1], beta[1] / gamma[0])
+    info = [
+        html.H4("Resultados"),
+        html.P(f"R₀ = β/γ entre {r0[0]:.2f} y {r0[1]:.2f}"),
+        html.P(f"Parámetros: {', '.join(NOMBRES_PARAMETROS[p] for p in PARAMETROS[modelo])}"),
+        html.P(f"Epidemias integradas: {resultado['corridas']:,}"),
+        html.P("Resultado guardado (mismos rangos y muestras)" if resultado['desde_cache'] else
+               f"Tiempo: {duracion:.2f} s ({resultado['corridas'] / max(duracion, 1e-9):,.0f} epidemias/s)"),
+    ]
+    if metodo == 'sobol':
+        info.append(html.P("Si S₁ sale negativo o el intervalo es ancho, aumenta las muestras base."))
+    return indices, grafico_dispersion(resultado, metodo), info
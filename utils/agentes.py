@@ -0,0 +1,157 @@
+import numpy as np
+
+# ==========================================
+# SIR BASADO EN AGENTES CON HASH ESPACIAL
+# ==========================================
+#
+# Los agentes no son objetos de Python: la simulación es un diccionario de
+# arreglos de NumPy (estructura de arreglos) con una entrada por agente:
+#     x, y, angulo  posición y dirección (float32)
+#     estado        0 = S, 1 = I, 2 = R (int8)
+#     reloj         pasos de infección que le quedan (float32)
+# Los agentes se mueven en un toro de `lado` x `lado`. Para detectar los
+# contactos el plano se divide en celdas de lado >= radio (hash espacial
+# uniforme): los agentes se ordenan por celda y cada infectado solo mira
+# a los de su celda y las 8 vecinas, así que el costo por paso es
+# proporcional al número de agentes y no a su cuadrado. Las celdas tienen
+# además lado >= lado/√n, así que nunca hay más celdas que agentes, y el
+# radio se limita para que cada agente tenga a lo sumo VECINOS_MAXIMOS
+# vecinos esperados (los pares candidatos crecen con densidad·radio²).
+
+ESTADOS = ('S', 'I', 'R')
+
+# Desviación del giro aleatorio por paso (radianes)
+GIRO = 0.5
+
+VECINOS_MAXIMOS = 50
+
+
+def crear_simulacion(n, infectados=10, densidad=1.0, duracion=14, semilla=None):
+    """
+    Simulación nueva con `n` agentes al azar (`densidad` agentes por unidad
+    de área) e `infectados` infectados iniciales.
+    """
+    rng = np.random.default_rng(semilla)
+    lado = float(np.sqrt(n / densidad))
+    estado = np.zeros(n, dtype=np.int8)
+    reloj = np.zeros(n, dtype=np.float32)
+    iniciales = rng.choice(n, size=min(max(int(infectados), 1), n), replace=False)
+    estado[iniciales] = 1
+    reloj[iniciales] = rng.exponential(duracion, len(iniciales))
+    simulacion = {
+        'x': rng.uniform(0, lado, n).astype(np.float32),
+        'y': rng.uniform(0, lado, n).astype(np.float32),
+        'angulo': rng.uniform(0, 2 * np.pi, n).astype(np.float32),
+        'estado': estado,
+        'reloj': reloj,
+        'lado': lado,
+        'paso': 0,
+        'rng': rng,
+        'historial': {c: [] for c in ESTADOS},
+    }
+    _registrar(simulacion)
+    return simulacion
+
+
+def _registrar(simulacion):
+    conteo = np.bincount(simulacion['estado'], minlength=3)
+    for c, valor in zip(ESTADOS, conteo):
+        simulacion['historial'][c].append(int(valor))
+
+
+def limitar_radio(radio, n, lado):
+    """
+    Radio de contagio acotado para que el círculo contenga a lo sumo
+    VECINOS_MAXIMOS agentes esperados (y no pase de medio lado).
+    """
+    return float(min(radio, np.sqrt(VECINOS_MAXIMOS / np.pi) * lado / np.sqrt(n), lado / 2))
+
+
+def contactos(x, y, lado, radio, fuentes):
+    """
+    Pares (fuente, vecino) a distancia menor que `radio` en el toro, para
+    los agentes `fuentes`. Hash espacial: agentes ordenados por celda y,
+    por cada fuente, los de su celda y las 8 vecinas.
+    """
+    columnas = max(int(lado // max(radio, lado / np.sqrt(len(x)))), 1)
+    tamano = lado / columnas
+    cx = np.minimum((x / tamano).astype(np.int64), columnas - 1)
+    cy = np.minimum((y / tamano).astype(np.int64), columnas - 1)
+    celda = cy * columnas + cx
+    # El orden dentro de cada celda no importa: basta un argsort sin estabilidad
+    orden = np.argsort(celda)
+    # Inicio de cada celda en el orden (conteo acumulado)
+    inicio = np.concatenate([[0], np.cumsum(np.bincount(celda, minlength=columnas * columnas))])
+
+    desplazamientos = np.array([(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)])
+    if columnas < 3:
+        # Con menos de 3 columnas las vecinas se repiten al dar la vuelta
+        desplazamientos = np.unique(desplazamientos % columnas, axis=0)
+    vecinas = (((cy[fuentes, None] + desplazamientos[:, 1]) % columnas) * columnas
+               + (cx[fuentes, None] + desplazamientos[:, 0]) % columnas)
+    desde, hasta = inicio[vecinas].ravel(), inicio[vecinas + 1].ravel()
+    largos = hasta - desde
+    total = int(largos.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    origen = np.repeat(np.repeat(fuentes, len(desplazamientos)), largos)
+    posicion = np.repeat(desde, largos) + np.arange(total) - np.repeat(np.cumsum(largos) - largos, largos)
+    vecino = orden[posicion]
+
+    # Distancia en el toro
+    dx = np.abs(x[origen] - x[vecino])
+    dy = np.abs(y[origen] - y[vecino])
+    dx = np.minimum(dx, lado - dx)
+    dy = np.minimum(dy, lado - dy)
+    cerca = (dx * dx + dy * dy < radio * radio) & (origen != vecino)
+    return origen[cerca], vecino[cerca]
+
+
+def avanzar(simulacion, pasos=1, radio=1.0, contagio=0.1, duracion=14, velocidad=0.3):
+    """
+    Avanza `pasos` pasos en el lugar. En cada uno los agentes giran al azar
+    y avanzan `velocidad`; cada susceptible a menos de `radio` de un
+    infectado se contagia con probabilidad `contagio` por contacto, y cada
+    infectado se recupera cuando se le acaba el reloj (duración
+    exponencial de media `duracion` pasos). El radio pasa por
+    limitar_radio.
+    """
+    x, y, angulo = simulacion['x'], simulacion['y'], simulacion['angulo']
+    estado, reloj, rng, lado = simulacion['estado'], simulacion['reloj'], simulacion['rng'], simulacion['lado']
+    n = len(x)
+    radio = limitar_radio(radio, n, lado)
+
+    for _ in range(pasos):
+        angulo += rng.normal(0, GIRO, n).astype(np.float32)
+        x += velocidad * np.cos(angulo)
+        y += velocidad * np.sin(angulo)
+        np.mod(x, lado, out=x)
+        np.mod(y, lado, out=y)
+
+        infectados = np.flatnonzero(estado == 1)
+        if infectados.size:
+            _, vecino = contactos(x, y, lado, radio, infectados)
+            vecino = vecino[estado[vecino] == 0]
+            # Un susceptible con c contactos infectados escapa con (1 - p)^c
+            candidatos, c = np.unique(vecino, return_counts=True)
+            nuevos = candidatos[rng.random(candidatos.size) < 1 - (1 - contagio) ** c]
+
+            reloj[infectados] -= 1
+            estado[infectados[reloj[infectados] <= 0]] = 2
+            estado[nuevos] = 1
+            reloj[nuevos] = rng.exponential(duracion, nuevos.size)
+
+        simulacion['paso'] += 1
+        _registrar(simulacion)
+    return simulacion
+
+
+def muestra(simulacion, tamano, semilla=0):
+    """
+    Índices fijos de a lo sumo `tamano` agentes para dibujar (los mismos en
+    cada paso, así la animación sigue a cada agente).
+    """
+    n = len(simulacion['x'])
+    if n <= tamano:
+        return np.arange(n)
+    return np.sort(np.random.default_rng(semilla).choice(n, size=tamano, replace=False))
@@ -0,0 +1,127 @@
+import numpy as np
+
+# ==========================================
+# MODELOS CANDIDATOS PARA AJUSTE DE TENDENCIAS
+# ==========================================
+
+def modelo_ranking_malaria(t, a, b, c, d):
+    """
+    Modelo para ajustar la evolución de rankings/casos de malaria
+    """
+    return a * np.exp(-b * t) + c * t + d
+
+
+def modelo_logistico(t, K, r, t0, d):
+    """
+    Curva logística desplazada (creciente si r > 0, decreciente si r < 0)
+    """
+    return K / (1 + np.exp(-r * (t - t0))) + d
+
+
+def modelo_lineal(t, m, b):
+    return m * t + b
+
+
+def modelo_cuadratico(t, a, b, c):
+    return a * t**2 + b * t + c
+
+
+def modelo_cubico(t, a, b, c, d):
+    return a * t**3 + b * t**2 + c * t + d
+
+
+# Registro de modelos: nombre -> función, nombres de parámetros y
+# generador de parámetros iniciales a partir de los datos (t, y)
+MODELOS_CANDIDATOS = {
+    'Exponencial + lineal': {
+        'funcion': modelo_ranking_malaria,
+        'parametros': ['a', 'b', 'c', 'd'],
+        'p0': lambda t, y: [max(y) - min(y), 0.1, 0.1, min(y)],
+    },
+    'Logístico': {
+        'funcion': modelo_logistico,
+        'parametros': ['K', 'r', 't0', 'd'],
+        'p0': lambda t, y: [max(y) - min(y), 0.5 if y[-1] >= y[0] else -0.5, np.mean(t), min(y)],
+    },
+    'Lineal': {
+        'funcion': modelo_lineal,
+        'parametros': ['m', 'b'],
+        'p0': lambda t, y: [0.0, np.mean(y)],
+    },
+    'Polinomial (grado 2)': {
+        'funcion': modelo_cuadratico,
+        'parametros': ['a', 'b', 'c'],
+        'p0': lambda t, y: [0.0, 0.0, np.mean(y)],
+    },
+    'Polinomial (grado 3)': {
+        'funcion': modelo_cubico,
+        'parametros': ['a', 'b', 'c', 'd'],
+        'p0': lambda t, y: [0.0, 0.0, 0.0, np.mean(y)],
+    },
+}
+
+def criterios_informacion(rss, n, k):
+    """
+    AIC y BIC para mínimos cuadrados con error gaussiano:
+        AIC = n ln(RSS/n) + 2k,  BIC = n ln(RSS/n) + k ln(n)
+    """
+    log_verosimilitud = n * np.log(max(rss, 1e-300) / n)
+    return log_verosimilitud + 2 * k, log_verosimilitud + k * np.log(n)
+
+
+def ajustar_modelo(nombre, t, y):
+    """
+    Ajusta un modelo del registro y devuelve un diccionario con sus métricas.
+    Si el ajuste no converge, se marca con 'error' en lugar de lanzar excepción.
+    """
+    modelo = MODELOS_CANDIDATOS[nombre]
+    k = len(modelo['parametros'])
+    resultado = {'nombre': nombre, 'parametros': modelo['parametros'], 'k': k}
+
+    from scipy.optimize import curve_fit
+
+    try:
+        popt, _ = curve_fit(modelo['funcion'], t, y, p0=modelo['p0'](t, y), maxfev=5000)
+    except Exception as e:
+        resultado['error'] = str(e)
+        return resultado
+
+    y_pred = modelo['funcion'](t, *popt)
+    ss_res = float(np.sum((y - y_pred) ** 2))
+    ss_tot = float(np.sum((y - np.mean(y)) ** 2))
+    aic, bic = criterios_informacion(ss_res, len(y), k)
+
+    resultado.update(
+        valores=popt,
+        y_pred=y_pred,
+        rss=ss_res,
+        r_cuadrado=1 - ss_res / ss_tot if ss_tot != 0 else 0,
+        aic=aic,
+        bic=bic,
+    )
+    return resultado
+
+
+def comparar_modelos(t, y, criterio='aic', modelos=None, progreso=None):
+    """
+    Ajusta uno tras otro todos los modelos candidatos sobre la misma serie
+    y los devuelve ordenados por el criterio elegido ('aic' o 'bic').
+    Los modelos que fallan quedan al final de la lista.
+    `progreso(hechos, total)` se llama cada vez que termina un ajuste.
+
+    Los ajustes son curve_fit sobre series cortas: casi todo el tiempo es
+    Python con el GIL tomado, así que repartirlos en hilos no los acelera.
+    """
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    nombres = list(modelos or MODELOS_CANDIDATOS)
+
+    resultados = []
+    for hechos, nombre in enumerate(nombres, start=1):
+        resultados.append(ajustar_modelo(nombre, t, y))
+        if progreso is not None:
+            progreso(hechos, len(nombres))
+
+    validos = sorted((r for r in resultados if 'error' not in r), key=lambda r: r[criterio])
+    fallidos = [r for r in resultados if 'error' in r]
+    return validos + fallidos
@@ -0,0 +1,189 @@
+import gzip
+import json
+import os
+import random
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+
+from utils.cache_compartido import obtener_cache, clave_de
+
+# ==========================================
+# CAPA COMPARTIDA DE ACCESO A APIS EXTERNAS
+# ==========================================
+
+# Tiempo de vida por defecto de una respuesta en caché (segundos)
+TTL_POR_DEFECTO = 15 * 60
+
+ESPACIO_CACHE = 'api'
+
+# ==========================================
+# GRABACIÓN Y REPRODUCCIÓN DE RESPUESTAS
+# ==========================================
+#
+# API_MODO elige de dónde salen las respuestas:
+#     - 'red':        peticiones HTTP normales (por defecto)
+#     - 'grabar':     peticiones HTTP y cada respuesta se guarda como fixture
+#     - 'reproducir': solo fixtures, sin red (aulas sin conexión, pruebas
+#                     de carga deterministas); si falta uno, error de conexión
+# Los fixtures son archivos JSON comprimidos con gzip en API_FIXTURES, uno
+# por petición (URL + parámetros). API_LATENCIA_MS simula la latencia de
+# red al reproducir: un valor fijo ("200") o un rango ("100-400").
+#
+# Para grabar todos los datos de los dashboards antes de una clase:
+#     python -m utils.api
+
+MODOS = ('red', 'grabar', 'reproducir')
+
+CARPETA_FIXTURES = os.environ.get(
+    'API_FIXTURES',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures', 'api')
+)
+
+_configuracion = {
+    'modo': os.environ.get('API_MODO', 'red'),
+    'carpeta': CARPETA_FIXTURES,
+    'latencia_ms': os.environ.get('API_LATENCIA_MS', '0'),
+    'descargar': None,
+}
+
+
+def configurar(**cambios):
+    """
+    Cambia modo, carpeta, latencia_ms o descargar (función
+    descargar(url, params, timeout) que sustituye a la red al grabar).
+    Devuelve la configuración anterior para poder restaurarla.
+    """
+    anterior = dict(_configuracion)
+    for clave, valor in cambios.items():
+        if clave not in _configuracion:
+            raise KeyError(f"Opción desconocida: {clave}")
+        _configuracion[clave] = valor
+    if _configuracion['modo'] not in MODOS:
+        raise ValueError(f"API_MODO debe ser uno de {MODOS}")
+    return anterior
+
+
+def _clave_peticion(url, params):
+    return clave_de(url, tuple(sorted((params or {}).items())))
+
+
+def ruta_fixture(url, params=None, carpeta=None):
+    host = urlparse(url).netloc.replace(':', '_')
+    return os.path.join(carpeta or _configuracion['carpeta'],
+                        f"{host}-{_clave_peticion(url, params)[:16]}.json.gz")
+
+
+def _latencia():
+    valor = str(_configuracion['latencia_ms'])
+    minimo, _, maximo = valor.partition('-')
+    segundos = random.uniform(float(minimo), float(maximo or minimo)) / 1000
+    if segundos > 0:
+        time.sleep(segundos)
+
+
+def _descargar(url, params, timeout):
+    response = requests.get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def _reproducir(url, params):
+    ruta = ruta_fixture(url, params)
+    try:
+        with gzip.open(ruta, 'rt', encoding='utf-8') as f:
+            grabacion = json.load(f)
+    except FileNotFoundError:
+        raise requests.exceptions.ConnectionError(
+            f"Modo reproducir: no hay fixture para {url} {params or ''} ({ruta})"
+        ) from None
+    _latencia()
+    return grabacion['respuesta']
+
+
+def _grabar(url, params, datos):
+    ruta = ruta_fixture(url, params)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    grabacion = {'url': url, 'params': params, 'grabado': datetime.now().isoformat(timespec='seconds'),
+                 'respuesta': datos}
+    # Escritura atómica: otro worker puede estar leyendo el mismo fixture
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with gzip.open(temporal, 'wt', encoding='utf-8') as f:
+        json.dump(grabacion, f, separators=(',', ':'))
+    os.replace(temporal, ruta)
+
+
+def obtener_json(url, params=None, timeout=10, ttl=TTL_POR_DEFECTO):
+    """
+    Hace una petición GET y devuelve el JSON de la respuesta.
+    Las respuestas correctas se guardan en caché durante `ttl` segundos,
+    de modo que varias páginas o callbacks que piden lo mismo comparten
+    una única descarga (entre workers si la caché es compartida). Los
+    errores de red se propagan como requests.exceptions.RequestException.
+    Según API_MODO la respuesta puede venir de un fixture grabado.
+    """
+    cache = obtener_cache()
+    clave = _clave_peticion(url, params)
+
+    datos = cache.obtener(ESPACIO_CACHE, clave)
+    if datos is not None:
+        return datos
+
+    modo = _configuracion['modo']
+    if modo == 'reproducir':
+        datos = _reproducir(url, params)
+    else:
+        datos = (_configuracion['descargar'] or _descargar)(url, params, timeout)
+        if modo == 'grabar':
+            _grabar(url, params, datos)
+
+    cache.guardar(ESPACIO_CACHE, clave, datos, ttl)
+    return datos
+
+
+def limpiar_cache():
+    obtener_cache().limpiar(ESPACIO_CACHE)
+
+
+def _opciones(componente, id_componente):
+    # Valores de un dcc.Dropdown / dcc.RadioItems dentro de un layout
+    for hijo in componente._traverse():
+        if getattr(hijo, 'id', None) == id_componente:
+            return [opcion['value'] for opcion in hijo.options]
+    return []
+
+
+def grabar_fixtures(carpeta=CARPETA_FIXTURES, descargar=None):
+    """
+    Graba en `carpeta` las respuestas de todas las opciones de los
+    dashboards de COVID, clima y malaria y la lista de países de la
+    metapoblación. Devuelve las rutas escritas.
+    """
+    import dash
+
+    # Las páginas llaman a dash.register_page al importarse
+    dash.Dash(__name__, use_pages=True, pages_folder='')
+    from pages import pagina8, pagina9, ppagina10, ppagina15
+
+    anterior = configurar(modo='grabar', carpeta=carpeta, descargar=descargar)
+    try:
+        limpiar_cache()
+        for pais in _opciones(pagina8.layout, 'dropdown-pais'):
+            pagina8.obtener_datos_pais(pais)
+            for dias in _opciones(pagina8.layout, 'dropdown-dias-covid'):
+                pagina8.obtener_historico_pais(pais, dias)
+        for ciudad in pagina9.CIUDADES:
+            pagina9.obtener_datos_clima(ciudad)
+        ppagina10.obtener_datos_malaria_api(ppagina10.paises[0]['value'])
+        ppagina15.obtener_paises()
+    finally:
+        configurar(**anterior)
+        limpiar_cache()
+    return sorted(os.listdir(carpeta)) if os.path.isdir(carpeta) else []
+
+
+if __name__ == '__main__':
+    archivos = grabar_fixtures()
+    print(f"{len(archivos)} fixtures en {CARPETA_FIXTURES}")
@@ -0,0 +1,210 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+# ==========================================
+# CACHÉ COMPARTIDA ENTRE PROCESOS
+# ==========================================
+#
+# Con gunicorn cada worker es un proceso con su propia memoria, así que un
+# diccionario global solo sirve a ese worker. Este módulo ofrece una caché
+# clave/valor con TTL y dos almacenes:
+#     - 'memoria': diccionario del proceso (desarrollo, un solo proceso)
+#     - 'sqlite':  archivo SQLite en modo WAL, compartido por todos los
+#                  workers de la máquina
+# Se elige con la variable de entorno CACHE_BACKEND y la ruta del archivo
+# con CACHE_SQLITE. Los valores se guardan con pickle y toda entrada lleva
+# un TTL: las vencidas se purgan cada PURGA_CADA escrituras, así que nada
+# queda para siempre en memoria ni en el archivo. Sin CACHE_BACKEND se
+# usa 'memoria', salvo que haya callbacks en segundo plano (ver
+# exigir_compartida).
+#
+# `tomar` guarda una marca solo si no hay otra vigente y sirve de cerrojo
+# entre workers (vence sola a los `ttl` segundos si quien la tomó no la
+# borra).
+
+BACKEND = os.environ.get('CACHE_BACKEND')
+RUTA_SQLITE = os.environ.get(
+    'CACHE_SQLITE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'cache.sqlite3')
+)
+
+# Escrituras (de cada proceso) entre dos purgas de entradas vencidas
+PURGA_CADA = 100
+
+# Funciones gancho(espacio, acierto) que reciben cada consulta; las agrega
+# utils.metricas.instalar
+GANCHOS_CONSULTA = []
+
+
+def contar_consulta(espacio, acierto):
+    """
+    Avisa a los ganchos de un acierto o fallo de caché.
+    """
+    for gancho in GANCHOS_CONSULTA:
+        gancho(espacio, acierto)
+
+
+def _validar_ttl(ttl):
+    if ttl is None or ttl <= 0:
+        raise ValueError(f"Toda entrada de la caché necesita un TTL positivo (se recibió {ttl!r})")
+    return ttl
+
+
+class CacheMemoria:
+    def __init__(self):
+        self._datos = {}
+        self._lock = threading.Lock()
+        self._escrituras = 0
+
+    def obtener(self, espacio, clave):
+        with self._lock:
+            entrada = self._datos.get((espacio, clave))
+        if entrada is None or entrada[0] < time.time():
+            contar_consulta(espacio, False)
+            return None
+        contar_consulta(espacio, True)
+        return entrada[1]
+
+    def guardar(self, espacio, clave, valor, ttl):
+        ahora = time.time()
+        expira = ahora + _validar_ttl(ttl)
+        with self._lock:
+            self._datos[(espacio, clave)] = (expira, valor)
+            # Las entradas vencidas solo se descartan al leerlas: cada
+            # PURGA_CADA escrituras se liberan las que nadie volvió a pedir
+            self._escrituras += 1
+            if self._escrituras % PURGA_CADA == 0:
+                for k in [k for k, (fin, _) in self._datos.items() if fin < ahora]:
+                    del self._datos[k]
+
+    def tomar(self, espacio, clave, ttl):
+        with self._lock:
+            entrada = self._datos.get((espacio, clave))
+            if entrada is not None and entrada[0] > time.time():
+                return False
+            self._datos[(espacio, clave)] = (time.time() + ttl, True)
+            return True
+
+    def borrar(self, espacio, clave):
+        with self._lock:
+            self._datos.pop((espacio, clave), None)
+
+    def limpiar(self, espacio=None):
+        with self._lock:
+            if espacio is None:
+                self._datos.clear()
+            else:
+                for k in [k for k in self._datos if k[0] == espacio]:
+                    del self._datos[k]
+
+
+class CacheSQLite:
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._local = threading.local()
+        self._escrituras = 0
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        with self._conexion() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " espacio TEXT, clave TEXT, expira REAL, valor BLOB,"
+                " PRIMARY KEY (espacio, clave))"
+            )
+
+    def _conexion(self):
+        # Una conexión por hilo (y por proceso: tras un fork se abre otra)
+        con = getattr(self._local, 'con', None)
+        if con is None or self._local.pid != os.getpid():
+            con = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con, self._local.pid = con, os.getpid()
+        return con
+
+    def obtener(self, espacio, clave):
+        fila = self._conexion().execute(
+            "SELECT expira, valor FROM cache WHERE espacio = ? AND clave = ?",
+            (espacio, clave)
+        ).fetchone()
+        if fila is None or fila[0] is None or fila[0] < time.time():
+            contar_consulta(espacio, False)
+            return None
+        contar_consulta(espacio, True)
+        return pickle.loads(fila[1])
+
+    def guardar(self, espacio, clave, valor, ttl):
+        ahora = time.time()
+        expira = ahora + _validar_ttl(ttl)
+        con = self._conexion()
+        con.execute(
+            "INSERT OR REPLACE INTO cache (espacio, clave, expira, valor) VALUES (?, ?, ?, ?)",
+            (espacio, clave, expira, pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+        )
+        self._escrituras += 1
+        if self._escrituras % PURGA_CADA == 0:
+            # Sin TTL solo hay entradas de versiones anteriores: también se purgan
+            con.execute("DELETE FROM cache WHERE expira IS NULL OR expira < ?", (ahora,))
+
+    def tomar(self, espacio, clave, ttl):
+        ahora = time.time()
+        con = self._conexion()
+        con.execute("DELETE FROM cache WHERE espacio = ? AND clave = ? AND expira < ?", (espacio, clave, ahora))
+        # INSERT OR IGNORE es atómico: de varios procesos solo uno inserta
+        cursor = con.execute(
+            "INSERT OR IGNORE INTO cache (espacio, clave, expira, valor) VALUES (?, ?, ?, ?)",
+            (espacio, clave, ahora + ttl, pickle.dumps(True))
+        )
+        return cursor.rowcount == 1
+
+    def borrar(self, espacio, clave):
+        self._conexion().execute("DELETE FROM cache WHERE espacio = ? AND clave = ?", (espacio, clave))
+
+    def limpiar(self, espacio=None):
+        if espacio is None:
+            self._conexion().execute("DELETE FROM cache")
+        else:
+            self._conexion().execute("DELETE FROM cache WHERE espacio = ?", (espacio,))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def obtener_cache():
+    """
+    Devuelve la caché configurada (se crea la primera vez que se usa).
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CacheSQLite(RUTA_SQLITE) if BACKEND == 'sqlite' else CacheMemoria()
+    return _cache
+
+
+def exigir_compartida():
+    """
+    Para cuando se escribe en la caché desde subprocesos (los trabajos en
+    segundo plano): lo guardado en una caché en memoria se perdería al
+    terminar el subproceso. Sin CACHE_BACKEND pasa a 'sqlite'; con
+    'memoria' explícito es un error.
+    """
+    global BACKEND, _cache
+    if BACKEND == 'memoria':
+        raise RuntimeError("CACHE_BACKEND=memoria no sirve con callbacks en segundo plano: "
+                           "use CACHE_BACKEND=sqlite o SEGUNDO_PLANO=0")
+    with _cache_lock:
+        BACKEND = 'sqlite'
+        if isinstance(_cache, CacheMemoria):
+            _cache = None
+
+
+def clave_de(*partes):
+    """
+    Convierte una tupla de valores simples en una clave de texto estable.
+    """
+    return hashlib.sha1(repr(partes).encode('utf-8')).hexdigest()
@@ -0,0 +1,532 @@
+import ast
+import builtins
+import functools
+import math
+
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.cache_compartido import obtener_cache, clave_de
+
+# ==========================================
+# EVALUACIÓN DE CAMPOS VECTORIALES
+# ==========================================
+#
+# Las expresiones dx/dt, dy/dt se compilan una sola vez y se evalúan con
+# NumPy sobre mallas completas. Al hacer zoom el campo se vuelve a evaluar
+# solo en el tramo visible, con la misma densidad de flechas en pantalla:
+# el plano se divide en teselas de FLECHAS_TESELA x FLECHAS_TESELA puntos
+# con paso 2**nivel, y cada tesela evaluada queda en la caché compartida
+# (clave: expresiones, nivel y posición). Acercar, alejar o desplazar la
+# vista reutiliza las teselas ya calculadas y solo evalúa las nuevas.
+#
+# Las expresiones pueden tener parámetros libres (a*X - Y): cada nombre que
+# no es X, Y ni una función conocida es un parámetro con su deslizador. Al
+# moverlo solo cambia la parte de la expresión que depende de él: los
+# subtérminos que no dependen de los parámetros (np.sin(Y), X**2...) se
+# evalúan una vez por malla y quedan en la caché compartida.
+
+CONTEXTO = {
+    'np': np,
+    'math': math,
+    'sin': np.sin,
+    'cos': np.cos,
+    'exp': np.exp,
+    'log': np.log,
+    'sqrt': np.sqrt,
+    'pi': np.pi,
+}
+
+FLECHAS_TESELA = 8
+
+# Tope de flechas por vista (p. ej. con el eje y mucho más largo que el x)
+MAXIMO_FLECHAS = 4000
+
+ESPACIO_CACHE = 'campo'
+TTL_TESELAS = 30 * 60
+
+
+@functools.lru_cache(maxsize=256)
+def compilar(expresion):
+    """
+    Código compilado de una expresión en X, Y (SyntaxError si no es válida).
+    """
+    return compile(expresion, '<campo>', 'eval')
+
+
+# Nombres que no son parámetros
+RESERVADOS = set(CONTEXTO) | set(dir(builtins)) | {'X', 'Y'}
+
+# Nodos que no se pueden evaluar por separado o cuyo valor no es un arreglo
+NO_SEPARABLES = (ast.Name, ast.Constant, ast.Attribute, ast.Slice, ast.Starred,
+                 ast.Lambda, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+
+def parametros_de(*expresiones):
+    """
+    Nombres de los parámetros libres de las expresiones, ordenados (las
+    expresiones con errores de sintaxis se ignoran).
+    """
+    nombres = set()
+    for expresion in expresiones:
+        try:
+            arbol = ast.parse(expresion or '', mode='eval')
+        except SyntaxError:
+            continue
+        nombres |= {nodo.id for nodo in ast.walk(arbol) if isinstance(nodo, ast.Name)}
+    return sorted(nombres - RESERVADOS)
+
+
+class _Subterminos(ast.NodeTransformer):
+    # Sustituye cada subárbol máximo que usa la malla y no los parámetros
+    # por un nombre _t0, _t1... y guarda su código
+
+    def __init__(self, parametros):
+        self.parametros = set(parametros)
+        self.subterminos = []
+
+    def visit(self, nodo):
+        if isinstance(nodo, ast.expr) and not isinstance(nodo, NO_SEPARABLES):
+            nombres = {hijo.id for hijo in ast.walk(nodo) if isinstance(hijo, ast.Name)}
+            separable = not any(isinstance(hijo, NO_SEPARABLES[3:]) for hijo in ast.walk(nodo))
+            if separable and nombres & {'X', 'Y'} and not nombres & self.parametros:
+                nombre = f"_t{len(self.subterminos)}"
+                codigo = compile(ast.Expression(nodo), '<campo>', 'eval')
+                self.subterminos.append((nombre, codigo))
+                return ast.copy_location(ast.Name(id=nombre, ctx=ast.Load()), nodo)
+        return self.generic_visit(nodo)
+
+
+@functools.lru_cache(maxsize=256)
+def separar(expresion, parametros):
+    """
+    Divide la expresión en subtérminos independientes de `parametros` y el
+    resto. Devuelve (código del resto, ((nombre, código), ...)).
+    """
+    separador = _Subterminos(parametros)
+    arbol = ast.fix_missing_locations(separador.visit(ast.parse(expresion, mode='eval')))
+    return compile(arbol, '<campo>', 'eval'), tuple(separador.subterminos)
+
+
+def _valores_subterminos(expresion, subterminos, X, Y, malla):
+    # Subtérminos evaluados en la malla identificada por `malla`
+    if not subterminos:
+        return {}
+    cache = obtener_cache()
+    clave = clave_de('subterminos', expresion, [nombre for nombre, _ in subterminos], malla)
+    valores = cache.obtener(ESPACIO_CACHE, clave)
+    if valores is None:
+        valores = {nombre: eval(codigo, CONTEXTO, {'X': X, 'Y': Y}) for nombre, codigo in subterminos}
+        cache.guardar(ESPACIO_CACHE, clave, valores, TTL_TESELAS)
+    return valores
+
+
+def evaluar(expresion, X, Y, parametros=None, malla=None):
+    """
+    Evalúa la expresión sobre la malla; una constante se extiende a toda
+    la malla. Con `parametros` y una clave `malla` que identifique a X, Y,
+    los subtérminos que no dependen de los parámetros salen de la caché.
+    """
+    variables = {'X': X, 'Y': Y, **(parametros or {})}
+    if parametros and malla is not None:
+        resto, subterminos = separar(expresion, tuple(sorted(parametros)))
+        variables.update(_valores_subterminos(expresion, subterminos, X, Y, malla))
+        valor = eval(resto, CONTEXTO, variables)
+    else:
+        valor = eval(compilar(expresion), CONTEXTO, variables)
+    return np.broadcast_to(np.asarray(valor, dtype=float), np.shape(X))
+
+
+def evaluar_campo(fx, fy, X, Y, parametros=None, malla=None):
+    """
+    Devuelve (U, V) o campo cero si alguna expresión falla.
+    """
+    try:
+        return evaluar(fx, X, Y, parametros, malla), evaluar(fy, X, Y, parametros, malla)
+    except Exception as e:
+        print(f"Error al evaluar las funciones: {e}")
+        return np.zeros_like(X), np.zeros_like(Y)
+
+
+def tesela(fx, fy, nivel, i, j, parametros=None):
+    """
+    Malla (X, Y, U, V) de la tesela (i, j) con paso 2**nivel: sus puntos
+    están en los centros de celda, así las teselas vecinas no se solapan.
+    """
+    cache = obtener_cache()
+    clave = clave_de(fx, fy, nivel, i, j, sorted((parametros or {}).items()))
+    malla = cache.obtener(ESPACIO_CACHE, clave)
+    if malla is None:
+        paso = 2.0 ** nivel
+        indices = np.arange(FLECHAS_TESELA) + 0.5
+        X, Y = np.meshgrid((i * FLECHAS_TESELA + indices) * paso, (j * FLECHAS_TESELA + indices) * paso)
+        malla = (X, Y) + evaluar_campo(fx, fy, X, Y, parametros, ('tesela', nivel, i, j))
+        cache.guardar(ESPACIO_CACHE, clave, malla, TTL_TESELAS)
+    return malla
+
+
+def malla_vista(fx, fy, rango_x, rango_y, n, parametros=None):
+    """
+    Puntos del campo dentro de la vista con unas `n` flechas a lo ancho,
+    armados con teselas. Devuelve (X, Y, U, V, paso) como arreglos planos.
+    """
+    x0, x1 = sorted(rango_x)
+    y0, y1 = sorted(rango_y)
+    # Paso potencia de 2 más cercano a ancho/n: al hacer zoom se
+    # reutilizan las teselas mientras la escala no cambie al doble
+    nivel = int(round(math.log2(max(x1 - x0, 1e-12) / n)))
+    nivel = max(nivel, math.ceil(math.log2(math.sqrt((x1 - x0) * (y1 - y0) / MAXIMO_FLECHAS))))
+    lado = FLECHAS_TESELA * 2.0 ** nivel
+
+    partes = [
+        tesela(fx, fy, nivel, i, j, parametros)
+        for j in range(math.floor(y0 / lado), math.floor(y1 / lado) + 1)
+        for i in range(math.floor(x0 / lado), math.floor(x1 / lado) + 1)
+    ]
+    X, Y, U, V = (np.concatenate([parte[k].ravel() for parte in partes]) for k in range(4))
+    dentro = (X >= x0) & (X <= x1) & (Y >= y0) & (Y <= y1)
+    return X[dentro], Y[dentro], U[dentro], V[dentro], 2.0 ** nivel
+
+
+def traza_flechas(X, Y, U, V, longitud):
+    """
+    Todas las flechas en una sola traza: cada una es un segmento
+    (inicio, fin, hueco) con la punta como marcador en el extremo final.
+    Las flechas miden `longitud` por su magnitud relativa a la máxima.
+    """
+    X, Y, U, V = (np.ravel(a) for a in (X, Y, U, V))
+    magnitud = np.sqrt(U**2 + V**2)
+    maximo = np.max(magnitud) if magnitud.size else 0
+    # Solo se dibujan flechas donde hay magnitud
+    hay = magnitud > 0
+    X, Y, U, V = X[hay], Y[hay], U[hay], V[hay]
+    escala = longitud / maximo if maximo > 0 else 0
+    hueco = np.full(X.shape, np.nan)
+
+    return go.Scatter(
+        x=np.column_stack([X, X + U * escala, hueco]).ravel(),
+        y=np.column_stack([Y, Y + V * escala, hueco]).ravel(),
+        mode='lines+markers',
+        line=dict(color='blue', width=2),
+        marker=dict(
+            symbol='arrow',
+            size=np.tile([0, 10, 0], len(X)),
+            angleref='previous',
+            color='red'
+        ),
+        hoverinfo='skip',
+        showlegend=False
+    )
+
+
+# ==========================================
+# NULCLINAS, EQUILIBRIOS Y ESTABILIDAD
+# ==========================================
+#
+# Todo se calcula sobre la malla ya evaluada: las nulclinas U = 0 y V = 0
+# salen de marching squares vectorizado (un segmento por celda cortada),
+# las celdas donde se cortan ambas dan semillas para Newton en lote y cada
+# equilibrio se clasifica por los autovalores del jacobiano numérico.
+
+# Componente -> (nombre, color) de su nulclina
+NULCLINAS = {'U': ('Nulclina dx/dt = 0', '#2E86AB'), 'V': ('Nulclina dy/dt = 0', '#F18F01')}
+
+# Clase de equilibrio -> (color, símbolo del marcador)
+ESTILOS_EQUILIBRIO = {
+    'Nodo estable': ('#2A9D8F', 'circle'),
+    'Foco estable': ('#2A9D8F', 'circle-open-dot'),
+    'Nodo inestable': ('#C73E1D', 'circle'),
+    'Foco inestable': ('#C73E1D', 'circle-open-dot'),
+    'Punto silla': ('#6A4C93', 'x'),
+    'Centro': ('#264653', 'circle-open'),
+    'No hiperbólico': ('#888888', 'diamond-open'),
+}
+
+
+def _cortes(F, A, B, eje):
+    # Punto donde F cambia de signo en cada arista de la malla a lo largo de
+    # `eje` (0: vertical, 1: horizontal); NaN donde no hay corte
+    F0, F1 = (F[:-1], F[1:]) if eje == 0 else (F[:, :-1], F[:, 1:])
+    A0, A1 = (A[:-1], A[1:]) if eje == 0 else (A[:, :-1], A[:, 1:])
+    B0 = B[:-1] if eje == 0 else B[:, :-1]
+    corta = (F0 > 0) != (F1 > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(corta, F0 / (F0 - F1), np.nan)
+    return A0 + t * (A1 - A0), np.where(corta, B0, np.nan)
+
+
+def nulclina(X, Y, F):
+    """
+    Segmentos de la curva F = 0 sobre la malla (X, Y) como arreglos x, y
+    con NaN entre segmentos (listos para una traza de líneas).
+    """
+    F = np.where(np.isfinite(F), F, 0.0)
+    # Cortes en las aristas horizontales (x varía) y verticales (y varía)
+    hx, hy = _cortes(F, X, Y, 1)
+    vy, vx = _cortes(F, Y, X, 0)
+
+    # Aristas de cada celda: abajo, derecha, arriba, izquierda
+    px = np.stack([hx[:-1], vx[:, 1:], hx[1:], vx[:, :-1]], axis=-1).reshape(-1, 4)
+    py = np.stack([hy[:-1], vy[:, 1:], hy[1:], vy[:, :-1]], axis=-1).reshape(-1, 4)
+    corta = ~np.isnan(px)
+    cuantos = corta.sum(axis=1)
+
+    # Celdas con dos cortes: un segmento entre ellos
+    dos = np.flatnonzero(cuantos == 2)
+    orden = np.argsort(~corta[dos], axis=1, kind='stable')[:, :2]
+    inicio = (px[dos, orden[:, 0]], py[dos, orden[:, 0]])
+    fin = (px[dos, orden[:, 1]], py[dos, orden[:, 1]])
+    celdas = dos
+
+    # Celdas de silla (cuatro cortes): el signo del centro decide cómo se
+    # emparejan las aristas
+    cuatro = np.flatnonzero(cuantos == 4)
+    if cuatro.size:
+        esquinas = np.stack([F[:-1, :-1], F[:-1, 1:], F[1:, 1:], F[1:, :-1]], axis=-1).reshape(-1, 4)[cuatro]
+        separa = (esquinas.mean(axis=1) > 0) == (esquinas[:, 0] > 0)
+        a = np.where(separa, 0, 3)
+        b = np.where(separa, 1, 0)
+        c = np.where(separa, 2, 1)
+        d = np.where(separa, 3, 2)
+        inicio = tuple(np.concatenate([p, q[cuatro, a], q[cuatro, c]]) for p, q in zip(inicio, (px, py)))
+        fin = tuple(np.concatenate([p, q[cuatro, b], q[cuatro, d]]) for p, q in zip(fin, (px, py)))
+        celdas = np.concatenate([dos, cuatro, cuatro])
+
+    # Cada segmento orientado de menor a mayor (x, y) y en el orden de las
+    # celdas por filas o por columnas (el que encadene más): en tramos casi
+    # horizontales o verticales el siguiente empieza donde termina el
+    # anterior, y sobran el hueco y el punto repetido entre ambos
+    (x0, y0), (x1, y1) = inicio, fin
+    invertir = (x0 > x1) | ((x0 == x1) & (y0 > y1))
+    x0, x1 = np.where(invertir, x1, x0), np.where(invertir, x0, x1)
+    y0, y1 = np.where(invertir, y1, y0), np.where(invertir, y0, y1)
+
+    columnas = F.shape[1] - 1
+    mejor = None
+    for orden in (np.argsort(celdas, kind='stable'),
+                  np.lexsort((celdas // columnas, celdas % columnas))):
+        sigue = (x0[orden][1:] == x1[orden][:-1]) & (y0[orden][1:] == y1[orden][:-1])
+        if mejor is None or sigue.sum() > mejor[1].sum():
+            mejor = (orden, sigue)
+    orden, sigue = mejor
+    x0, y0, x1, y1 = x0[orden], y0[orden], x1[orden], y1[orden]
+    conservar = np.ones((x0.size, 3), dtype=bool)
+    conservar[:-1, 2] = ~sigue
+    conservar[1:, 0] = ~sigue
+    hueco = np.full(x0.shape, np.nan)
+    return (np.column_stack([x0, x1, hueco])[conservar],
+            np.column_stack([y0, y1, hueco])[conservar])
+
+
+def jacobiano(fx, fy, x, y, paso=1e-6, parametros=None):
+    """
+    Jacobianos (k, 2, 2) del campo en los puntos (x, y) por diferencias
+    centrales, evaluando el campo una vez por desplazamiento para todos
+    los puntos a la vez.
+    """
+    hx = paso * np.maximum(np.abs(x), 1.0)
+    hy = paso * np.maximum(np.abs(y), 1.0)
+    def campo(x, y):
+        return evaluar(fx, x, y, parametros), evaluar(fy, x, y, parametros)
+    U1, V1 = campo(x + hx, y)
+    U0, V0 = campo(x - hx, y)
+    U3, V3 = campo(x, y + hy)
+    U2, V2 = campo(x, y - hy)
+    return np.stack([
+        np.stack([(U1 - U0) / (2 * hx), (U3 - U2) / (2 * hy)], axis=-1),
+        np.stack([(V1 - V0) / (2 * hx), (V3 - V2) / (2 * hy)], axis=-1),
+    ], axis=-2)
+
+
+def equilibrios(fx, fy, x, y, iteraciones=30, tolerancia=1e-10, parametros=None):
+    """
+    Refina las semillas (x, y) con Newton en lote. Devuelve los puntos que
+    convergieron, sin repetidos.
+    """
+    x, y = np.array(x, dtype=float), np.array(y, dtype=float)
+    if x.size == 0:
+        return x, y
+    activos = np.ones(x.shape, dtype=bool)
+    for _ in range(iteraciones):
+        if not activos.any():
+            break
+        xa, ya = x[activos], y[activos]
+        U, V = evaluar(fx, xa, ya, parametros), evaluar(fy, xa, ya, parametros)
+        J = jacobiano(fx, fy, xa, ya, parametros=parametros)
+        det = J[:, 0, 0] * J[:, 1, 1] - J[:, 0, 1] * J[:, 1, 0]
+        regular = np.abs(det) > 1e-14
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dx = np.where(regular, (J[:, 1, 1] * U - J[:, 0, 1] * V) / det, 0.0)
+            dy = np.where(regular, (J[:, 0, 0] * V - J[:, 1, 0] * U) / det, 0.0)
+        x[activos] = xa - dx
+        y[activos] = ya - dy
+        # Terminan las que ya no se mueven o tienen jacobiano singular
+        escala = np.maximum(np.abs(xa) + np.abs(ya), 1.0)
+        activos[activos] = regular & (np.abs(dx) + np.abs(dy) > tolerancia * escala)
+
+    validos = np.isfinite(x) & np.isfinite(y)
+    x, y = x[validos], y[validos]
+    # Los ceros llegan como residuos de redondeo (1e-54)
+    x = np.where(np.abs(x) < tolerancia, 0.0, x)
+    y = np.where(np.abs(y) < tolerancia, 0.0, y)
+    residuo = np.abs(evaluar(fx, x, y, parametros)) + np.abs(evaluar(fy, x, y, parametros))
+    x, y = x[residuo < 1e-8], y[residuo < 1e-8]
+    # Sin repetidos: varias semillas suelen llegar al mismo equilibrio
+    escala = max(np.ptp(x), np.ptp(y), 1.0)
+    _, unicos = np.unique(np.round(np.column_stack([x, y]) / (1e-7 * escala)), axis=0, return_index=True)
+    unicos = np.sort(unicos)
+    return x[unicos], y[unicos]
+
+
+def clasificar(J, tolerancia=1e-9):
+    """
+    Clase de cada equilibrio a partir de la traza y el determinante del
+    jacobiano (autovalores de una matriz 2x2).
+    """
+    traza = J[:, 0, 0] + J[:, 1, 1]
+    det = J[:, 0, 0] * J[:, 1, 1] - J[:, 0, 1] * J[:, 1, 0]
+    escala = np.maximum(np.abs(J).max(axis=(1, 2)), 1.0)
+    clases = []
+    for t, d, e in zip(traza, det, escala):
+        if abs(d) <= tolerancia * e**2:
+            clases.append('No hiperbólico')
+        elif d < 0:
+            clases.append('Punto silla')
+        elif abs(t) <= tolerancia * e:
+            clases.append('Centro')
+        else:
+            tipo = 'Nodo' if t**2 - 4 * d >= 0 else 'Foco'
+            clases.append(f"{tipo} {'estable' if t < 0 else 'inestable'}")
+    return clases
+
+
+def analizar_campo(fx, fy, X, Y, U, V, parametros=None):
+    """
+    Nulclinas, equilibrios dentro de la malla y su clasificación:
+    {'nulclinas': {'U': (x, y), 'V': (x, y)},
+     'equilibrios': [{'x', 'y', 'clase', 'autovalores'}]}
+    """
+    # Semillas: centros de las celdas donde cambian de signo U y V
+    def cambia(F):
+        esquinas = np.stack([F[:-1, :-1], F[:-1, 1:], F[1:, 1:], F[1:, :-1]]) > 0
+        return esquinas.any(axis=0) & ~esquinas.all(axis=0)
+    celdas = cambia(U) & cambia(V)
+    cx = (X[:-1, :-1] + X[1:, 1:]) / 2
+    cy = (Y[:-1, :-1] + Y[1:, 1:]) / 2
+    x, y = equilibrios(fx, fy, cx[celdas], cy[celdas], parametros=parametros)
+
+    # Solo los que caen dentro del dominio dibujado
+    dentro = (x >= X.min()) & (x <= X.max()) & (y >= Y.min()) & (y <= Y.max())
+    x, y = x[dentro], y[dentro]
+    J = jacobiano(fx, fy, x, y, parametros=parametros) if x.size else np.zeros((0, 2, 2))
+    autovalores = np.linalg.eigvals(J) if x.size else np.zeros((0, 2))
+
+    return {
+        'nulclinas': {'U': nulclina(X, Y, U), 'V': nulclina(X, Y, V)},
+        'equilibrios': [
+            {'x': float(xi) + 0.0, 'y': float(yi) + 0.0, 'clase': clase, 'autovalores': tuple(complex(l) for l in lam)}
+            for xi, yi, clase, lam in zip(x, y, clasificar(J), autovalores)
+        ],
+    }
+
+
+def trazas_analisis(analisis):
+    """
+    Trazas de las nulclinas (una por componente) y de los equilibrios (una
+    por clase, vacía y fuera de la leyenda si no hay equilibrios de esa
+    clase: así siempre son las mismas trazas y se pueden reemplazar con
+    un Patch).
+    """
+    trazas = [
+        go.Scatter(
+            x=x, y=y,
+            mode='lines',
+            line=dict(color=NULCLINAS[componente][1], width=2),
+            name=NULCLINAS[componente][0],
+            hoverinfo='skip'
+        )
+        for componente, (x, y) in analisis['nulclinas'].items()
+    ]
+    for clase, (color, simbolo) in ESTILOS_EQUILIBRIO.items():
+        puntos = [e for e in analisis['equilibrios'] if e['clase'] == clase]
+        trazas.append(go.Scatter(
+            x=[e['x'] for e in puntos],
+            y=[e['y'] for e in puntos],
+            mode='markers',
+            marker=dict(color=color, symbol=simbolo, size=13, line=dict(width=2, color=color)),
+            name=clase,
+            showlegend=bool(puntos),
+            text=[_texto_autovalores(e['autovalores']) for e in puntos],
+            hovertemplate=f"<b>{clase}</b><br>(%{{x:.4g}}, %{{y:.4g}})<br>%{{text}}<extra></extra>"
+        ))
+    return trazas
+
+
+def _texto_autovalores(autovalores):
+    partes = []
+    for l in autovalores:
+        if abs(l.imag) < 1e-12:
+            partes.append(f"{l.real:.4g}")
+        else:
+            partes.append(f"{l.real:.4g} {'+' if l.imag >= 0 else '-'} {abs(l.imag):.4g}i")
+    return "λ = " + ", ".join(partes)
+
+
+# ==========================================
+# CAPAS: MAGNITUD, DIVERGENCIA Y ROTACIONAL
+# ==========================================
+#
+# Mapas de calor bajo las flechas calculados sobre la misma malla ya
+# evaluada: las derivadas salen de diferencias finitas (np.gradient), sin
+# volver a evaluar las expresiones. Se envía un solo go.Heatmap con a lo
+# sumo PUNTOS_CAPA puntos por eje.
+
+# Capa -> (nombre, escala de colores, centrada en cero)
+CAPAS = {
+    'magnitud': ('Magnitud |F|', 'Viridis', False),
+    'divergencia': ('Divergencia ∂P/∂x + ∂Q/∂y', 'RdBu_r', True),
+    'rotacional': ('Rotacional ∂Q/∂x - ∂P/∂y', 'PuOr_r', True),
+}
+
+PUNTOS_CAPA = 100
+
+
+def capa_escalar(capa, X, Y, U, V):
+    """
+    Valores de la capa `capa` (ver CAPAS) en cada punto de la malla.
+    """
+    if capa == 'magnitud':
+        return np.hypot(U, V)
+    x, y = X[0, :], Y[:, 0]
+    # En la malla de meshgrid el eje 0 es y y el eje 1 es x
+    if capa == 'divergencia':
+        return np.gradient(U, x, axis=1, edge_order=2) + np.gradient(V, y, axis=0, edge_order=2)
+    if capa == 'rotacional':
+        return np.gradient(V, x, axis=1, edge_order=2) - np.gradient(U, y, axis=0, edge_order=2)
+    raise ValueError(f"Capa desconocida: {capa}")
+
+
+def traza_capa(capa, X, Y, U, V, puntos=PUNTOS_CAPA):
+    """
+    go.Heatmap de la capa `capa` sobre la malla, tomando uno de cada
+    ceil(lado / puntos) puntos por eje.
+    """
+    nombre, escala, centrada = CAPAS[capa]
+    Z = capa_escalar(capa, X, Y, U, V)
+    paso = max(-(-max(Z.shape) // puntos), 1)
+    Z = Z[::paso, ::paso]
+    finitos = Z[np.isfinite(Z)]
+    extremo = float(np.max(np.abs(finitos))) if finitos.size else 0.0
+    return go.Heatmap(
+        x=X[0, ::paso],
+        y=Y[::paso, 0],
+        z=Z,
+        colorscale=escala,
+        zmid=0 if centrada and extremo > 0 else None,
+        zsmooth='best',
+        opacity=0.6,
+        name=nombre,
+        showlegend=False,
+        colorbar=dict(title=dict(text=nombre.split(' ')[0], side='right'), thickness=12, len=0.8),
+        hovertemplate=f"(%{{x:.3g}}, %{{y:.3g}})<br>{nombre}: %{{z:.4g}}<extra></extra>"
+    )
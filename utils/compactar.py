@@ -0,0 +1,205 @@
+import base64
+import functools
+import time
+from datetime import date
+
+import numpy as np
+
+# ==========================================
+# FIGURAS COMPACTAS PARA EL NAVEGADOR
+# ==========================================
+#
+# Un go.Figure se envía como JSON con cada número en doble precisión
+# completa, fechas con hora "T00:00:00" y la plantilla entera (estilos de
+# ~30 tipos de traza aunque la figura use uno). compactar_figura devuelve
+# un diccionario equivalente para dcc.Graph con:
+#     - arreglos largos como binario tipado en base64 ({'dtype', 'bdata'}),
+#       que Plotly.js decodifica directamente: enteros con el tipo más
+#       pequeño que los contiene y reales en float32 (~7 cifras
+#       significativas en cada valor)
+#     - arreglos cortos como listas con cada número redondeado a CIFRAS
+#       cifras significativas propias (no respecto al máximo: en un eje
+#       logarítmico los valores pequeños se ven igual que los grandes)
+#     - fechas sin hora cuando todas caen a medianoche
+#     - sin propiedades con su valor por defecto ni estilos de plantilla
+#       de tipos de traza que la figura no usa
+
+CIFRAS = 6
+
+# Por debajo de este tamaño el binario no ahorra frente a la lista
+MINIMO_BINARIO = 16
+
+# Tipos enteros que entiende Plotly.js, de menor a mayor
+TIPOS_ENTEROS = ('i1', 'u1', 'i2', 'u2', 'i4', 'u4')
+
+# Valores por defecto de Plotly.js que no hace falta enviar
+DEFECTOS_TRAZA = {'visible': True, 'showlegend': True, 'opacity': 1, 'fill': 'none'}
+DEFECTOS_LINEA = {'dash': 'solid'}
+
+# Funciones gancho(segundos) que reciben la duración de cada función
+# decorada con figuras_compactas (sin compactar ni serializar); las agrega
+# utils.metricas.instalar
+GANCHOS_DURACION = []
+
+
+def _binario(arreglo, dtype):
+    datos = {'dtype': dtype, 'bdata': base64.b64encode(arreglo.astype(dtype).tobytes()).decode('ascii')}
+    if arreglo.ndim > 1:
+        datos['shape'] = ', '.join(str(n) for n in arreglo.shape)
+    return datos
+
+
+def _desde_binario(datos):
+    arreglo = np.frombuffer(base64.b64decode(datos['bdata']), dtype=datos['dtype'])
+    if 'shape' in datos:
+        arreglo = arreglo.reshape([int(n) for n in str(datos['shape']).split(',')])
+    return arreglo
+
+
+def _fechas(valores):
+    try:
+        fechas = np.asarray(valores, dtype='datetime64[s]')
+    except (TypeError, ValueError):
+        return None
+    if np.all(fechas == fechas.astype('datetime64[D]')):
+        fechas = fechas.astype('datetime64[D]')
+    return fechas.astype(str).tolist()
+
+
+def compactar_arreglo(valores, cifras=CIFRAS):
+    """
+    Versión compacta de un arreglo de datos de una traza, o None si no es
+    numérico ni de fechas (texto, categorías, colores...).
+    """
+    if isinstance(valores, dict):
+        # Plotly ya serializa los arreglos de NumPy como binario en float64
+        if 'bdata' not in valores or 'dtype' not in valores:
+            return None
+        valores = _desde_binario(valores)
+    if len(valores) == 0:
+        return None
+    primero = valores[0] if not isinstance(valores, np.ndarray) else None
+    if isinstance(primero, (str, bool)) or isinstance(valores, np.ndarray) and valores.dtype.kind in 'USOb':
+        return None
+    if isinstance(primero, date) or isinstance(valores, np.ndarray) and valores.dtype.kind == 'M':
+        return _fechas(valores)
+    try:
+        arreglo = np.asarray(valores, dtype=float)
+    except (TypeError, ValueError):
+        return None
+    if arreglo.ndim > 2:
+        return None
+
+    finitos = arreglo[np.isfinite(arreglo)]
+    if finitos.size == 0:
+        return None
+    maximo = float(np.max(np.abs(finitos)))
+    if finitos.size == arreglo.size and np.all(finitos == np.round(finitos)):
+        if arreglo.size < MINIMO_BINARIO:
+            return arreglo.astype(np.int64).tolist()
+        minimo = float(np.min(finitos))
+        for dtype in TIPOS_ENTEROS:
+            limites = np.iinfo(dtype)
+            if limites.min <= minimo and maximo <= limites.max:
+                return _binario(arreglo, dtype)
+    if arreglo.size < MINIMO_BINARIO:
+        # Listas (anidadas si es 2D) con None en lugar de NaN
+        arreglo = _redondear(arreglo, cifras)
+        return np.where(np.isfinite(arreglo), arreglo, None).tolist()
+    return _binario(arreglo, 'f4')
+
+
+def _redondear(arreglo, cifras):
+    # `cifras` cifras significativas en cada valor; la magnitud se acota
+    # para que la escala no desborde con valores subnormales
+    magnitud = np.zeros(arreglo.shape)
+    no_nulos = np.isfinite(arreglo) & (arreglo != 0)
+    magnitud[no_nulos] = np.floor(np.log10(np.abs(arreglo[no_nulos])))
+    escala = 10.0 ** (cifras - 1 - np.maximum(magnitud, -290))
+    return np.round(arreglo * escala) / escala
+
+
+def _compactar_objeto(objeto, cifras):
+    # Copia de una traza (y de sus objetos anidados: marker, line, error_y...)
+    # con los arreglos compactados; la figura original no se modifica
+    compacto = {}
+    for clave, valor in objeto.items():
+        if isinstance(valor, dict) and 'bdata' not in valor:
+            valor = _compactar_objeto(valor, cifras)
+        elif isinstance(valor, (list, tuple, np.ndarray, dict)) and clave not in ('colorscale',):
+            arreglo = compactar_arreglo(valor, cifras)
+            if arreglo is not None:
+                valor = arreglo
+        compacto[clave] = valor
+    return compacto
+
+
+def _es_defecto(valor, defectos, clave):
+    if clave not in defectos:
+        return False
+    defecto = defectos[clave]
+    # True == 1 en Python: un booleano solo iguala a otro booleano
+    if isinstance(defecto, bool) or isinstance(valor, bool):
+        return valor is defecto
+    return valor == defecto
+
+
+def compactar_figura(figura, cifras=CIFRAS):
+    """
+    Devuelve la figura (go.Figure o diccionario) como diccionario compacto
+    para dcc.Graph.
+    """
+    if hasattr(figura, 'to_plotly_json'):
+        # go.Figure: traza por traza en lugar de figura.to_plotly_json(), que
+        # pasa cada arreglo de NumPy a base64 en float64 solo para que aquí
+        # se vuelva a decodificar
+        figura = {'data': [traza.to_plotly_json() for traza in figura.data],
+                  'layout': figura.layout.to_plotly_json(),
+                  'frames': [cuadro.to_plotly_json() for cuadro in figura.frames]}
+    layout = dict(figura.get('layout', {}))
+
+    tipos = set()
+    datos = []
+    for traza in figura.get('data', []):
+        tipos.add(traza.get('type', 'scatter'))
+        traza = {clave: valor for clave, valor in traza.items() if not _es_defecto(valor, DEFECTOS_TRAZA, clave)}
+        if isinstance(traza.get('line'), dict):
+            traza['line'] = {k: v for k, v in traza['line'].items() if not _es_defecto(v, DEFECTOS_LINEA, k)}
+        datos.append(_compactar_objeto(traza, cifras))
+
+    plantilla = layout.get('template')
+    if hasattr(plantilla, 'to_plotly_json'):
+        plantilla = plantilla.to_plotly_json()
+    if isinstance(plantilla, dict) and 'data' in plantilla:
+        layout['template'] = {
+            **plantilla,
+            'data': {tipo: estilos for tipo, estilos in plantilla['data'].items() if tipo in tipos}
+        }
+
+    compacta = {'data': datos, 'layout': layout}
+    if figura.get('frames'):
+        compacta['frames'] = figura['frames']
+    return compacta
+
+
+def figuras_compactas(funcion):
+    """
+    Decorador para callbacks: compacta cada figura que devuelve la función
+    (sola o dentro de la tupla de salidas).
+    """
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        inicio = time.perf_counter()
+        resultado = funcion(*args, **kwargs)
+        for gancho in GANCHOS_DURACION:
+            gancho(time.perf_counter() - inicio)
+        if isinstance(resultado, (list, tuple)):
+            return type(resultado)(_compactar_si_figura(valor) for valor in resultado)
+        return _compactar_si_figura(resultado)
+    return envoltura
+
+
+def _compactar_si_figura(valor):
+    if hasattr(valor, 'to_plotly_json') and hasattr(valor, 'layout'):
+        return compactar_figura(valor)
+    return valor
@@ -0,0 +1,192 @@
+import numpy as np
+
+from utils.modelos import njit, _sir_nucleo
+from utils.cache_compartido import obtener_cache, clave_de
+
+# ==========================================
+# CONTROL ÓPTIMO: VACUNACIÓN Y DISTANCIAMIENTO
+# ==========================================
+#
+# SIRV en fracciones de la población con dos controles acotados:
+#     v(t) ∈ [0, v_max]  fracción de susceptibles vacunados por día
+#     u(t) ∈ [0, u_max]  reducción relativa de β por distanciamiento
+#
+#     S' = -β(1-u)SI - vS,  I' = β(1-u)SI - γI,  R' = γI,  V' = vS
+#
+# Se minimiza J = ∫ (A·I + B/2·v² + C/2·u²) dt en [0, T] con el barrido
+# adelante-atrás del principio de Pontryagin:
+#     1. con los controles actuales se integran los estados hacia adelante
+#        (RK4, núcleo SIR de utils.modelos más la vacunación);
+#     2. se integran los adjuntos hacia atrás desde λ(T) = 0:
+#            λS' = (λS - λI) β(1-u) I + λS v
+#            λI' = -A + (λS - λI) β(1-u) S + λI γ
+#     3. los controles nuevos minimizan el hamiltoniano:
+#            v = clip(λS S / B, 0, v_max),  u = clip((λI - λS) β S I / C, 0, u_max)
+#        y se promedian con los anteriores hasta que dejan de cambiar
+#        (el peso de los nuevos baja si el barrido oscila).
+# Todos los arreglos tienen una columna por escala de costos: el mismo
+# barrido resuelve a la vez un lote de problemas (la frontera entre
+# infecciones evitadas y costo) y el costo por paso se reparte entre ellos.
+# Los bucles en el tiempo se compilan con numba si está instalado, como
+# los núcleos de utils.modelos.
+
+CONTROLES = {'vacunacion': 'Vacunación', 'distanciamiento': 'Distanciamiento'}
+
+# Escalas del costo de los controles (B y C) que se resuelven juntas; la
+# del medio es la pedida
+ESCALAS = np.logspace(-1, 1, 9)
+
+ESPACIO_CACHE = 'control'
+TTL_CONTROL = 60 * 60
+
+TOLERANCIA = 1e-3
+MAXIMO_ITERACIONES = 150
+PESO_MINIMO = 0.02
+PESO_MAXIMO = 0.5
+
+
+@njit(cache=True)
+def _derivada_estados(x, u, v, beta, gamma):
+    # Núcleo compartido del SIR con β reducida, más la vacunación
+    S = x[0]
+    dx = np.empty_like(x)
+    dx[:3] = _sir_nucleo(x[:3], beta * (1 - u), gamma, 1.0)
+    dx[0] -= v * S
+    dx[3] = v * S
+    return dx
+
+
+@njit(cache=True)
+def _derivada_adjuntos(lam, x, u, v, beta, gamma, A):
+    S, I = x[0], x[1]
+    efectiva = beta * (1 - u)
+    diferencia = lam[0] - lam[1]
+    dlam = np.empty_like(lam)
+    dlam[0] = diferencia * efectiva * I + lam[0] * v
+    dlam[1] = -A + diferencia * efectiva * S + lam[1] * gamma
+    return dlam
+
+
+@njit(cache=True)
+def integrar_estados(x0, u, v, dt, beta, gamma):
+    """
+    Estados (4, pasos + 1, lote) con RK4 y controles (pasos + 1, lote)
+    dados en la malla (el valor en medio de cada paso es el promedio de
+    sus extremos).
+    """
+    pasos = u.shape[0] - 1
+    x = np.empty((4, pasos + 1, u.shape[1]))
+    for j in range(4):
+        x[j, 0] = x0[j]
+    for k in range(pasos):
+        um, vm = 0.5 * (u[k] + u[k + 1]), 0.5 * (v[k] + v[k + 1])
+        xk = x[:, k].copy()
+        k1 = _derivada_estados(xk, u[k], v[k], beta, gamma)
+        k2 = _derivada_estados(xk + 0.5 * dt * k1, um, vm, beta, gamma)
+        k3 = _derivada_estados(xk + 0.5 * dt * k2, um, vm, beta, gamma)
+        k4 = _derivada_estados(xk + dt * k3, u[k + 1], v[k + 1], beta, gamma)
+        x[:, k + 1] = xk + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+    return x
+
+
+@njit(cache=True)
+def integrar_adjuntos(x, u, v, dt, beta, gamma, A):
+    """
+    Adjuntos (λS, λI) hacia atrás con RK4 desde λ(T) = 0.
+    """
+    pasos = u.shape[0] - 1
+    lam = np.zeros((2, pasos + 1, u.shape[1]))
+    for k in range(pasos, 0, -1):
+        um, vm = 0.5 * (u[k] + u[k - 1]), 0.5 * (v[k] + v[k - 1])
+        xm = 0.5 * (x[:, k] + x[:, k - 1])
+        lk = lam[:, k].copy()
+        k1 = _derivada_adjuntos(lk, x[:, k].copy(), u[k], v[k], beta, gamma, A)
+        k2 = _derivada_adjuntos(lk - 0.5 * dt * k1, xm, um, vm, beta, gamma, A)
+        k3 = _derivada_adjuntos(lk - 0.5 * dt * k2, xm, um, vm, beta, gamma, A)
+        k4 = _derivada_adjuntos(lk - dt * k3, x[:, k - 1].copy(), u[k - 1], v[k - 1], beta, gamma, A)
+        lam[:, k - 1] = lk - dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+    return lam
+
+
+def _residuo(nuevo, actual, cota):
+    # Cambio relativo de cada columna, Σ|nuevo - actual| / Σ|nuevo|; un
+    # control casi nulo se compara con el 1 % de su cota
+    escala = np.maximum(np.abs(nuevo).sum(axis=0), 0.01 * cota * len(nuevo))
+    return np.abs(nuevo - actual).sum(axis=0) / np.maximum(escala, 1e-12)
+
+
+def costo(t, x, u, v, A, B, C):
+    """
+    Infecciones (∫ I dt), costo de los controles y J total por columna.
+    """
+    infecciones = np.trapezoid(x[1], t, axis=0)
+    controles = np.trapezoid(0.5 * B * v ** 2 + 0.5 * C * u ** 2, t, axis=0)
+    return infecciones, controles, A * infecciones + controles
+
+
+def optimizar_control(beta, gamma, i0, T, A=1.0, B=50.0, C=0.5, v_max=0.02, u_max=0.7,
+                      controles=('vacunacion', 'distanciamiento'), dt=1.0, progreso=None):
+    """
+    Controles óptimos para las escalas de costo ESCALAS (B y C
+    multiplicados por cada una). Devuelve {'t', 'x' (4, tiempos, escalas),
+    'u', 'v', 'sin_control' (4, tiempos), 'escalas', 'infecciones',
+    'costo_controles', 'J', 'iteraciones', 'convergio' (por escala),
+    'desde_cache'}. Con medidas baratas el problema puede tener dos
+    óptimos locales (contener el brote o dejarlo pasar) y el barrido de
+    esa escala oscilar entre ellos: queda con convergio False.
+    """
+    cache = obtener_cache()
+    clave = clave_de('control', beta, gamma, i0, T, A, B, C, v_max, u_max, tuple(sorted(controles)), dt,
+                     tuple(ESCALAS))
+    guardado = cache.obtener(ESPACIO_CACHE, clave)
+    if guardado is not None:
+        return dict(guardado, desde_cache=True)
+
+    pasos = max(int(np.ceil(T / dt)), 1)
+    dt = T / pasos
+    t = np.linspace(0, T, pasos + 1)
+    x0 = np.array([1 - i0, i0, 0.0, 0.0])
+    lote = len(ESCALAS)
+    Bk, Ck = B * ESCALAS, C * ESCALAS
+    v_max = v_max if 'vacunacion' in controles else 0.0
+    u_max = u_max if 'distanciamiento' in controles else 0.0
+
+    u = np.zeros((pasos + 1, lote))
+    v = np.zeros((pasos + 1, lote))
+    x = integrar_estados(x0, u, v, dt, beta, gamma)
+    sin_control = x[:, :, 0].copy()
+    # Peso de los controles nuevos en el promedio, por columna: se reduce
+    # a la mitad cuando el residuo crece (el barrido empieza a oscilar) y
+    # vuelve a subir mientras baja
+    peso = np.full(lote, 0.5)
+    residuo_anterior = np.full(lote, np.inf)
+    convergio = np.zeros(lote, dtype=bool)
+
+    for iteracion in range(1, MAXIMO_ITERACIONES + 1):
+        lam = integrar_adjuntos(x, u, v, dt, beta, gamma, A)
+        S, I = x[0], x[1]
+        v_nuevo = np.clip(lam[0] * S / Bk, 0, v_max)
+        u_nuevo = np.clip((lam[1] - lam[0]) * beta * S * I / Ck, 0, u_max)
+        # Punto fijo: los controles ya minimizan el hamiltoniano de su trayectoria
+        residuo = np.maximum(_residuo(u_nuevo, u, u_max), _residuo(v_nuevo, v, v_max))
+        convergio = residuo <= TOLERANCIA
+        if progreso is not None:
+            progreso(int(convergio.sum()), lote)
+        if convergio.all():
+            break
+        peso = np.where(residuo > residuo_anterior, np.maximum(peso / 2, PESO_MINIMO),
+                        np.minimum(peso * 1.25, PESO_MAXIMO))
+        residuo_anterior = residuo
+        u = u + peso * (u_nuevo - u)
+        v = v + peso * (v_nuevo - v)
+        x = integrar_estados(x0, u, v, dt, beta, gamma)
+
+    infecciones, costo_controles, J = costo(t, x, u, v, A, Bk, Ck)
+    resultado = {
+        't': t, 'x': x, 'u': u, 'v': v, 'sin_control': sin_control, 'escalas': ESCALAS,
+        'infecciones': infecciones, 'costo_controles': costo_controles, 'J': J,
+        'infecciones_sin_control': float(np.trapezoid(sin_control[1], t)),
+        'iteraciones': iteracion, 'convergio': convergio,
+    }
+    cache.guardar(ESPACIO_CACHE, clave, resultado, TTL_CONTROL)
+    return dict(resultado, desde_cache=False)
@@ -0,0 +1,197 @@
+import functools
+import hashlib
+
+import numpy as np
+
+# ==========================================
+# REACCIÓN-DIFUSIÓN EN UNA MALLA 2D
+# ==========================================
+#
+# Cada compartimento es un campo (n, n) de fracciones de la población
+# local sobre un dominio periódico de `lado` x `lado` km. En cada paso la
+# reacción (SIR o logística) se avanza explícitamente y la difusión:
+#     - 'fft': implícitamente en el espacio de Fourier,
+#              û ← (û + dt R̂) / (1 + dt D |k|²), estable con cualquier dt;
+#     - 'estencil': con el laplaciano de 5 puntos, en subpasos que cumplan
+#              dt D / h² <= 1/4. Si harían falta más de MAXIMO_SUBPASOS
+#              (difusión grande o malla fina) se usa 'fft'.
+# Las FFT son de scipy.fft en float32 (sin pasar a doble precisión), así
+# que un paso de una malla de 512 x 512 tarda unos pocos milisegundos.
+#
+# Para dibujar, cuadro() reduce el campo a la resolución de la pantalla y
+# lo cuantiza a uint8. Los últimos MAXIMO_CUADROS se guardan aparte del
+# dominio, cada uno en una de MAXIMO_CUADROS ranuras (búfer circular):
+# guardar_cuadro solo elige la ranura, así el dominio que se guarda en cada
+# paso lleva los campos y no las imágenes.
+
+MODELOS = {'sir': 'SIR con difusión', 'logistico': 'Logístico (Fisher-KPP)'}
+
+METODOS = {'fft': 'Implícito (FFT)', 'estencil': 'Explícito (estencil de 5 puntos)'}
+
+# Campos de cada modelo y el que se dibuja
+CAMPOS = {'sir': ('S', 'I'), 'logistico': ('u',)}
+CAMPO_DIBUJADO = {'sir': 'I', 'logistico': 'u'}
+
+# Cuadros recientes que se guardan para repasarlos
+MAXIMO_CUADROS = 60
+
+MAXIMO_SUBPASOS = 64
+
+# Fracción inicial en cada foco y su radio en celdas
+FRACCION_FOCO = 0.1
+RADIO_FOCO = 3
+
+
+def crear_dominio(n, lado, modelo='sir', focos=3, semilla=0):
+    """
+    Campos iniciales: población susceptible (o vacía en el logístico) con
+    `focos` focos circulares al azar.
+    """
+    rng = np.random.default_rng(semilla)
+    i, j = np.ogrid[:n, :n]
+    foco = np.zeros((n, n), dtype=np.float32)
+    for fi, fj in rng.integers(0, n, size=(max(int(focos), 1), 2)):
+        # Distancia periódica al centro del foco
+        di = np.minimum(np.abs(i - fi), n - np.abs(i - fi))
+        dj = np.minimum(np.abs(j - fj), n - np.abs(j - fj))
+        foco[di ** 2 + dj ** 2 <= RADIO_FOCO ** 2] = FRACCION_FOCO
+
+    if modelo == 'sir':
+        campos = {'S': 1 - foco, 'I': foco}
+    else:
+        campos = {'u': foco}
+    return {
+        'campos': campos,
+        'modelo': modelo,
+        'n': n,
+        'lado': float(lado),
+        'h': lado / n,
+        't': 0.0,
+        'paso': 0,
+        'medias': {c: [float(campos[c].mean())] for c in campos},
+        'cuadros': 0,
+        'huella': None,
+    }
+
+
+@functools.lru_cache(maxsize=4)
+def _k2(n, lado):
+    # |k|² de la malla para rfft2 (última dimensión a la mitad); no va en
+    # el dominio para no guardarlo en la caché en cada paso
+    from scipy import fft
+
+    k = 2 * np.pi * fft.fftfreq(n, d=lado / n)
+    kr = 2 * np.pi * fft.rfftfreq(n, d=lado / n)
+    return (k[:, None] ** 2 + kr[None, :] ** 2).astype(np.float32)
+
+
+def metodo_efectivo(dominio, dt, D, metodo):
+    """
+    'fft' si el estencil necesitaría más de MAXIMO_SUBPASOS subpasos por
+    paso; si no, el método pedido.
+    """
+    if metodo == 'estencil' and 4 * dt * D / (dominio['h'] ** 2) > MAXIMO_SUBPASOS:
+        return 'fft'
+    return metodo
+
+
+def reaccion(campos, modelo, parametros):
+    """
+    Términos de reacción de cada campo.
+    """
+    if modelo == 'sir':
+        S, I = campos['S'], campos['I']
+        incidencia = parametros['beta'] * S * I
+        return {'S': -incidencia, 'I': incidencia - parametros['gamma'] * I}
+    u = campos['u']
+    return {'u': parametros['r'] * u * (1 - u)}
+
+
+def laplaciano(u, h):
+    """
+    Laplaciano periódico de 5 puntos.
+    """
+    resultado = -4 * u
+    resultado[1:] += u[:-1]
+    resultado[0] += u[-1]
+    resultado[:-1] += u[1:]
+    resultado[-1] += u[0]
+    resultado[:, 1:] += u[:, :-1]
+    resultado[:, 0] += u[:, -1]
+    resultado[:, :-1] += u[:, 1:]
+    resultado[:, -1] += u[:, 0]
+    resultado /= h * h
+    return resultado
+
+
+def avanzar(dominio, pasos, dt, parametros, metodo='fft'):
+    """
+    Avanza `pasos` pasos de tamaño `dt` (días) en el lugar. `parametros`
+    lleva la difusión 'D' (km²/día) y las tasas del modelo; el método pasa
+    por metodo_efectivo.
+    """
+    from scipy import fft
+
+    campos, modelo, D = dominio['campos'], dominio['modelo'], parametros['D']
+    n, h = dominio['n'], dominio['h']
+    metodo = metodo_efectivo(dominio, dt, D, metodo)
+    dt = np.float32(dt)
+    if metodo == 'fft':
+        divisor = 1 + dt * np.float32(D) * _k2(n, dominio['lado'])
+    else:
+        subpasos = max(int(np.ceil(4 * dt * D / (h * h))), 1)
+        dt_sub = dt / subpasos
+
+    for _ in range(pasos):
+        cambio = reaccion(campos, modelo, parametros)
+        for c in campos:
+            u = campos[c] + dt * cambio[c]
+            if metodo == 'fft':
+                u = fft.irfft2(fft.rfft2(u) / divisor, s=(n, n))
+            else:
+                for _ in range(subpasos):
+                    u += dt_sub * D * laplaciano(u, h)
+            campos[c] = np.clip(u, 0, 1, out=u)
+        dominio['t'] += float(dt)
+        dominio['paso'] += 1
+        for c in campos:
+            dominio['medias'][c].append(float(campos[c].mean()))
+    return dominio
+
+
+def cuadro(campo, resolucion, maximo=1.0):
+    """
+    Campo reducido a lo sumo a `resolucion` x `resolucion` celdas
+    (promedio por bloques) y cuantizado a uint8 (0 = 0, 255 = `maximo`).
+    """
+    n = campo.shape[0]
+    bloque = max(int(np.ceil(n / resolucion)), 1)
+    if bloque > 1:
+        m = n // bloque
+        campo = campo[:m * bloque, :m * bloque].reshape(m, bloque, m, bloque).mean(axis=(1, 3))
+    return np.round(np.clip(campo / maximo, 0, 1) * 255).astype(np.uint8)
+
+
+def guardar_cuadro(dominio, resolucion, maximo=1.0):
+    """
+    Cuantiza el campo dibujado y, si cambió respecto al último (se compara
+    una huella), lo cuenta en el dominio. Devuelve (ranura, cuadro) con la
+    ranura del búfer circular donde guardarlo, o None si es igual al
+    anterior.
+    """
+    nuevo = cuadro(dominio['campos'][CAMPO_DIBUJADO[dominio['modelo']]], resolucion, maximo)
+    huella = hashlib.sha1(nuevo.tobytes()).hexdigest()
+    if huella == dominio['huella']:
+        return None
+    dominio['huella'] = huella
+    ranura = dominio['cuadros'] % MAXIMO_CUADROS
+    dominio['cuadros'] += 1
+    return ranura, nuevo
+
+
+def ranura_cuadro(total, indice):
+    """
+    Ranura del búfer del cuadro `indice` (0 = el más viejo que se conserva)
+    cuando se guardaron `total` cuadros.
+    """
+    return (total - min(total, MAXIMO_CUADROS) + indice) % MAXIMO_CUADROS
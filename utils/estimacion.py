@@ -0,0 +1,253 @@
+import collections
+import hashlib
+import threading
+import numpy as np
+from scipy.integrate import solve_ivp
+from scipy.optimize import least_squares
+
+from utils.cache_compartido import obtener_cache, clave_de
+
+# ==========================================
+# ESTIMACIÓN DE β(t) / R_t A PARTIR DE SERIES OBSERVADAS
+# ==========================================
+#
+# Cada ventana de `ventana` días se ajusta por mínimos cuadrados restringidos
+# por la EDO. Los parámetros libres son θ = (β, I₀), con I₀ los infectados
+# al inicio de la ventana; γ (y σ en SEIR) se fijan para que el problema sea
+# identificable. La observación es la incidencia acumulada Z(t), que se añade
+# al sistema como un estado más. El gradiente del residuo se obtiene
+# integrando las ecuaciones de sensibilidad junto al modelo:
+#     s' = J_x(x) s + ∂f/∂θ,   s(t₀) = ∂x₀/∂θ
+
+
+def _sir(x, beta, gamma, sigma, N):
+    S, I, Z = x
+    inc = beta * S * I / N
+    return np.array([-inc, inc - gamma * I, inc])
+
+
+def _sir_jac(x, beta, gamma, sigma, N):
+    S, I, Z = x
+    return np.array([
+        [-beta * I / N, -beta * S / N, 0.0],
+        [beta * I / N, beta * S / N - gamma, 0.0],
+        [beta * I / N, beta * S / N, 0.0],
+    ])
+
+
+def _sir_dbeta(x, beta, gamma, sigma, N):
+    S, I, Z = x
+    return np.array([-S * I / N, S * I / N, S * I / N])
+
+
+def _sir_x0(S_base, I0, gamma, sigma):
+    return np.array([S_base - I0, I0, 0.0]), np.array([-1.0, 1.0, 0.0])
+
+
+def _seir(x, beta, gamma, sigma, N):
+    S, E, I, Z = x
+    inc = beta * S * I / N
+    return np.array([-inc, inc - sigma * E, sigma * E - gamma * I, sigma * E])
+
+
+def _seir_jac(x, beta, gamma, sigma, N):
+    S, E, I, Z = x
+    return np.array([
+        [-beta * I / N, 0.0, -beta * S / N, 0.0],
+        [beta * I / N, -sigma, beta * S / N, 0.0],
+        [0.0, sigma, -gamma, 0.0],
+        [0.0, sigma, 0.0, 0.0],
+    ])
+
+
+def _seir_dbeta(x, beta, gamma, sigma, N):
+    S, E, I, Z = x
+    return np.array([-S * I / N, S * I / N, 0.0, 0.0])
+
+
+def _seir_x0(S_base, I0, gamma, sigma):
+    # Expuestos en cuasi-equilibrio con los infectados: E₀ ≈ (γ/σ) I₀
+    rho = gamma / sigma
+    return (np.array([S_base - (1 + rho) * I0, rho * I0, I0, 0.0]),
+            np.array([-(1 + rho), rho, 1.0, 0.0]))
+
+
+MODELOS = {
+    'sir': {'f': _sir, 'jac': _sir_jac, 'dbeta': _sir_dbeta, 'x0': _sir_x0, 'I': 1},
+    'seir': {'f': _seir, 'jac': _seir_jac, 'dbeta': _seir_dbeta, 'x0': _seir_x0, 'I': 2},
+}
+
+
+def integrar_con_sensibilidades(modelo, beta, I0, S_base, N, gamma, sigma, dias):
+    """
+    Integra el modelo y sus sensibilidades respecto a (β, I₀) en t = 0..dias.
+    `S_base` es la población aún no contada como caso al inicio (N - C₀).
+    Devuelve (x, s_beta, s_I0), cada uno de forma (n_estados, dias + 1).
+    """
+    m = MODELOS[modelo]
+    x0, dx0_dI0 = m['x0'](S_base, I0, gamma, sigma)
+    n = len(x0)
+
+    def rhs(t, z):
+        x = z[:n]
+        J = m['jac'](x, beta, gamma, sigma, N)
+        return np.concatenate([
+            m['f'](x, beta, gamma, sigma, N),
+            J @ z[n:2 * n] + m['dbeta'](x, beta, gamma, sigma, N),
+            J @ z[2 * n:],
+        ])
+
+    z0 = np.concatenate([x0, np.zeros(n), dx0_dI0])
+    t_eval = np.arange(dias + 1)
+    sol = solve_ivp(rhs, (0, dias), z0, t_eval=t_eval, rtol=1e-6, atol=1e-6)
+    return sol.y[:n], sol.y[n:2 * n], sol.y[2 * n:]
+
+
+def ajustar_ventana(modelo, acumulados, N, gamma, sigma, theta0):
+    """
+    Ajusta (β, I₀) a una ventana de casos acumulados observados.
+    `acumulados[0]` es el acumulado al inicio de la ventana.
+    """
+    dias = len(acumulados) - 1
+    observados = acumulados[1:] - acumulados[0]
+    escala = max(observados[-1], 1.0)
+    S_base = N - acumulados[0]
+    cache = {}
+
+    def integrar(theta):
+        clave = tuple(theta)
+        if clave not in cache:
+            cache.clear()
+            cache[clave] = integrar_con_sensibilidades(
+                modelo, theta[0], theta[1], S_base, N, gamma, sigma, dias
+            )
+        return cache[clave]
+
+    def residuos(theta):
+        x, _, _ = integrar(theta)
+        return (x[-1, 1:] - observados) / escala
+
+    def jacobiano(theta):
+        _, s_beta, s_I0 = integrar(theta)
+        return np.column_stack([s_beta[-1, 1:], s_I0[-1, 1:]]) / escala
+
+    limite_I0 = max(S_base * 0.5, 2.0)
+    theta0 = np.clip(theta0, [1e-4, 1.0], [5.0, limite_I0 - 1])
+    ajuste = least_squares(
+        residuos, theta0, jac=jacobiano,
+        bounds=([0.0, 1e-3], [5.0, limite_I0]),
+        x_scale='jac'
+    )
+    x, _, _ = integrar(ajuste.x)
+    return ajuste.x, x
+
+
+# Resultados ya calculados por (país, modelo, ventana, γ, σ, paso), indexados
+# por la fecha final de cada ventana. Al llegar días nuevos solo se ajustan
+# las ventanas que faltan, partiendo de la solución de la ventana anterior.
+# Cada resultado lleva la huella de los datos de su ventana: si la serie se
+# corrige, la ventana se vuelve a ajustar. La última ventana (la que termina
+# en el último día, fuera de la alineación) cambia con cada dato nuevo y no
+# se guarda. Las ventanas nuevas se publican en la caché compartida para los
+# demás workers; en memoria quedan las MAXIMO_SERIES series más recientes.
+_ESTIMACIONES = collections.OrderedDict()
+ESPACIO_CACHE = 'estimaciones'
+TTL_ESTIMACIONES = 24 * 60 * 60
+MAXIMO_SERIES = 16
+_estimaciones_lock = threading.Lock()
+
+
+def _huella(datos):
+    return hashlib.sha1(np.ascontiguousarray(datos).tobytes()).hexdigest()
+
+
+def estimar_rt(clave, fechas, acumulados, N, modelo='sir', ventana=21,
+               gamma=1 / 7, sigma=1 / 5.2, paso=7, desde=0, progreso=None):
+    """
+    Estima la serie β(t) y R_t = (β/γ)·S/N sobre ventanas móviles.
+
+    Parámetros:
+        - clave: identificador de la serie (p. ej. el país)
+        - fechas, acumulados: línea de tiempo (datetime) de casos acumulados
+        - N: población
+        - ventana: días por ventana de ajuste
+        - paso: separación en días entre ventanas consecutivas
+        - desde: índice mínimo de fecha final a estimar
+        - progreso: función opcional progreso(hechas, total) por ventana
+
+    Devuelve un diccionario con listas 'fechas', 'beta', 'rt' e 'I'.
+    """
+    # Las series acumuladas publicadas a veces bajan por correcciones
+    acumulados = np.maximum.accumulate(np.asarray(acumulados, dtype=float))
+    clave_cache = (clave, modelo, ventana, round(gamma, 6), round(sigma, 6), paso)
+    cache = obtener_cache()
+    clave_compartida = clave_de(*clave_cache)
+    with _estimaciones_lock:
+        calculadas = _ESTIMACIONES.setdefault(clave_cache, {})
+        _ESTIMACIONES.move_to_end(clave_cache)
+        while len(_ESTIMACIONES) > MAXIMO_SERIES:
+            _ESTIMACIONES.popitem(last=False)
+        calculadas.update(cache.obtener(ESPACIO_CACHE, clave_compartida) or {})
+        # Copia para leer sin el candado; las ventanas nuevas van aparte
+        conocidas = dict(calculadas)
+    nuevas = {}
+    resultados = {}
+
+    # Las ventanas terminan en fechas alineadas a múltiplos de `paso` (más el
+    # último día), así un día nuevo no desplaza las ventanas ya ajustadas
+    ultimo = len(acumulados) - 1
+    finales = [i for i in range(max(ventana, desde), ultimo + 1)
+               if fechas[i].toordinal() % paso == 0 or i == ultimo]
+
+    idx_I = MODELOS[modelo]['I']
+    anterior = None
+    for k, fin in enumerate(finales):
+        if progreso is not None:
+            progreso(k, len(finales))
+        fecha = fechas[fin]
+        inicio = fin - ventana
+        huella = _huella(acumulados[inicio:fin + 1])
+        guardada = conocidas.get(fecha)
+        if guardada is not None and guardada.get('huella') == huella:
+            anterior = resultados[fecha] = guardada
+            continue
+
+        if anterior is None:
+            incidencia = (acumulados[fin] - acumulados[inicio]) / ventana
+            theta = np.array([gamma * 1.5, max(incidencia / gamma, 1.0)])
+        else:
+            # Arranque en caliente: β anterior e I₀ leído de la trayectoria
+            # de la ventana anterior en el nuevo día de inicio
+            desfase = min(max((fecha - anterior['fecha']).days, 0), ventana)
+            theta = np.array([anterior['beta'], max(anterior['I_tray'][desfase], 1.0)])
+
+        theta_opt, x = ajustar_ventana(
+            modelo, acumulados[inicio:fin + 1], N, gamma, sigma, theta
+        )
+        beta = theta_opt[0]
+        anterior = resultados[fecha] = {
+            'fecha': fecha,
+            'beta': float(beta),
+            'rt': float(beta / gamma * x[0, -1] / N),
+            'I': float(x[idx_I, -1]),
+            'I_tray': x[idx_I],
+            'huella': huella,
+        }
+        if fecha.toordinal() % paso == 0:
+            nuevas[fecha] = anterior
+
+    if progreso is not None:
+        progreso(len(finales), len(finales))
+    if nuevas:
+        with _estimaciones_lock:
+            calculadas.update(nuevas)
+            guardar = dict(calculadas)
+        cache.guardar(ESPACIO_CACHE, clave_compartida, guardar, TTL_ESTIMACIONES)
+
+    fechas_ok = [fechas[i] for i in finales]
+    return {
+        'fechas': fechas_ok,
+        'beta': [resultados[f]['beta'] for f in fechas_ok],
+        'rt': [resultados[f]['rt'] for f in fechas_ok],
+        'I': [resultados[f]['I'] for f in fechas_ok],
+    }
@@ -0,0 +1,235 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# ==========================================
+# SIMULACIÓN ESTOCÁSTICA DE ENSAMBLES SIR / SEIR
+# ==========================================
+#
+# Todas las realizaciones avanzan a la vez: el estado es un arreglo por
+# compartimento con una entrada por realización. Para poblaciones pequeñas
+# se usa el algoritmo exacto de Gillespie (cada realización con su propio
+# reloj) y para poblaciones grandes tau-leaping con cadenas binomiales,
+# que nunca producen compartimentos negativos.
+
+# Población a partir de la cual 'auto' cambia de Gillespie a tau-leaping
+LIMITE_GILLESPIE = 2000
+
+# Procesos para repartir el ensamble (1 = todo en el proceso actual)
+PROCESOS_ENSAMBLE = int(os.environ.get('ENSAMBLE_PROCESOS', 1))
+
+# Límites de lo que se acepta de un formulario: la trayectoria diaria
+# ocupa 16 bytes por día y realización (4 compartimentos en int32; el
+# doble si la población no cabe en int32), y resumir_ensamble hace copias
+# del mismo tamaño
+MAXIMO_REALIZACIONES = 20000
+MAXIMO_DIAS = 3650
+PRESUPUESTO_CELDAS = 5 * 10 ** 6
+
+_pool = None
+_pid_pool = None
+
+
+def _registro_inicial(estado, dias):
+    # La suma de compartimentos se conserva: int32 basta y ocupa la mitad
+    # salvo que la población total lo desborde
+    total = sum(int(valores.max()) for valores in estado.values())
+    tipo = np.int32 if total <= np.iinfo(np.int32).max else np.int64
+    registro = {}
+    for nombre, valores in estado.items():
+        registro[nombre] = np.empty((dias + 1, len(valores)), dtype=tipo)
+        registro[nombre][0] = valores
+    return registro
+
+
+def _tau_leap(estado, beta, sigma, gamma, N, dias, dt, rng, progreso=None):
+    S, E, I, R = (estado[c].copy() for c in 'SEIR')
+    registro = _registro_inicial(estado, dias)
+    pasos_por_dia = max(int(round(1 / dt)), 1)
+    dt = 1 / pasos_por_dia
+    p_inc = 1 - np.exp(-sigma * dt) if sigma is not None else 0.0
+    p_rec = 1 - np.exp(-gamma * dt)
+
+    for dia in range(1, dias + 1):
+        for _ in range(pasos_por_dia):
+            p_inf = 1 - np.exp(-beta * I / N * dt)
+            nuevos_inf = rng.binomial(S, p_inf)
+            nuevos_rec = rng.binomial(I, p_rec)
+            S -= nuevos_inf
+            R += nuevos_rec
+            if sigma is None:
+                I += nuevos_inf - nuevos_rec
+            else:
+                nuevos_inc = rng.binomial(E, p_inc)
+                E += nuevos_inf - nuevos_inc
+                I += nuevos_inc - nuevos_rec
+        for c, valores in zip('SEIR', (S, E, I, R)):
+            registro[c][dia] = valores
+        if progreso is not None:
+            progreso(dia, dias)
+    return registro
+
+
+def _gillespie(estado, beta, sigma, gamma, N, dias, rng, progreso=None):
+    S, E, I, R = (estado[c].astype(np.int64) for c in 'SEIR')
+    M = len(S)
+    registro = _registro_inicial(estado, dias)
+    t = np.zeros(M)
+    siguiente_dia = np.ones(M, dtype=np.int64)
+    indices = np.arange(M)
+    a_inc = np.zeros(M)
+    dia_reportado = 0
+
+    while True:
+        a_inf = beta * S * I / N
+        if sigma is not None:
+            a_inc = sigma * E
+        a_rec = gamma * I
+        a0 = a_inf + a_inc + a_rec
+
+        # Sin eventos posibles el estado queda fijo hasta el final
+        con_eventos = a0 > 0
+        t_nuevo = np.full(M, np.inf)
+        t_nuevo[con_eventos] = t[con_eventos] + rng.exponential(1 / a0[con_eventos])
+
+        # El estado actual vale en [t, t_nuevo): se registra en esos días enteros
+        while True:
+            pendiente = (siguiente_dia <= dias) & (siguiente_dia <= t_nuevo)
+            if not pendiente.any():
+                break
+            idx = indices[pendiente]
+            dia = siguiente_dia[pendiente]
+            registro['S'][dia, idx] = S[pendiente]
+            registro['E'][dia, idx] = E[pendiente]
+            registro['I'][dia, idx] = I[pendiente]
+            registro['R'][dia, idx] = R[pendiente]
+            siguiente_dia[pendiente] += 1
+
+        # Avance: el día completo por todas las realizaciones
+        if progreso is not None and siguiente_dia.min() - 1 > dia_reportado:
+            dia_reportado = int(siguiente_dia.min()) - 1
+            progreso(dia_reportado, dias)
+
+        activos = t_nuevo <= dias
+        if not activos.any():
+            break
+
+        u = rng.random(M) * a0
+        es_inf = u < a_inf
+        es_inc = ~es_inf & (u < a_inf + a_inc)
+        infeccion = (activos & es_inf).astype(np.int64)
+        incubacion = (activos & es_inc).astype(np.int64)
+        recuperacion = (activos & ~es_inf & ~es_inc).astype(np.int64)
+
+        S -= infeccion
+        if sigma is None:
+            I += infeccion
+        else:
+            E += infeccion - incubacion
+            I += incubacion
+        I -= recuperacion
+        R += recuperacion
+        t = np.where(activos, t_nuevo, t)
+
+    return registro
+
+
+def _simular_bloque(estado0, beta, sigma, gamma, N, dias, realizaciones, metodo, dt, semilla,
+                    progreso=None):
+    rng = np.random.default_rng(semilla)
+    estado = {c: np.full(realizaciones, v, dtype=np.int64) for c, v in estado0.items()}
+    if metodo == 'gillespie':
+        return _gillespie(estado, beta, sigma, gamma, N, dias, rng, progreso)
+    return _tau_leap(estado, beta, sigma, gamma, N, dias, dt, rng, progreso)
+
+
+def _obtener_pool(procesos):
+    # Un pool heredado por fork (trabajos en segundo plano) no es utilizable
+    global _pool, _pid_pool
+    if _pool is None or _pool._max_workers != procesos or _pid_pool != os.getpid():
+        _pool = ProcessPoolExecutor(max_workers=procesos)
+        _pid_pool = os.getpid()
+    return _pool
+
+
+def limitar_ensamble(t_max, realizaciones):
+    """
+    Días (entre 1 y MAXIMO_DIAS) y realizaciones (entre 1 y
+    MAXIMO_REALIZACIONES) acotados, y un mensaje de error si su producto
+    supera PRESUPUESTO_CELDAS (None si no).
+    """
+    dias = int(min(max(np.ceil(t_max), 1), MAXIMO_DIAS))
+    realizaciones = int(min(max(realizaciones, 1), MAXIMO_REALIZACIONES))
+    if (dias + 1) * realizaciones > PRESUPUESTO_CELDAS:
+        return dias, realizaciones, (f"{realizaciones:,} realizaciones de {dias:,} días superan el máximo de "
+                                     f"{PRESUPUESTO_CELDAS:,} días·realización: reduce una de las dos")
+    return dias, realizaciones, None
+
+
+def simular_ensamble(S0, I0, R0, beta, gamma, t_max, N=None, sigma=None, E0=0,
+                     realizaciones=1000, metodo='auto', dt=0.1, semilla=None,
+                     procesos=None, progreso=None):
+    """
+    Simula un ensamble de realizaciones estocásticas del modelo SIR
+    (o SEIR si se da sigma) con tasa de infección β·S·I/N.
+
+    Parámetros:
+        - metodo: 'gillespie', 'tau' o 'auto' (según el tamaño de N)
+        - dt: paso del tau-leaping (días)
+        - procesos: número de procesos para repartir las realizaciones
+        - progreso: función progreso(hechos, total) para informar el avance
+
+    Devuelve un diccionario con el vector de días 't' y, por compartimento,
+    un arreglo (días + 1, realizaciones) con la trayectoria diaria. Los días
+    y las realizaciones pasan por limitar_ensamble (ValueError si superan
+    el presupuesto).
+    """
+    N = float(N if N is not None else S0 + E0 + I0 + R0)
+    dias, realizaciones, error = limitar_ensamble(t_max, realizaciones)
+    if error is not None:
+        raise ValueError(error)
+    if metodo == 'auto':
+        metodo = 'gillespie' if N <= LIMITE_GILLESPIE else 'tau'
+    estado0 = {'S': int(S0), 'E': int(E0), 'I': int(I0), 'R': int(R0)}
+
+    procesos = max(1, min(procesos or PROCESOS_ENSAMBLE, realizaciones))
+    semillas = np.random.SeedSequence(semilla).spawn(procesos)
+    tamanos = [len(b) for b in np.array_split(np.arange(realizaciones), procesos)]
+    argumentos = [
+        (estado0, beta, sigma, gamma, N, dias, tam, metodo, dt, sem)
+        for tam, sem in zip(tamanos, semillas)
+    ]
+
+    if procesos == 1:
+        bloques = [_simular_bloque(*argumentos[0], progreso=progreso)]
+    else:
+        futuros = [_obtener_pool(procesos).submit(_simular_bloque, *a) for a in argumentos]
+        for hechos, _ in enumerate(as_completed(futuros), start=1):
+            if progreso is not None:
+                progreso(hechos, procesos)
+        bloques = [futuro.result() for futuro in futuros]
+
+    resultado = {c: np.concatenate([b[c] for b in bloques], axis=1) for c in 'SEIR'}
+    resultado['t'] = np.arange(dias + 1)
+    resultado['metodo'] = metodo
+    return resultado
+
+
+def resumir_ensamble(ensamble, cuantiles=(5, 25, 50, 75, 95), umbral_brote=0.05):
+    """
+    Calcula bandas de cuantiles por día y la probabilidad de extinción
+    temprana: fracción de realizaciones en las que la infección desaparece
+    (E = I = 0) habiendo alcanzado a menos de `umbral_brote` de la población.
+    """
+    N = ensamble['S'][0, 0] + ensamble['E'][0, 0] + ensamble['I'][0, 0] + ensamble['R'][0, 0]
+    resumen = {'t': ensamble['t'], 'metodo': ensamble['metodo']}
+    for c in 'SEIR':
+        resumen[c] = dict(zip(cuantiles, np.percentile(ensamble[c], cuantiles, axis=1)))
+
+    infectados_totales = ensamble['S'][0] - ensamble['S'][-1]
+    extinta = (ensamble['E'][-1] + ensamble['I'][-1]) == 0
+    resumen['prob_extincion'] = float(np.mean(extinta & (infectados_totales < umbral_brote * N)))
+    resumen['picos'] = ensamble['I'].max(axis=0)
+    resumen['dias_pico'] = ensamble['I'].argmax(axis=0)
+    resumen['realizaciones'] = ensamble['S'].shape[1]
+    return resumen
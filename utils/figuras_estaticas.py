@@ -0,0 +1,113 @@
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import threading
+
+from plotly.utils import PlotlyJSONEncoder
+
+from utils.compactar import compactar_figura
+from utils.cache_compartido import contar_consulta
+
+# ==========================================
+# FIGURAS ESTÁTICAS PRECALCULADAS
+# ==========================================
+#
+# Las páginas sin interacción no necesitan construir un go.Figure en cada
+# arranque: la figura se serializa una vez a un diccionario JSON plano y
+# dcc.Graph lo recibe tal cual, sin pasar por la validación de Plotly.
+# Con `python -m utils.figuras_estaticas` se generan los artefactos en
+# CARPETA_FIGURAS; si falta alguno (o quedó desactualizado respecto al
+# código que lo construye) se construye una sola vez por proceso.
+
+CARPETA_FIGURAS = os.environ.get(
+    'FIGURAS_ESTATICAS',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'figuras')
+)
+
+# Cambia con el formato del artefacto para invalidar los generados antes
+FORMATO = 'compacto-1'
+
+# Constructores registrados: nombre -> función que devuelve un go.Figure
+CONSTRUCTORES = {}
+
+_figuras = {}
+_figuras_lock = threading.Lock()
+
+
+def figura_estatica(nombre):
+    """
+    Decorador que registra el constructor de una figura estática.
+    """
+    def registrar(constructor):
+        CONSTRUCTORES[nombre] = constructor
+        return constructor
+    return registrar
+
+
+def _firma(constructor):
+    # Cambia si cambia el código del constructor o el formato
+    return hashlib.sha1((FORMATO + inspect.getsource(constructor)).encode('utf-8')).hexdigest()
+
+
+def _ruta(nombre):
+    return os.path.join(CARPETA_FIGURAS, f"{nombre}.json")
+
+
+def _serializar(figura):
+    # Figura compacta (ver utils/compactar.py) como dict JSON plano sin validar
+    return json.loads(json.dumps(compactar_figura(figura), cls=PlotlyJSONEncoder))
+
+
+def obtener_figura(nombre):
+    """
+    Devuelve la figura como diccionario listo para dcc.Graph: desde memoria,
+    desde el artefacto en disco o, si no existe, construyéndola.
+    """
+    if nombre in _figuras:
+        contar_consulta('figuras', True)
+        return _figuras[nombre]
+    with _figuras_lock:
+        if nombre in _figuras:
+            contar_consulta('figuras', True)
+            return _figuras[nombre]
+        constructor = CONSTRUCTORES[nombre]
+        firma = _firma(constructor)
+        figura = None
+        try:
+            with open(_ruta(nombre), encoding='utf-8') as f:
+                artefacto = json.load(f)
+            if artefacto.get('firma') == firma:
+                figura = artefacto['figura']
+        except (OSError, ValueError):
+            pass
+        contar_consulta('figuras', figura is not None)
+        if figura is None:
+            figura = _serializar(constructor())
+        _figuras[nombre] = figura
+        return figura
+
+
+def construir_artefactos(modulos=('pages.pagina1', 'pages.pagina2')):
+    """
+    Importa las páginas con figuras estáticas y escribe cada figura en
+    CARPETA_FIGURAS junto con la firma de su constructor.
+    """
+    import dash
+
+    # Las páginas llaman a dash.register_page al importarse
+    dash.Dash(__name__, use_pages=True, pages_folder='')
+    for modulo in modulos:
+        importlib.import_module(modulo)
+
+    os.makedirs(CARPETA_FIGURAS, exist_ok=True)
+    for nombre, constructor in CONSTRUCTORES.items():
+        artefacto = {'firma': _firma(constructor), 'figura': _serializar(constructor())}
+        with open(_ruta(nombre), 'w', encoding='utf-8') as f:
+            json.dump(artefacto, f, separators=(',', ':'))
+        print(f"{nombre}: {_ruta(nombre)}")
+
+
+if __name__ == '__main__':
+    construir_artefactos()
@@ -139,4 +139,52 @@ def generar_grafico_logistico(P0, r, K, t_max):
         showline=True, linecolor='black', linewidth=2, mirror=True,
     )
     
-    return fig
\ No newline at end of file
+    return fig
+
+def generar_grafico_ensamble(resumen, compartimentos, bandas=((5, 95), (25, 75))):
+    """
+    Grafica un ensamble estocástico: mediana por compartimento y bandas
+    de cuantiles sombreadas.
+    compartimentos: lista de (letra, nombre, color), p. ej. ('I', 'Infectados (I)', 'red')
+    """
+    t = resumen['t']
+    fig = go.Figure()
+    
+    for letra, nombre, color in compartimentos:
+        cuantiles = resumen[letra]
+        for q_bajo, q_alto in bandas:
+            fig.add_trace(go.Scatter(
+                x=t, y=cuantiles[q_bajo],
+                mode='lines',
+                line=dict(width=0, color=color),
+                showlegend=False,
+                hoverinfo='skip'
+            ))
+            fig.add_trace(go.Scatter(
+                x=t, y=cuantiles[q_alto],
+                mode='lines',
+                line=dict(width=0, color=color),
+                fill='tonexty',
+                opacity=0.15,
+                name=f'{nombre} P{q_bajo}-P{q_alto}',
+                showlegend=False,
+                hoverinfo='skip'
+            ))
+        
+        fig.add_trace(go.Scatter(
+            x=t, y=cuantiles[50],
+            mode='lines',
+            name=f'{nombre} (mediana)',
+            line=dict(color=color, width=3),
+            hovertemplate=f'<b>{nombre}</b><br>Día: ' + '%{x}<br>Mediana: %{y:.0f}<extra></extra>'
+        ))
+    
+    fig.update_layout(
+        xaxis_title="Tiempo (días)",
+        yaxis_title="Número de personas",
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01),
+        margin=dict(l=50, r=50, t=50, b=50),
+        height=500
+    )
+    
+    return fig
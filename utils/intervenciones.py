@@ -0,0 +1,170 @@
+import numpy as np
+
+from utils.modelos import sir_rhs, sir_jac, seir_rhs, seir_jac
+from utils.cache_compartido import obtener_cache, clave_de
+
+# ==========================================
+# CALENDARIOS DE INTERVENCIÓN β(t) POR TRAMOS
+# ==========================================
+#
+# Un calendario es una lista de puntos (t, β) ordenados por t y un tipo:
+#     - 'escalon': β constante desde cada punto hasta el siguiente
+#     - 'rampa':   β lineal entre puntos consecutivos
+# Antes del primer punto y después del último β se mantiene constante.
+#
+# β(t) es discontinua (o no derivable) en los puntos, así que se integra
+# por tramos entre ellos, cada uno con solve_ivp desde el estado final del
+# anterior. Cada tramo queda en la caché con una clave que encadena la de
+# todos los tramos previos: al editar una intervención tardía los tramos
+# anteriores tienen la misma clave y solo se integra desde ese punto.
+
+TIPOS = {'escalon': 'Escalón', 'rampa': 'Rampa', 'dibujada': 'Dibujada a mano'}
+
+# Lado derecho, jacobiano y compartimentos de cada modelo; el primer
+# parámetro de rhs es siempre β
+MODELOS = {
+    'sir': (sir_rhs, sir_jac, ('S', 'I', 'R')),
+    'seir': (seir_rhs, seir_jac, ('S', 'E', 'I', 'R')),
+}
+
+ESPACIO_CACHE = 'intervenciones'
+TTL_TRAMOS = 30 * 60
+
+
+def beta_en(calendario, t):
+    """
+    β(t) del calendario en los instantes `t`.
+    """
+    puntos = np.asarray(calendario['puntos'], dtype=float)
+    t = np.asarray(t, dtype=float)
+    if calendario['tipo'] == 'escalon':
+        k = np.searchsorted(puntos[:, 0], t, side='right') - 1
+        return puntos[np.maximum(k, 0), 1]
+    return np.interp(t, puntos[:, 0], puntos[:, 1])
+
+
+def tramos(calendario, t_max):
+    """
+    Tramos (a, b, β(a), β(b⁻)) entre los puntos del calendario dentro de
+    (0, t_max). En un escalón β(a) == β(b⁻).
+    """
+    cortes = [t for t, _ in calendario['puntos'] if 0 < t < t_max]
+    bordes = np.unique(np.concatenate([[0.0], cortes, [float(t_max)]]))
+    resultado = []
+    for a, b in zip(bordes[:-1], bordes[1:]):
+        beta_a = float(beta_en(calendario, a))
+        beta_b = beta_a if calendario['tipo'] == 'escalon' else float(beta_en(calendario, b))
+        resultado.append((float(a), float(b), beta_a, beta_b))
+    return resultado
+
+
+def _integrar_tramo(modelo, y0, a, b, beta_a, beta_b, parametros, rtol):
+    from scipy.integrate import solve_ivp
+
+    rhs, jac, _ = MODELOS[modelo]
+    pendiente = (beta_b - beta_a) / (b - a)
+
+    def f(t, y):
+        return rhs(t, y, beta_a + pendiente * (t - a), *parametros)
+
+    def J(t, y):
+        return jac(t, y, beta_a + pendiente * (t - a), *parametros)
+
+    # Días enteros del tramo y su final exacto
+    t_eval = np.union1d(np.arange(np.ceil(a), b), [b])
+    sol = solve_ivp(f, (a, b), y0, method='LSODA', jac=J, t_eval=t_eval, rtol=rtol, atol=rtol)
+    return {'t': sol.t, 'y': sol.y, 'nfev': sol.nfev}
+
+
+def simular_calendario(modelo, y0, parametros, calendario, t_max, rtol=1e-8):
+    """
+    Integra el modelo con β(t) del calendario. `parametros` son los demás
+    argumentos de rhs tras β ((γ, N) en SIR, (σ, γ, N) en SEIR).
+
+    Devuelve {'t', 'y' (compartimentos x tiempos), 'beta', 'tramos',
+    'recalculados', 'nfev'}: 'recalculados' cuenta los tramos que no
+    estaban en la caché y 'nfev' las evaluaciones que hicieron.
+    """
+    cache = obtener_cache()
+    clave = clave_de('calendario', modelo, tuple(map(float, y0)), tuple(map(float, parametros)), rtol)
+    estado = np.asarray(y0, dtype=float)
+    partes_t, partes_y = [], []
+    recalculados, nfev = 0, 0
+    lista = tramos(calendario, t_max)
+    for a, b, beta_a, beta_b in lista:
+        # La clave del tramo depende de la de todos los anteriores
+        clave = clave_de(clave, a, b, beta_a, beta_b)
+        tramo = cache.obtener(ESPACIO_CACHE, clave)
+        if tramo is None:
+            tramo = _integrar_tramo(modelo, estado, a, b, beta_a, beta_b, parametros, rtol)
+            cache.guardar(ESPACIO_CACHE, clave, tramo, TTL_TRAMOS)
+            recalculados += 1
+            nfev += tramo['nfev']
+        # El primer instante de cada tramo es el último del anterior
+        inicio = 0 if not partes_t else 1
+        partes_t.append(tramo['t'][inicio:])
+        partes_y.append(tramo['y'][:, inicio:])
+        estado = tramo['y'][:, -1]
+
+    t = np.concatenate(partes_t)
+    return {
+        't': t,
+        'y': np.concatenate(partes_y, axis=1),
+        'beta': beta_en(calendario, t),
+        'tramos': lista,
+        'recalculados': recalculados,
+        'nfev': nfev,
+    }
+
+
+def calendario_predefinido(tipo, beta, inicio, fin, reduccion):
+    """
+    Calendario de una intervención que reduce β en `reduccion` (0 a 1):
+    en escalón entre los días `inicio` y `fin`; en rampa bajando de forma
+    lineal de `inicio` a `fin` y manteniéndose después.
+    """
+    reducido = beta * (1 - reduccion)
+    inicio = max(float(inicio), 0.0)
+    fin = max(float(fin), inicio)
+    if tipo == 'escalon':
+        puntos = [(0.0, beta), (inicio, reducido), (fin, beta)]
+    elif fin > inicio:
+        puntos = [(0.0, beta), (inicio, beta), (fin, reducido)]
+    else:
+        # Rampa de duración cero: baja de golpe en `inicio`
+        tipo, puntos = 'escalon', [(0.0, beta), (inicio, reducido)]
+    # Los puntos ya van en orden de t; en un mismo t vale el último (una
+    # intervención desde el día 0 reemplaza al β base). Ordenar las tuplas
+    # desempataría por β y podría dejar el β sin reducir
+    unicos = {}
+    for t, valor in puntos:
+        unicos[t] = valor
+    return {'tipo': tipo, 'puntos': list(unicos.items())}
+
+
+def _verificar_predefinidos():
+    """
+    Comprueba β(t) de los calendarios predefinidos en los casos borde
+    (intervención desde el día 0 y de duración cero).
+    """
+    beta, reduccion = 0.3, 0.6
+    reducido = beta * (1 - reduccion)
+    for tipo, inicio, fin in [('escalon', 0, 120), ('escalon', 30, 120), ('escalon', 50, 50),
+                              ('rampa', 0, 120), ('rampa', 30, 30)]:
+        calendario = calendario_predefinido(tipo, beta, inicio, fin, reduccion)
+        t = np.arange(0, 200)
+        esperado = np.full(len(t), beta)
+        if tipo == 'escalon':
+            esperado[(t >= inicio) & (t < fin)] = reducido
+        else:
+            esperado[t >= fin] = reducido
+            rampa = (t >= inicio) & (t < fin)
+            esperado[rampa] = beta + (reducido - beta) * (t[rampa] - inicio) / (fin - inicio)
+        obtenido = beta_en(calendario, t)
+        if not np.allclose(obtenido, esperado):
+            raise AssertionError(f"{tipo} {inicio}-{fin}: β(t) = {obtenido[:5]}... en lugar de {esperado[:5]}...")
+    print("Calendarios predefinidos: β(t) correcto")
+
+
+if __name__ == '__main__':
+    _verificar_predefinidos()
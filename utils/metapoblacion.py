@@ -0,0 +1,181 @@
+import numpy as np
+from scipy import sparse
+from scipy.integrate import RK45
+from scipy.spatial import cKDTree
+
+# ==========================================
+# SIR METAPOBLACIONAL CON MOVILIDAD DISPERSA
+# ==========================================
+#
+# Cada región es un SIR bien mezclado y las regiones se acoplan por la
+# movilidad: una fracción `movilidad` de los residentes de cada región
+# pasa el día en otras, repartida según un modelo de gravedad
+# (P_i P_j / d_ij**exponente) entre sus `vecinos` regiones más cercanas.
+# La fuerza de infección en la región i es
+#
+#     λ_i = β Σ_j M_ij I_j / N_j,    M = (1 - movilidad) Id + movilidad W
+#
+# con W dispersa (regiones x vecinos entradas). El estado es un arreglo
+# (regiones, 3) con S, I, R por fila y cada evaluación del lado derecho
+# hace un solo producto matriz dispersa-vector, así que el costo crece
+# casi linealmente con el número de regiones.
+#
+# La trayectoria completa (días x regiones x 3) no se guarda: en cada paso
+# del integrador se interpolan los días enteros que cubre y se acumula solo
+# lo que se dibuja (infectados totales por día, pico y día del pico de cada
+# región, estado final y las curvas de unas pocas regiones).
+
+RADIO_TIERRA = 6371.0
+
+COMPARTIMENTOS = ('S', 'I', 'R')
+
+
+def regiones_sinteticas(n, semilla=0, lado=1000.0):
+    """
+    `n` regiones al azar en un cuadrado de `lado` km, con poblaciones
+    log-normales (pocas ciudades grandes y muchos pueblos).
+    """
+    rng = np.random.default_rng(semilla)
+    posiciones = rng.uniform(0, lado, size=(n, 2))
+    poblacion = np.maximum(np.round(rng.lognormal(mean=10, sigma=1.2, size=n)), 100)
+    return {
+        'nombres': [f"Región {i + 1}" for i in range(n)],
+        'poblacion': poblacion,
+        'posiciones': posiciones,
+        'x': posiciones[:, 0],
+        'y': posiciones[:, 1],
+        'geografico': False,
+    }
+
+
+def regiones_paises(datos):
+    """
+    Regiones a partir de la lista de países de disease.sh
+    (/v3/covid-19/countries): población, coordenadas y casos activos.
+    """
+    paises = [p for p in datos if p.get('population') and p.get('countryInfo')]
+    lat = np.radians([p['countryInfo']['lat'] for p in paises])
+    lon = np.radians([p['countryInfo']['long'] for p in paises])
+    # Puntos en la esfera: la distancia euclídea (cuerda) se aproxima a la
+    # del círculo máximo y sirve para el árbol de vecinos
+    posiciones = RADIO_TIERRA * np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+    return {
+        'nombres': [p['country'] for p in paises],
+        'poblacion': np.array([p['population'] for p in paises], dtype=float),
+        'posiciones': posiciones,
+        'x': np.degrees(lon),
+        'y': np.degrees(lat),
+        'activos': np.array([p.get('active') or 0 for p in paises], dtype=float),
+        'geografico': True,
+    }
+
+
+def matriz_gravedad(poblacion, posiciones, vecinos=8, exponente=2.0):
+    """
+    Matriz W (CSR, filas que suman 1) con los destinos de los viajeros de
+    cada región: sus `vecinos` regiones más cercanas, con peso
+    P_j / d_ij**exponente (P_i es común a la fila y se cancela al normalizar).
+    """
+    n = len(poblacion)
+    vecinos = min(vecinos, n - 1)
+    if vecinos < 1:
+        return sparse.csr_matrix((n, n))
+    # k + 1 porque el más cercano de cada punto es él mismo
+    distancias, indices = cKDTree(posiciones).query(posiciones, k=vecinos + 1)
+    distancias, indices = distancias[:, 1:], indices[:, 1:]
+    # Regiones en el mismo punto: distancia mínima positiva
+    minimo = distancias[distancias > 0].min() if np.any(distancias > 0) else 1.0
+    pesos = poblacion[indices] / np.maximum(distancias, minimo) ** exponente
+    pesos /= pesos.sum(axis=1, keepdims=True)
+    filas = np.repeat(np.arange(n), vecinos)
+    return sparse.csr_matrix((pesos.ravel(), (filas, indices.ravel())), shape=(n, n))
+
+
+def matriz_movilidad(W, movilidad):
+    """
+    M = (1 - movilidad) Id + movilidad W, en CSR.
+    """
+    n = W.shape[0]
+    return ((1 - movilidad) * sparse.identity(n, format='csr') + movilidad * W).tocsr()
+
+
+def metapoblacion_rhs(t, y, M, beta, gamma, N):
+    """
+    Lado derecho para solve_ivp con el estado aplanado de un arreglo
+    (regiones, 3).
+    """
+    estado = y.reshape(-1, 3)
+    S, I = estado[:, 0], estado[:, 1]
+    incidencia = beta * S * (M @ (I / N))
+    recuperacion = gamma * I
+    dy = np.empty_like(estado)
+    dy[:, 0] = -incidencia
+    dy[:, 1] = incidencia - recuperacion
+    dy[:, 2] = recuperacion
+    return dy.ravel()
+
+
+def estado_inicial(regiones, infectados=10):
+    """
+    Arreglo (regiones, 3). Con casos activos reales se parte de ellos; si
+    no, `infectados` en la región más poblada.
+    """
+    N = regiones['poblacion']
+    I = np.zeros_like(N)
+    activos = regiones.get('activos')
+    if activos is not None and activos.sum() > 0:
+        I = np.minimum(activos, 0.5 * N)
+    else:
+        I[np.argmax(N)] = min(infectados, N.max())
+    return np.column_stack([N - I, I, np.zeros_like(N)])
+
+
+def simular_metapoblacion(regiones, beta, gamma, movilidad, dias, vecinos=8, exponente=2.0,
+                          infectados=10, destacadas=(), progreso=None):
+    """
+    Integra el SIR metapoblacional (RK45) y resume la trayectoria día por
+    día. Devuelve {'t', 'I_total' (infectados de todas las regiones por
+    día), 'pico' y 'dia_pico' (por región), 'final' (arreglo (regiones, 3)
+    del último día), 'I_destacadas' (días + 1, len(destacadas)) con los
+    infectados de las regiones `destacadas`, 'M', 'nfev'}.
+    """
+    N = regiones['poblacion']
+    W = matriz_gravedad(N, regiones['posiciones'], vecinos, exponente)
+    M = matriz_movilidad(W, movilidad)
+    y0 = estado_inicial(regiones, infectados)
+    destacadas = np.asarray(destacadas, dtype=np.int64)
+
+    t = np.arange(dias + 1)
+    I_total = np.empty(dias + 1)
+    I_destacadas = np.empty((dias + 1, len(destacadas)))
+    I_total[0], I_destacadas[0] = y0[:, 1].sum(), y0[destacadas, 1]
+    pico, dia_pico = y0[:, 1].copy(), np.zeros(len(N), dtype=np.int64)
+
+    solver = RK45(lambda tiempo, y: metapoblacion_rhs(tiempo, y, M, beta, gamma, N), 0, y0.ravel(), dias,
+                  rtol=1e-6, atol=1e-6)
+    siguiente = 1
+    while solver.status == 'running':
+        solver.step()
+        if solver.status == 'failed':
+            raise RuntimeError(f"La integración falló en t = {solver.t:.2f}")
+        if progreso is not None:
+            progreso(min(int(solver.t), dias), dias)
+        hasta = min(int(np.floor(solver.t)), dias)
+        if hasta < siguiente:
+            continue
+        # Días enteros del paso, interpolados con el polinomio de RK45
+        tramo = t[siguiente:hasta + 1]
+        I = solver.dense_output()(tramo).reshape(-1, 3, len(tramo))[:, 1]
+        I_total[tramo] = I.sum(axis=0)
+        I_destacadas[tramo] = I[destacadas].T
+        mejor = np.argmax(I, axis=1)
+        valor = I[np.arange(len(N)), mejor]
+        sube = valor > pico
+        pico = np.where(sube, valor, pico)
+        dia_pico = np.where(sube, tramo[mejor], dia_pico)
+        siguiente = hasta + 1
+
+    return {
+        't': t, 'I_total': I_total, 'pico': pico, 'dia_pico': dia_pico, 'final': solver.y.reshape(-1, 3),
+        'I_destacadas': I_destacadas, 'M': M, 'nfev': solver.nfev,
+    }
@@ -0,0 +1,416 @@
+import collections
+import functools
+import os
+import threading
+import time
+
+from utils import cache_compartido, compactar, segundo_plano
+
+# ==========================================
+# INSTRUMENTACIÓN DE CALLBACKS
+# ==========================================
+#
+# Cada callback registrado en la app se envuelve en su entrada de
+# app.callback_map para medir, por llamada:
+#     - total:         tiempo de pared del callback en el servidor
+#     - calculo:       la función de la página sin armar figuras
+#     - figura:        construir las figuras de Plotly (trazas, layout,
+#                      anotaciones) dentro de la función de la página
+#     - serializacion: el resto: compactar las figuras, preparar la
+#                      respuesta y convertirla a JSON
+#     - bytes:         tamaño del JSON devuelto al navegador
+# y los aciertos/fallos de las cachés consultadas durante la llamada. Los
+# módulos propios exponen listas de ganchos (GANCHOS_CONSULTA,
+# GANCHOS_DURACION, GANCHOS_TRABAJO) que instalar() llena; la función de
+# la página avisa su duración desde figuras_compactas. Plotly no tiene
+# ganchos: instalar() envuelve los constructores de sus objetos, los
+# métodos de Figure que la arman y to_json_plotly, que es lo que usa Dash
+# para serializar (así un callback sin figuras_compactas también separa
+# las tres fases). Con METRICAS=0 nada se envuelve y este módulo ni se
+# importa.
+#
+# Los datos viven en la memoria de cada proceso: con varios workers de
+# gunicorn cada uno expone los suyos. Los trabajos en segundo plano corren
+# en subprocesos y envían su muestra por la cola del gestor de trabajos.
+#
+# Se consultan en /metrics (formato de texto de Prometheus) y en la página
+# de diagnóstico.
+
+FASES = ('total', 'calculo', 'figura', 'serializacion')
+
+# Métodos de Figure que construyen la figura (los constructores de trazas
+# y del layout se envuelven todos)
+METODOS_FIGURA = ('add_trace', 'add_traces', 'update', 'update_layout', 'update_traces',
+                  'update_xaxes', 'update_yaxes', 'add_annotation', 'add_shape',
+                  'add_hline', 'add_vline', 'add_hrect', 'add_vrect')
+
+# Límites de las cubetas de los histogramas
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LIMITES_BYTES = (1e3, 1e4, 1e5, 1e6, 1e7)
+
+# Llamadas recientes que se guardan para los percentiles del diagnóstico
+MUESTRAS_RECIENTES = 200
+
+PREFIJO_COLA = 'metricas'
+
+_local = threading.local()
+_lock = threading.Lock()
+_callbacks = {}
+_caches = collections.Counter()
+_colas = []
+
+
+# ==========================================
+# MEDICIÓN DE UNA LLAMADA
+# ==========================================
+
+def _iniciar():
+    medicion = {'funcion': None, 'figura': 0.0, 'json': 0.0, 'en_plotly': False,
+                'cache': collections.Counter(), 'inicio': time.perf_counter()}
+    _local.medicion = medicion
+    return medicion
+
+
+def _terminar(medicion):
+    _local.medicion = None
+    total = time.perf_counter() - medicion['inicio']
+    # Sin figuras_compactas la página es todo menos la conversión a JSON
+    funcion = medicion['funcion']
+    if funcion is None:
+        funcion = max(total - medicion['json'], 0.0)
+    figura = min(medicion['figura'], funcion)
+    return {
+        'total': total,
+        'calculo': funcion - figura,
+        'figura': figura,
+        'serializacion': max(total - funcion, 0.0),
+        'cache': dict(medicion['cache']),
+    }
+
+
+def registrar_duracion(segundos):
+    """
+    Duración de la función de la página en el callback en curso (gancho de
+    figuras_compactas). Si hay decoradas anidadas gana la más larga, que
+    es la más externa.
+    """
+    medicion = getattr(_local, 'medicion', None)
+    if medicion is not None:
+        medicion['funcion'] = max(medicion['funcion'] or 0.0, segundos)
+
+
+def _medir_plotly(funcion, campo):
+    """
+    Versión de `funcion` (de Plotly) que suma su duración al `campo` de la
+    medición en curso. Las llamadas anidadas (una figura que arma sus
+    trazas, to_json que recorre objetos) se cuentan una sola vez.
+    """
+    @functools.wraps(funcion)
+    def medida(*args, **kwargs):
+        medicion = getattr(_local, 'medicion', None)
+        if medicion is None or medicion['en_plotly']:
+            return funcion(*args, **kwargs)
+        medicion['en_plotly'] = True
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            medicion[campo] += time.perf_counter() - inicio
+            medicion['en_plotly'] = False
+    medida._metricas = True
+    return medida
+
+
+def _medir_constructor(clase):
+    inicializar = clase.__dict__.get('__init__')
+    if inicializar is not None and not getattr(inicializar, '_metricas', False):
+        clase.__init__ = _medir_plotly(inicializar, 'figura')
+
+
+def _medir_subclases(clase):
+    for subclase in clase.__subclasses__():
+        _medir_constructor(subclase)
+        _medir_subclases(subclase)
+
+
+def medir_plotly():
+    """
+    Envuelve la construcción de figuras y la conversión a JSON de Plotly.
+    Las clases de plotly.graph_objects se importan al usarlas por primera
+    vez: las ya cargadas se envuelven aquí y las demás al definirse.
+    """
+    import plotly.io.json
+    from plotly.basedatatypes import BaseFigure, BasePlotlyType
+    from plotly.graph_objects import Figure
+
+    for clase in (BaseFigure, Figure):
+        _medir_constructor(clase)
+        for metodo in METODOS_FIGURA:
+            if metodo in clase.__dict__:
+                setattr(clase, metodo, _medir_plotly(clase.__dict__[metodo], 'figura'))
+    _medir_subclases(BasePlotlyType)
+    _medir_subclases(BaseFigure)
+
+    def __init_subclass__(cls, **kwargs):
+        _medir_constructor(cls)
+    BasePlotlyType.__init_subclass__ = classmethod(__init_subclass__)
+
+    # Dash llama a plotly.io.json.to_json_plotly al serializar cada respuesta
+    plotly.io.json.to_json_plotly = _medir_plotly(plotly.io.json.to_json_plotly, 'json')
+
+
+def registrar_cache(espacio, acierto):
+    """
+    Cuenta un acierto o fallo de caché, global y para el callback en curso.
+    """
+    resultado = 'acierto' if acierto else 'fallo'
+    with _lock:
+        _caches[(espacio, resultado)] += 1
+    medicion = getattr(_local, 'medicion', None)
+    if medicion is not None:
+        medicion['cache'][(espacio, resultado)] += 1
+
+
+# ==========================================
+# REGISTRO DE MUESTRAS
+# ==========================================
+
+def _nuevas_estadisticas():
+    return {
+        'llamadas': 0,
+        'fases': {fase: {'n': 0, 'suma': 0.0, 'cubetas': [0] * len(LIMITES_SEGUNDOS)}
+                  for fase in FASES},
+        'bytes': {'n': 0, 'suma': 0, 'maximo': 0, 'cubetas': [0] * len(LIMITES_BYTES)},
+        'recientes': collections.deque(maxlen=MUESTRAS_RECIENTES),
+        'cache': collections.Counter(),
+    }
+
+
+def _sumar(histograma, limites, valor):
+    histograma['n'] += 1
+    histograma['suma'] += valor
+    for i, limite in enumerate(limites):
+        if valor <= limite:
+            histograma['cubetas'][i] += 1
+
+
+def registrar_muestra(nombre, muestra):
+    """
+    Agrega una muestra (diccionario con fases, 'bytes' y 'cache', todas
+    opcionales) a las estadísticas del callback `nombre`.
+    """
+    with _lock:
+        estadisticas = _callbacks.get(nombre)
+        if estadisticas is None:
+            estadisticas = _callbacks[nombre] = _nuevas_estadisticas()
+        if 'total' in muestra:
+            estadisticas['llamadas'] += 1
+            estadisticas['recientes'].append(muestra['total'])
+        for fase in FASES:
+            if fase in muestra:
+                _sumar(estadisticas['fases'][fase], LIMITES_SEGUNDOS, muestra[fase])
+        if 'bytes' in muestra:
+            _sumar(estadisticas['bytes'], LIMITES_BYTES, muestra['bytes'])
+            estadisticas['bytes']['maximo'] = max(estadisticas['bytes']['maximo'], muestra['bytes'])
+        for clave, n in muestra.get('cache', {}).items():
+            estadisticas['cache'][clave] += n
+
+
+def _nombre_callback(funcion):
+    original = getattr(funcion, '__wrapped__', funcion)
+    return f"{original.__module__}.{original.__name__}"
+
+
+def _instrumentar(nombre, funcion, en_segundo_plano):
+    @functools.wraps(funcion)
+    def instrumentado(*args, **kwargs):
+        medicion = _iniciar()
+        try:
+            resultado = funcion(*args, **kwargs)
+        except BaseException:
+            _local.medicion = None
+            raise
+        muestra = _terminar(medicion)
+        if isinstance(resultado, str):
+            muestra['bytes'] = len(resultado.encode('utf-8'))
+        if en_segundo_plano:
+            # La petición inicial y las consultas de progreso no cuentan:
+            # el cálculo lo mide el subproceso y aquí solo la entrega final
+            if '"response"' not in (resultado if isinstance(resultado, str) else ''):
+                return resultado
+            muestra = {'serializacion': muestra['total'], 'bytes': muestra.get('bytes', 0)}
+        registrar_muestra(nombre, muestra)
+        return resultado
+    return instrumentado
+
+
+def instrumentar_callbacks(app):
+    """
+    Envuelve los callbacks de app.callback_map que aún no están medidos.
+    """
+    for cb in list(app.callback_map.values()):
+        funcion = cb.get('callback')
+        if funcion is None or getattr(funcion, '_metricas', False):
+            continue
+        instrumentado = _instrumentar(_nombre_callback(funcion), funcion, bool(cb.get('background')))
+        instrumentado._metricas = True
+        cb['callback'] = instrumentado
+
+
+def medir_trabajo(funcion, cola):
+    """
+    Versión medida de la función de un trabajo en segundo plano (gancho de
+    callback_largo): la muestra se deja en `cola` (un diskcache.Cache
+    compartido con el servidor). Todo el trabajo cuenta como cálculo o
+    construcción de figuras; la serialización se mide al entregar el
+    resultado.
+    """
+    nombre = _nombre_callback(funcion)
+
+    @functools.wraps(funcion)
+    def medido(*args, **kwargs):
+        medicion = _iniciar()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            muestra = _terminar(medicion)
+            muestra['figura'] = min(medicion['figura'], muestra['total'])
+            muestra['calculo'] = muestra['total'] - muestra['figura']
+            muestra.pop('serializacion', None)
+            cola.push((nombre, muestra), prefix=PREFIJO_COLA, expire=3600)
+    return medido
+
+
+def registrar_cola(cola):
+    if cola not in _colas:
+        _colas.append(cola)
+
+
+def _recoger_colas():
+    for cola in _colas:
+        while True:
+            _, elemento = cola.pull(prefix=PREFIJO_COLA)
+            if elemento is None:
+                break
+            registrar_muestra(*elemento)
+
+
+# ==========================================
+# CONSULTA
+# ==========================================
+
+def resumen():
+    """
+    Estadísticas por callback para la página de diagnóstico, ordenadas por
+    tiempo total acumulado.
+    """
+    _recoger_colas()
+    filas = []
+    with _lock:
+        for nombre, estadisticas in _callbacks.items():
+            fases = estadisticas['fases']
+            recientes = sorted(estadisticas['recientes'])
+            fila = {
+                'callback': nombre,
+                'llamadas': estadisticas['llamadas'],
+                'p50': recientes[len(recientes) // 2] if recientes else None,
+                'p95': recientes[min(int(0.95 * len(recientes)), len(recientes) - 1)] if recientes else None,
+                'total_acumulado': fases['total']['suma'],
+                'bytes_medio': (estadisticas['bytes']['suma'] / estadisticas['bytes']['n']
+                                if estadisticas['bytes']['n'] else None),
+                'bytes_maximo': estadisticas['bytes']['maximo'],
+                'aciertos': sum(n for (_, r), n in estadisticas['cache'].items() if r == 'acierto'),
+                'fallos': sum(n for (_, r), n in estadisticas['cache'].items() if r == 'fallo'),
+            }
+            for fase in FASES:
+                fila[f"{fase}_medio"] = (fases[fase]['suma'] / fases[fase]['n']
+                                         if fases[fase]['n'] else None)
+            filas.append(fila)
+        caches = dict(_caches)
+    filas.sort(key=lambda fila: -fila['total_acumulado'])
+    return {'callbacks': filas, 'caches': caches, 'pid': os.getpid()}
+
+
+def _etiquetas(**valores):
+    partes = []
+    for clave, valor in valores.items():
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"')
+        partes.append(f'{clave}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+def _histograma(lineas, metrica, etiquetas, histograma, limites):
+    for limite, n in zip(limites, histograma['cubetas']):
+        lineas.append(f"{metrica}_bucket{_etiquetas(**etiquetas, le=f'{limite:g}')} {n}")
+    lineas.append(f"{metrica}_bucket{_etiquetas(**etiquetas, le='+Inf')} {histograma['n']}")
+    lineas.append(f"{metrica}_sum{_etiquetas(**etiquetas)} {histograma['suma']}")
+    lineas.append(f"{metrica}_count{_etiquetas(**etiquetas)} {histograma['n']}")
+
+
+def texto_prometheus():
+    """
+    Métricas del proceso en el formato de texto de Prometheus.
+    """
+    _recoger_colas()
+    lineas = [
+        '# HELP dash_callback_segundos Duración de los callbacks por fase.',
+        '# TYPE dash_callback_segundos histogram',
+    ]
+    with _lock:
+        for nombre, estadisticas in sorted(_callbacks.items()):
+            for fase in FASES:
+                if estadisticas['fases'][fase]['n']:
+                    _histograma(lineas, 'dash_callback_segundos', {'callback': nombre, 'fase': fase},
+                                estadisticas['fases'][fase], LIMITES_SEGUNDOS)
+        lineas += [
+            '# HELP dash_callback_respuesta_bytes Tamaño del JSON de respuesta.',
+            '# TYPE dash_callback_respuesta_bytes histogram',
+        ]
+        for nombre, estadisticas in sorted(_callbacks.items()):
+            if estadisticas['bytes']['n']:
+                _histograma(lineas, 'dash_callback_respuesta_bytes', {'callback': nombre},
+                            estadisticas['bytes'], LIMITES_BYTES)
+        lineas += [
+            '# HELP dash_callback_cache_total Consultas de caché hechas por cada callback.',
+            '# TYPE dash_callback_cache_total counter',
+        ]
+        for nombre, estadisticas in sorted(_callbacks.items()):
+            for (espacio, resultado), n in sorted(estadisticas['cache'].items()):
+                lineas.append(f"dash_callback_cache_total"
+                              f"{_etiquetas(callback=nombre, espacio=espacio, resultado=resultado)} {n}")
+        lineas += [
+            '# HELP dash_cache_total Consultas de caché del proceso.',
+            '# TYPE dash_cache_total counter',
+        ]
+        for (espacio, resultado), n in sorted(_caches.items()):
+            lineas.append(f"dash_cache_total{_etiquetas(espacio=espacio, resultado=resultado)} {n}")
+    return '\n'.join(lineas) + '\n'
+
+
+def instalar(app, ruta='/metrics'):
+    """
+    Activa la instrumentación en la app: conecta los ganchos de las cachés,
+    de figuras_compactas y de los trabajos en segundo plano, envuelve la
+    construcción y serialización de Plotly, mide cada callback y publica
+    `ruta` en formato Prometheus.
+    """
+    if registrar_cache not in cache_compartido.GANCHOS_CONSULTA:
+        cache_compartido.GANCHOS_CONSULTA.append(registrar_cache)
+        compactar.GANCHOS_DURACION.append(registrar_duracion)
+        segundo_plano.GANCHOS_TRABAJO.append(medir_trabajo)
+        medir_plotly()
+        if segundo_plano.MANAGER is not None:
+            registrar_cola(segundo_plano.MANAGER.handle)
+    vistos = [0]
+
+    @app.server.before_request
+    def _instrumentar_nuevos():
+        # Dash pasa los callbacks de dash.callback a app.callback_map en la
+        # primera petición
+        if len(app.callback_map) != vistos[0]:
+            instrumentar_callbacks(app)
+            vistos[0] = len(app.callback_map)
+
+    @app.server.route(ruta)
+    def metricas():
+        return texto_prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
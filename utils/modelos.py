@@ -0,0 +1,146 @@
+import functools
+import importlib.util
+import os
+import threading
+
+import numpy as np
+
+# ==========================================
+# LADOS DERECHOS VECTORIZADOS DE MODELOS COMPARTIMENTALES
+# ==========================================
+#
+# Cada modelo expone rhs(t, y, *params) y jac(t, y, *params) con la firma
+# que espera solve_ivp. El estado y puede ser un vector (n,) o un lote
+# (n, k) de k simulaciones, y los parámetros escalares o arreglos (k,).
+# Si numba está instalado el núcleo se compila; si no (o si la variable
+# de entorno MODELOS_SIN_NUMBA está definida) se usa NumPy puro.
+#
+# numba tarda en importarse, así que njit es diferido: numba se importa y
+# cada núcleo se compila (o se carga de la caché en disco) en su primera
+# llamada, no al importar el módulo.
+
+NUMBA_DISPONIBLE = not os.environ.get('MODELOS_SIN_NUMBA') and importlib.util.find_spec('numba') is not None
+
+_compilar_lock = threading.RLock()
+
+
+def njit(*args, **kwargs):
+    """
+    Como numba.njit, pero la compilación ocurre en la primera llamada.
+    Sin numba devuelve la función sin cambios.
+    """
+    def decorar(funcion):
+        if not NUMBA_DISPONIBLE:
+            return funcion
+
+        @functools.wraps(funcion)
+        def diferida(*argumentos):
+            return _compilar(diferida)(*argumentos)
+        diferida.opciones_numba = kwargs
+        diferida.compilada = None
+        return diferida
+
+    if args and callable(args[0]):
+        return decorar(args[0])
+    return decorar
+
+
+def _compilar(diferida):
+    if diferida.compilada is not None:
+        return diferida.compilada
+    with _compilar_lock:
+        if diferida.compilada is None:
+            import numba
+
+            funcion = diferida.__wrapped__
+            # numba toma las funciones que se llaman desde los globales del
+            # módulo: las diferidas se cambian por su versión compilada, y
+            # la propia también para que el módulo la llame sin el envoltorio
+            for nombre in funcion.__code__.co_names:
+                llamada = funcion.__globals__.get(nombre)
+                if hasattr(llamada, 'opciones_numba'):
+                    funcion.__globals__[nombre] = _compilar(llamada)
+            diferida.compilada = numba.njit(**diferida.opciones_numba)(funcion)
+            if funcion.__globals__.get(funcion.__name__) is diferida:
+                funcion.__globals__[funcion.__name__] = diferida.compilada
+    return diferida.compilada
+
+
+@njit(cache=True)
+def _sir_nucleo(y, beta, gamma, N):
+    S = y[0]
+    I = y[1]
+    incidencia = beta * S * I / N
+    dy = np.empty_like(y)
+    dy[0] = -incidencia
+    dy[1] = incidencia - gamma * I
+    dy[2] = gamma * I
+    return dy
+
+
+@njit(cache=True)
+def _sir_jac_nucleo(y, beta, gamma, N):
+    S = y[0]
+    I = y[1]
+    J = np.zeros((3, 3))
+    J[0, 0] = -beta * I / N
+    J[0, 1] = -beta * S / N
+    J[1, 0] = beta * I / N
+    J[1, 1] = beta * S / N - gamma
+    J[2, 1] = gamma
+    return J
+
+
+@njit(cache=True)
+def _seir_nucleo(y, beta, sigma, gamma, N):
+    S = y[0]
+    E = y[1]
+    I = y[2]
+    incidencia = beta * S * I / N
+    dy = np.empty_like(y)
+    dy[0] = -incidencia
+    dy[1] = incidencia - sigma * E
+    dy[2] = sigma * E - gamma * I
+    dy[3] = gamma * I
+    return dy
+
+
+@njit(cache=True)
+def _seir_jac_nucleo(y, beta, sigma, gamma, N):
+    S = y[0]
+    I = y[2]
+    J = np.zeros((4, 4))
+    J[0, 0] = -beta * I / N
+    J[0, 2] = -beta * S / N
+    J[1, 0] = beta * I / N
+    J[1, 1] = -sigma
+    J[1, 2] = beta * S / N
+    J[2, 1] = sigma
+    J[2, 2] = -gamma
+    J[3, 2] = gamma
+    return J
+
+
+def sir_rhs(t, y, beta, gamma, N=1.0):
+    """
+    SIR: dS/dt = -βSI/N, dI/dt = βSI/N - γI, dR/dt = γI.
+    Con N = 1 se obtiene la forma de acción de masas (-βSI) que usan
+    el modelo del rumor y el SIR del proyecto 2.2.
+    """
+    return _sir_nucleo(np.asarray(y, dtype=np.float64), beta, gamma, float(N))
+
+
+def sir_jac(t, y, beta, gamma, N=1.0):
+    return _sir_jac_nucleo(np.asarray(y, dtype=np.float64), float(beta), float(gamma), float(N))
+
+
+def seir_rhs(t, y, beta, sigma, gamma, N=1.0):
+    """
+    SEIR: dS/dt = -βSI/N, dE/dt = βSI/N - σE, dI/dt = σE - γI, dR/dt = γI.
+    """
+    return _seir_nucleo(np.asarray(y, dtype=np.float64), beta, sigma, gamma, float(N))
+
+
+def seir_jac(t, y, beta, sigma, gamma, N=1.0):
+    return _seir_jac_nucleo(np.asarray(y, dtype=np.float64), float(beta), float(sigma),
+                            float(gamma), float(N))
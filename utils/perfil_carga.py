@@ -0,0 +1,160 @@
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# ==========================================
+# PERFIL DE CARGA CONTRA UN SERVIDOR EN MARCHA
+# ==========================================
+#
+# Uso:
+#     python -m utils.perfil_carga --url http://127.0.0.1:8050 --clientes 8 --peticiones 200
+#
+# Cada cliente repite una mezcla de visitas: carga de página (HTML, layout
+# y dependencias) y la simulación del Modelo SIR en modo determinista y
+# estocástico, que es el callback más costoso en CPU. El modo estocástico
+# corre como trabajo en segundo plano: se consulta hasta tener el resultado.
+
+VALORES_SIR = {
+    'btn-simular.n_clicks': 1,
+    'input-poblacion.value': 1000,
+    'input-beta.value': 0.24,
+    'input-gamma.value': 0.1,
+    'input-infectados.value': 1,
+    'input-tiempo.value': 100,
+    'realizaciones-sir.value': 500,
+}
+
+
+def _cuerpo_callback(dependencia, valores):
+    def entradas(lista):
+        return [
+            {'id': e['id'], 'property': e['property'], 'value': valores.get(f"{e['id']}.{e['property']}")}
+            for e in lista
+        ]
+    salidas = [
+        {'id': s.split('.')[0], 'property': s.split('.')[1].split('@')[0]}
+        for s in dependencia['output'].strip('.').split('...')
+    ]
+    return {
+        'output': dependencia['output'],
+        'outputs': salidas if len(salidas) > 1 else salidas[0],
+        'inputs': entradas(dependencia['inputs']),
+        'state': entradas(dependencia['state']),
+        'changedPropIds': [f"{e['id']}.{e['property']}" for e in dependencia['inputs']],
+    }
+
+
+def _esperar_trabajo(sesion, url, referer, cuerpo):
+    # Protocolo de los callbacks en segundo plano: la primera respuesta trae
+    # cacheKey/job y se vuelve a consultar hasta recibir 'response'
+    respuesta = sesion.post(f"{url}/_dash-update-component", json=cuerpo, headers=referer, timeout=120)
+    respuesta.raise_for_status()
+    datos = respuesta.json()
+    limite = time.monotonic() + 120
+    while 'cacheKey' in datos and 'response' not in datos:
+        if time.monotonic() > limite:
+            raise requests.Timeout("El trabajo en segundo plano no terminó a tiempo")
+        time.sleep(0.1)
+        respuesta = sesion.post(
+            f"{url}/_dash-update-component?cacheKey={datos['cacheKey']}&job={datos['job']}",
+            json=cuerpo, headers=referer, timeout=120
+        )
+        respuesta.raise_for_status()
+        if respuesta.status_code == 204:
+            continue
+        datos = {**datos, **respuesta.json()}
+
+
+def _escenarios(url):
+    sesion = requests.Session()
+    referer = {'Referer': f"{url}/modelo-sir"}
+    sesion.get(f"{url}/modelo-sir", timeout=60)
+    dependencias = sesion.get(f"{url}/_dash-dependencies", headers=referer, timeout=60).json()
+    dep_sir = next(d for d in dependencias if d['output'].startswith('..grafico-sir.figure...'))
+    dep_ensamble = next(d for d in dependencias if 'solicitud-ensamble-sir' in str(d['inputs']))
+
+    def pagina(s):
+        s.get(f"{url}/exponencial", timeout=60).raise_for_status()
+        s.get(f"{url}/_dash-layout", timeout=60).raise_for_status()
+        s.get(f"{url}/_dash-dependencies", headers={'Referer': f"{url}/exponencial"},
+              timeout=60).raise_for_status()
+
+    def simulacion(modo):
+        cuerpo = _cuerpo_callback(dep_sir, {**VALORES_SIR, 'modo-sir.value': modo})
+
+        def ejecutar(s):
+            respuesta = s.post(f"{url}/_dash-update-component", json=cuerpo, headers=referer,
+                               timeout=120)
+            respuesta.raise_for_status()
+            solicitud = respuesta.json().get('sideUpdate', {}).get('solicitud-ensamble-sir')
+            if solicitud is not None:
+                _esperar_trabajo(s, url, referer, _cuerpo_callback(
+                    dep_ensamble, {'solicitud-ensamble-sir.data': solicitud['data']}
+                ))
+        return ejecutar
+
+    return {
+        'pagina': pagina,
+        'sir_determinista': simulacion('determinista'),
+        'sir_estocastico': simulacion('estocastico'),
+    }
+
+
+def perfil_carga(url, clientes=8, peticiones=200):
+    """
+    Lanza `peticiones` visitas repartidas entre `clientes` hilos concurrentes
+    y devuelve, por escenario, latencias (p50, p95) y el rendimiento global.
+    """
+    escenarios = _escenarios(url.rstrip('/'))
+    nombres = list(escenarios)
+    tiempos = {nombre: [] for nombre in nombres}
+    errores = []
+    sesiones = [requests.Session() for _ in range(clientes)]
+
+    def visita(i):
+        nombre = nombres[i % len(nombres)]
+        inicio = time.perf_counter()
+        try:
+            escenarios[nombre](sesiones[i % clientes])
+        except requests.RequestException as e:
+            errores.append(f"{nombre}: {e}")
+            return
+        tiempos[nombre].append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clientes) as pool:
+        list(pool.map(visita, range(peticiones)))
+    total = time.perf_counter() - inicio
+
+    resumen = {}
+    for nombre, valores in tiempos.items():
+        valores.sort()
+        if valores:
+            resumen[nombre] = {
+                'n': len(valores),
+                'p50': statistics.median(valores),
+                'p95': valores[min(int(0.95 * len(valores)), len(valores) - 1)],
+            }
+    return {'escenarios': resumen, 'total': total,
+            'visitas_por_segundo': (peticiones - len(errores)) / total, 'errores': len(errores),
+            'detalle_errores': errores}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Perfil de carga del dashboard')
+    parser.add_argument('--url', default='http://127.0.0.1:8050')
+    parser.add_argument('--clientes', type=int, default=8)
+    parser.add_argument('--peticiones', type=int, default=200)
+    args = parser.parse_args()
+
+    resultado = perfil_carga(args.url, args.clientes, args.peticiones)
+    print(f"{'Escenario':<20}{'n':>6}{'p50 (ms)':>12}{'p95 (ms)':>12}")
+    for nombre, datos in resultado['escenarios'].items():
+        print(f"{nombre:<20}{datos['n']:>6}{1000 * datos['p50']:>12.0f}{1000 * datos['p95']:>12.0f}")
+    for error in resultado['detalle_errores'][:5]:
+        print(f"  {error}")
+    print(f"\nVisitas por segundo: {resultado['visitas_por_segundo']:.1f}"
+          f"  (total {resultado['total']:.1f} s, errores: {resultado['errores']})")
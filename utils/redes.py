@@ -0,0 +1,281 @@
+import numpy as np
+
+from utils.cache_compartido import obtener_cache, clave_de
+
+# ==========================================
+# EPIDEMIAS Y RUMORES EN REDES DE CONTACTO
+# ==========================================
+#
+# La red es una matriz de adyacencia CSR (simétrica, sin lazos ni aristas
+# repetidas): indptr e indices son los vecinos de cada nodo. Los
+# generadores arman todas las aristas de una vez con NumPy, también el de
+# Barabási-Albert (algoritmo de Batagelj-Brandes con saltos de punteros),
+# así que 10**6 nodos tardan un par de segundos.
+#
+# Dos motores:
+#     - síncrono: pasos de un día. Cada nodo lleva la cuenta de vecinos
+#       infectados; solo se actualiza con los vecinos de los nodos que
+#       cambiaron de estado, así que toda la simulación recorre cada
+#       arista un número acotado de veces. Sirve para SIR y para el rumor
+#       de Maki-Thompson (el divulgador se vuelve racional al hablar con
+#       quien ya conoce el rumor).
+#     - por eventos: SIR exacto en tiempo continuo. Cada infectado contagia
+#       a cada vecino tras un tiempo Exp(β) si ocurre antes de su
+#       recuperación (Exp(γ)); el instante de infección de cada nodo es
+#       entonces la distancia más corta desde las semillas con esos
+#       tiempos como pesos, y se calcula con Dijkstra (scipy.sparse.csgraph).
+
+TIPOS_RED = {
+    'erdos-renyi': 'Erdős–Rényi',
+    'mundo-pequeno': 'Mundo pequeño (Watts–Strogatz)',
+    'libre-escala': 'Libre de escala (Barabási–Albert)',
+}
+
+MODELOS = {'sir': 'SIR', 'rumor': 'Rumor (Maki–Thompson)'}
+
+# Clases de grado para las curvas por grado (bordes en potencias de 2)
+MAXIMO_CLASES = 8
+
+# Las redes generadas quedan en la caché compartida (los callbacks corren
+# en subprocesos: una caché en memoria del proceso no les serviría)
+ESPACIO_CACHE = 'redes'
+TTL_RED = 10 * 60
+
+
+def _desde_aristas(n, origen, destino):
+    # Matriz simétrica CSR de 0/1 a partir de aristas no dirigidas
+    from scipy import sparse
+
+    distintos = origen != destino
+    origen, destino = origen[distintos], destino[distintos]
+    filas = np.concatenate([origen, destino])
+    columnas = np.concatenate([destino, origen])
+    A = sparse.csr_matrix((np.ones(len(filas), dtype=np.int8), (filas, columnas)), shape=(n, n))
+    # Aristas repetidas se sumaron al convertir: quedan en 1
+    A.data[:] = 1
+    return A
+
+
+def erdos_renyi(n, grado_medio, rng):
+    """
+    G(n, m) con m = n * grado_medio / 2 aristas elegidas al azar.
+    """
+    m = int(round(n * grado_medio / 2))
+    return _desde_aristas(n, rng.integers(0, n, m), rng.integers(0, n, m))
+
+
+def mundo_pequeno(n, grado_medio, rng, recableado=0.1):
+    """
+    Watts-Strogatz: anillo donde cada nodo se une a sus grado_medio/2
+    vecinos de cada lado y cada arista cambia de destino con probabilidad
+    `recableado`.
+    """
+    lado = max(int(grado_medio) // 2, 1)
+    origen = np.repeat(np.arange(n), lado)
+    destino = (origen + np.tile(np.arange(1, lado + 1), n)) % n
+    cambia = rng.random(len(destino)) < recableado
+    destino[cambia] = rng.integers(0, n, int(cambia.sum()))
+    return _desde_aristas(n, origen, destino)
+
+
+def libre_escala(n, grado_medio, rng):
+    """
+    Barabási-Albert con m = grado_medio/2 aristas por nodo nuevo. En el
+    arreglo de extremos E, E[2k] es el nodo nuevo de la arista k y E[2k+1]
+    copia un extremo anterior al azar (elegir un extremo al azar es elegir
+    un nodo con probabilidad proporcional a su grado). Las copias apuntan
+    siempre hacia atrás, así que se resuelven todas a la vez saltando de
+    puntero en puntero (log2 de la longitud de las cadenas iteraciones).
+    """
+    m = max(int(grado_medio) // 2, 1)
+    aristas = n * m
+    extremos = np.empty(2 * aristas, dtype=np.int64)
+    extremos[0::2] = np.repeat(np.arange(n), m)
+    # Posición copiada por cada extremo impar: cualquiera anterior
+    impares = np.arange(1, 2 * aristas, 2)
+    puntero = np.arange(2 * aristas)
+    puntero[impares] = (rng.random(aristas) * impares).astype(np.int64)
+    pendiente = puntero[impares] % 2 == 1
+    while pendiente.any():
+        puntero[impares] = puntero[puntero[impares]]
+        pendiente = puntero[impares] % 2 == 1
+    extremos[impares] = extremos[puntero[impares]]
+    return _desde_aristas(n, extremos[0::2], extremos[1::2])
+
+
+GENERADORES = {
+    'erdos-renyi': erdos_renyi,
+    'mundo-pequeno': mundo_pequeno,
+    'libre-escala': libre_escala,
+}
+
+
+def generar_red(tipo, n, grado_medio, semilla=0, recableado=0.1):
+    """
+    Red de contactos (CSR) del tipo pedido. Sus arreglos indptr e indices
+    quedan en la caché compartida: cambiar solo los parámetros epidémicos
+    no la vuelve a generar.
+    """
+    from scipy import sparse
+
+    cache = obtener_cache()
+    clave = clave_de('red', tipo, int(n), float(grado_medio), int(semilla),
+                     float(recableado) if tipo == 'mundo-pequeno' else None)
+    guardada = cache.obtener(ESPACIO_CACHE, clave)
+    if guardada is not None:
+        indptr, indices = guardada
+        return sparse.csr_matrix((np.ones(len(indices), dtype=np.int8), indices, indptr), shape=(n, n))
+
+    rng = np.random.default_rng(semilla)
+    if tipo == 'mundo-pequeno':
+        A = mundo_pequeno(n, grado_medio, rng, recableado)
+    else:
+        A = GENERADORES[tipo](n, grado_medio, rng)
+    cache.guardar(ESPACIO_CACHE, clave, (A.indptr, A.indices), TTL_RED)
+    return A
+
+
+def clases_de_grado(grados):
+    """
+    Clase de cada nodo por su grado, con bordes en potencias de 2 desde el
+    grado mínimo (a lo sumo MAXIMO_CLASES clases: los grados más altos,
+    con pocos nodos, se agrupan en la última). Devuelve (clase por nodo,
+    etiquetas).
+    """
+    minimo, maximo = int(grados.min()), int(grados.max())
+    bordes = 2 ** np.arange(int(np.log2(max(minimo, 1))), int(np.log2(max(maximo, 1))) + 2)
+    bordes = np.concatenate([bordes[:MAXIMO_CLASES], [max(maximo + 1, bordes[-1])]])
+    bordes = np.unique(np.concatenate([[minimo], bordes[bordes > minimo]]))
+    clase = np.searchsorted(bordes, grados, side='right') - 1
+    etiquetas = [f"{bordes[c]}–{bordes[c + 1] - 1}" if bordes[c + 1] - 1 > bordes[c] else f"{bordes[c]}"
+                 for c in range(len(bordes) - 1)]
+    return clase, etiquetas
+
+
+def _vecinos(A, nodos):
+    # Índices (con repetición) de los vecinos de `nodos`, sin bucles
+    inicio, fin = A.indptr[nodos], A.indptr[nodos + 1]
+    largos = fin - inicio
+    total = int(largos.sum())
+    if total == 0:
+        return np.empty(0, dtype=A.indices.dtype)
+    desplazamiento = np.arange(total) - np.repeat(np.cumsum(largos) - largos, largos)
+    return A.indices[np.repeat(inicio, largos) + desplazamiento]
+
+
+def _contar(A, nodos, n):
+    # Cuántos de `nodos` tiene como vecinos cada nodo
+    return np.bincount(_vecinos(A, nodos), minlength=n)
+
+
+def _semillas(n, semillas, rng):
+    return rng.choice(n, size=min(max(int(semillas), 1), n), replace=False)
+
+
+def simular_sincrono(A, beta, gamma, dias, semillas=10, modelo='sir', semilla=0, progreso=None):
+    """
+    Pasos de un día sobre la red A. En SIR cada infectado contagia a cada
+    vecino susceptible con probabilidad 1 - exp(-β) y se recupera con
+    1 - exp(-γ); en el rumor el divulgador se vuelve racional con
+    probabilidad 1 - exp(-γ) por cada vecino que ya conoce el rumor.
+    Devuelve estados por día (ver _resultado).
+    """
+    rng = np.random.default_rng(semilla)
+    n = A.shape[0]
+    estado = np.zeros(n, dtype=np.int8)  # 0 = S, 1 = I, 2 = R
+    iniciales = _semillas(n, semillas, rng)
+    estado[iniciales] = 1
+    infectados_vecinos = _contar(A, iniciales, n)
+    # Vecinos que conocen el rumor (I o R), solo para el rumor
+    enterados_vecinos = infectados_vecinos.copy()
+    infeccion = np.full(n, np.inf)
+    recuperacion = np.full(n, np.inf)
+    infeccion[iniciales] = 0
+    p_contagio = 1 - np.exp(-beta)
+    p_recuperacion = 1 - np.exp(-gamma)
+
+    for dia in range(1, dias + 1):
+        activos = np.flatnonzero(estado == 1)
+        if activos.size == 0:
+            break
+        # Susceptibles con algún vecino infectado: los únicos que pueden cambiar
+        expuestos = np.flatnonzero((estado == 0) & (infectados_vecinos > 0))
+        nuevos = expuestos[rng.random(expuestos.size) < 1 - (1 - p_contagio) ** infectados_vecinos[expuestos]]
+        if modelo == 'rumor':
+            p = 1 - (1 - p_recuperacion) ** enterados_vecinos[activos]
+        else:
+            p = p_recuperacion
+        recuperados = activos[rng.random(activos.size) < p]
+
+        estado[nuevos] = 1
+        estado[recuperados] = 2
+        infeccion[nuevos] = dia
+        recuperacion[recuperados] = dia
+        infectados_vecinos += _contar(A, nuevos, n) - _contar(A, recuperados, n)
+        if modelo == 'rumor':
+            enterados_vecinos += _contar(A, nuevos, n)
+        if progreso is not None:
+            progreso(dia, dias)
+    return _resultado(A, infeccion, recuperacion, dias)
+
+
+def simular_eventos(A, beta, gamma, dias, semillas=10, semilla=0):
+    """
+    SIR exacto en tiempo continuo sobre la red A: tiempos de infección por
+    Dijkstra con pesos Exp(β) en las aristas que transmiten (las que
+    ocurren antes de la recuperación del contagiador).
+    """
+    from scipy import sparse
+    from scipy.sparse import csgraph
+
+    rng = np.random.default_rng(semilla)
+    n = A.shape[0]
+    periodo = rng.exponential(1 / gamma, n) if gamma > 0 else np.full(n, np.inf)
+    retraso = rng.exponential(1 / beta, A.nnz) if beta > 0 else np.full(A.nnz, np.inf)
+    # Arista dirigida u -> v de la fila u: transmite si llega antes de que u se recupere
+    origen = np.repeat(np.arange(n), np.diff(A.indptr))
+    transmite = retraso < periodo[origen]
+    G = sparse.csr_matrix((retraso[transmite], A.indices[transmite], np.concatenate(
+        [[0], np.cumsum(np.bincount(origen[transmite], minlength=n))])), shape=(n, n))
+
+    iniciales = _semillas(n, semillas, rng)
+    infeccion = csgraph.dijkstra(G, directed=True, indices=iniciales, min_only=True, limit=dias)
+    return _resultado(A, infeccion, infeccion + periodo, dias)
+
+
+def _resultado(A, infeccion, recuperacion, dias):
+    """
+    Curvas diarias a partir de los instantes de infección y recuperación
+    de cada nodo: {'t', 'S', 'I', 'R' (fracciones), 'clases', 'I_clase',
+    'ataque_clase' (fracción por clase de grado), 'grados', 'nodos'}.
+    """
+    n = A.shape[0]
+    t = np.arange(dias + 1)
+    grados = np.diff(A.indptr)
+    clase, etiquetas = clases_de_grado(grados)
+    C = len(etiquetas)
+
+    # Nodos infectados (o recuperados) hasta cada día, por clase: histograma
+    # de los instantes y suma acumulada
+    def acumulado(tiempos):
+        finitos = np.isfinite(tiempos) & (tiempos <= dias)
+        dia = np.ceil(tiempos[finitos]).astype(np.int64)
+        conteo = np.bincount(dia * C + clase[finitos], minlength=(dias + 1) * C).reshape(dias + 1, C)
+        return np.cumsum(conteo, axis=0)
+
+    infectados = acumulado(infeccion)
+    recuperados = acumulado(recuperacion)
+    por_clase = np.maximum(np.bincount(clase, minlength=C), 1)
+    I_clase = (infectados - recuperados) / por_clase
+    return {
+        't': t,
+        'S': 1 - infectados.sum(axis=1) / n,
+        'I': (infectados - recuperados).sum(axis=1) / n,
+        'R': recuperados.sum(axis=1) / n,
+        'clases': etiquetas,
+        'nodos_clase': np.bincount(clase, minlength=C),
+        'I_clase': I_clase,
+        'ataque_clase': infectados / por_clase,
+        'grados': grados,
+        'nodos': n,
+    }
@@ -0,0 +1,125 @@
+import functools
+import os
+import time
+import dash
+from dash import html, Input, Output
+
+from utils.cache_compartido import exigir_compartida
+
+# ==========================================
+# CALLBACKS PESADOS EN SEGUNDO PLANO
+# ==========================================
+#
+# Los cálculos largos (campos vectoriales con mallas grandes, ajustes con
+# descarga de datos, ensambles estocásticos) se ejecutan como callbacks en
+# segundo plano de Dash: el worker web solo lanza el trabajo y el navegador
+# consulta su avance cada INTERVALO_MS. La cola local usa DiskcacheManager
+# (pip install "dash[diskcache]"), que corre cada trabajo en un subproceso
+# y guarda progreso y resultado en disco. Sin esas dependencias, o con
+# SEGUNDO_PLANO=0, los mismos callbacks se ejecutan de forma normal.
+
+CARPETA_TRABAJOS = os.environ.get(
+    'TRABAJOS_SEGUNDO_PLANO',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'trabajos')
+)
+
+# Frecuencia con la que el navegador pregunta por el progreso
+INTERVALO_MS = 300
+
+# Funciones gancho(funcion, cola) -> funcion que envuelven cada trabajo
+# antes de ejecutarlo; utils.metricas.instalar agrega la que lo mide
+GANCHOS_TRABAJO = []
+
+OCULTO = {'display': 'none'}
+VISIBLE = {'display': 'block', 'width': '100%'}
+
+MANAGER = None
+if os.environ.get('SEGUNDO_PLANO', '1') != '0':
+    try:
+        import diskcache
+        import psutil
+
+        class GestorTrabajos(dash.DiskcacheManager):
+            def terminate_job(self, job):
+                # El trabajo puede terminar entre la comprobación de Dash y
+                # la búsqueda de sus subprocesos
+                try:
+                    super().terminate_job(job)
+                except psutil.NoSuchProcess:
+                    pass
+
+        MANAGER = GestorTrabajos(diskcache.Cache(CARPETA_TRABAJOS), expire=3600)
+    except ImportError:
+        MANAGER = None
+
+# Los trabajos corren en subprocesos: lo que guarden en la caché (controles
+# óptimos, índices de sensibilidad, respuestas de APIs, teselas) debe
+# quedar donde el servidor y los trabajos siguientes lo vean
+if MANAGER is not None:
+    exigir_compartida()
+
+
+def controles_progreso(prefijo):
+    """
+    Barra de progreso y botón de cancelar de un callback largo. Solo se
+    muestran mientras el trabajo está en marcha.
+    """
+    return html.Div([
+        html.Progress(id=f"{prefijo}-progreso", value='0', max='1', style=OCULTO),
+        html.Button("Cancelar", id=f"{prefijo}-cancelar", className="btn-generar", style=OCULTO),
+    ], className="input-group")
+
+
+def callback_largo(*args, prefijo, boton=None, **kwargs):
+    """
+    Registra un callback pesado. La función recibe como primer argumento
+    `set_progreso(hechos, total)` y después los valores de Input/State,
+    igual que un callback normal.
+
+    Parámetros:
+        - prefijo: prefijo de los ids creados con controles_progreso
+        - boton: id del botón que se desactiva mientras corre el trabajo
+    """
+    barra = f"{prefijo}-progreso"
+    cancelar = f"{prefijo}-cancelar"
+    running = [(Output(barra, 'style'), VISIBLE, OCULTO)]
+    if boton is not None:
+        running.append((Output(boton, 'disabled'), True, False))
+
+    def registrar(funcion):
+        if MANAGER is None:
+            @functools.wraps(funcion)
+            def ejecutar(*valores):
+                return funcion(lambda hechos, total: None, *valores)
+            dash.callback(*args, running=running, **kwargs)(ejecutar)
+            return funcion
+
+        # wraps: Dash identifica el trabajo por el código fuente de la función
+        @functools.wraps(funcion)
+        def ejecutar(set_progress, *valores):
+            ultimo = [0.0]
+
+            def set_progreso(hechos, total):
+                # Cada aviso es una escritura en la caché en disco: basta
+                # con uno por intervalo de consulta del navegador
+                ahora = time.monotonic()
+                if ahora - ultimo[0] >= INTERVALO_MS / 1000 or hechos >= total:
+                    ultimo[0] = ahora
+                    set_progress((str(hechos), str(total)))
+            medida = funcion
+            for gancho in GANCHOS_TRABAJO:
+                medida = gancho(medida, MANAGER.handle)
+            return medida(set_progreso, *valores)
+
+        dash.callback(
+            *args,
+            background=True,
+            manager=MANAGER,
+            interval=INTERVALO_MS,
+            progress=[Output(barra, 'value'), Output(barra, 'max')],
+            cancel=[Input(cancelar, 'n_clicks')],
+            running=running + [(Output(cancelar, 'style'), {'display': 'block'}, OCULTO)],
+            **kwargs
+        )(ejecutar)
+        return funcion
+    return registrar
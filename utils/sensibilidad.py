@@ -0,0 +1,256 @@
+import os
+
+import numpy as np
+from concurrent.futures import as_completed
+
+from utils.modelos import sir_rhs, seir_rhs
+from utils.estocastico import _obtener_pool
+from utils.cache_compartido import obtener_cache, clave_de
+
+# ==========================================
+# ANÁLISIS DE SENSIBILIDAD GLOBAL (SOBOL Y MORRIS)
+# ==========================================
+#
+# Los parámetros (β, γ, σ y la fracción inicial de infectados) se muestrean
+# en sus rangos y el modelo se integra para todas las muestras a la vez:
+# el estado es un arreglo (compartimentos, muestras) y cada paso de RK4
+# llama una vez al lado derecho por lotes de utils.modelos, así que decenas
+# de miles de corridas cuestan lo mismo que unas pocas llamadas de NumPy
+# por paso. Durante la integración se guardan solo el pico de infectados
+# (refinado con una parábola por los pasos vecinos), su instante y la tasa
+# de ataque final.
+#
+# Índices:
+#     - Sobol: esquema de Saltelli con una secuencia de Sobol en 2d
+#       dimensiones (matrices A y B, y A con la columna i de B). Índice de
+#       primer orden con el estimador de Saltelli (2010) y total con el
+#       de Jansen; intervalos del 95 % por bootstrap.
+#     - Morris: trayectorias en una rejilla de `niveles` niveles; efectos
+#       elementales μ* (media del valor absoluto) y σ.
+
+PARAMETROS = {
+    'sir': ('beta', 'gamma', 'i0'),
+    'seir': ('beta', 'sigma', 'gamma', 'i0'),
+}
+
+# La fracción inicial abarca órdenes de magnitud: se muestrea en escala log
+ESCALA_LOG = ('i0',)
+
+NOMBRES_PARAMETROS = {'beta': 'β', 'sigma': 'σ', 'gamma': 'γ', 'i0': 'I₀/N'}
+
+SALIDAS = {
+    'pico': 'Pico de infectados (fracción)',
+    't_pico': 'Día del pico',
+    'ataque': 'Tasa de ataque',
+}
+
+METODOS = {'sobol': 'Sobol (Saltelli)', 'morris': 'Morris (efectos elementales)'}
+
+# Procesos para repartir las muestras (1 = todo en el proceso actual)
+PROCESOS_SENSIBILIDAD = int(os.environ.get('SENSIBILIDAD_PROCESOS', 1))
+
+# Paso de RK4 como fracción del tiempo característico más corto (1/tasa)
+FRACCION_PASO = 0.2
+PASO_MAXIMO = 0.5
+
+REMUESTREOS = 200
+
+# Muestras que se conservan para las gráficas de dispersión
+MUESTRAS_DISPERSION = 2000
+
+ESPACIO_CACHE = 'sensibilidad'
+TTL_SENSIBILIDAD = 60 * 60
+
+
+def _derivada(modelo, y, p):
+    if modelo == 'seir':
+        return seir_rhs(0.0, y, p['beta'], p['sigma'], p['gamma'], 1.0)
+    return sir_rhs(0.0, y, p['beta'], p['gamma'], 1.0)
+
+
+def evaluar_lote(modelo, muestras, t_max, progreso=None):
+    """
+    Integra el modelo para todas las muestras ({parámetro: arreglo}) con
+    RK4 de paso fijo y devuelve {'pico', 't_pico', 'ataque'} por muestra.
+    """
+    i0 = muestras['i0']
+    if modelo == 'seir':
+        y = np.array([1 - i0, np.zeros_like(i0), i0, np.zeros_like(i0)])
+    else:
+        y = np.array([1 - i0, i0, np.zeros_like(i0)])
+    indice_I = 2 if modelo == 'seir' else 1
+
+    tasa = max(np.max(muestras[p]) for p in muestras if p != 'i0')
+    pasos = int(np.ceil(t_max / min(FRACCION_PASO / max(tasa, 1e-9), PASO_MAXIMO)))
+    dt = t_max / pasos
+
+    # Máximo de I, su paso y los valores vecinos para la parábola
+    mejor = y[indice_I].copy()
+    paso_mejor = np.zeros(len(i0), dtype=np.int64)
+    antes = mejor.copy()
+    despues = mejor.copy()
+    anterior = mejor.copy()
+    for n in range(1, pasos + 1):
+        k1 = _derivada(modelo, y, muestras)
+        k2 = _derivada(modelo, y + 0.5 * dt * k1, muestras)
+        k3 = _derivada(modelo, y + 0.5 * dt * k2, muestras)
+        k4 = _derivada(modelo, y + dt * k3, muestras)
+        y = y + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+        I = y[indice_I]
+        despues = np.where(paso_mejor == n - 1, I, despues)
+        sube = I > mejor
+        antes = np.where(sube, anterior, antes)
+        mejor = np.where(sube, I, mejor)
+        paso_mejor = np.where(sube, n, paso_mejor)
+        anterior = I
+        if progreso is not None and n % 100 == 0:
+            progreso(n, pasos)
+
+    # Vértice de la parábola por (antes, mejor, despues); sin vecino
+    # posterior (pico al final) o sin anterior (pico al inicio) no se refina
+    interior = (paso_mejor > 0) & (paso_mejor < pasos)
+    curvatura = antes - 2 * mejor + despues
+    refinable = interior & (curvatura < 0)
+    delta = np.where(refinable, 0.5 * (antes - despues) / np.where(refinable, curvatura, -1.0), 0.0)
+    delta = np.clip(delta, -0.5, 0.5)
+    return {
+        'pico': mejor - 0.25 * (antes - despues) * delta,
+        't_pico': (paso_mejor + delta) * dt,
+        'ataque': 1 - y[0],
+    }
+
+
+def evaluar(modelo, muestras, t_max, procesos=None, progreso=None):
+    """
+    evaluar_lote repartido en bloques entre `procesos` procesos.
+    """
+    n = len(muestras['i0'])
+    procesos = max(1, min(procesos or PROCESOS_SENSIBILIDAD, n))
+    if procesos == 1:
+        return evaluar_lote(modelo, muestras, t_max, progreso)
+
+    bloques = np.array_split(np.arange(n), procesos)
+    futuros = [_obtener_pool(procesos).submit(evaluar_lote, modelo, {p: v[b] for p, v in muestras.items()}, t_max)
+               for b in bloques]
+    for hechos, _ in enumerate(as_completed(futuros), start=1):
+        if progreso is not None:
+            progreso(hechos, procesos)
+    resultados = [futuro.result() for futuro in futuros]
+    return {s: np.concatenate([r[s] for r in resultados]) for s in SALIDAS}
+
+
+def _escalar(unidad, rangos, nombres):
+    # Muestras en [0, 1]^d a los rangos de cada parámetro (geométrico en
+    # los de ESCALA_LOG)
+    muestras = {}
+    for i, p in enumerate(nombres):
+        a, b = rangos[p]
+        if p in ESCALA_LOG:
+            muestras[p] = a * (b / a) ** unidad[:, i]
+        else:
+            muestras[p] = a + unidad[:, i] * (b - a)
+    return muestras
+
+
+def muestras_saltelli(nombres, rangos, base, semilla=0):
+    """
+    Matriz de Saltelli: A, B y los d AB_i apilados (base·(d + 2) filas,
+    en unidades de los parámetros).
+    """
+    from scipy.stats import qmc
+
+    d = len(nombres)
+    unidad = qmc.Sobol(2 * d, scramble=True, seed=semilla).random(base)
+    A, B = unidad[:, :d], unidad[:, d:]
+    AB = np.repeat(A[None], d, axis=0)
+    for i in range(d):
+        AB[i, :, i] = B[:, i]
+    return _escalar(np.concatenate([A, B, AB.reshape(-1, d)]), rangos, nombres)
+
+
+def indices_sobol(salida, d, base, semilla=0):
+    """
+    Índices de primer orden y totales (con intervalos del 95 % por
+    bootstrap) de una salida evaluada sobre la matriz de Saltelli.
+    """
+    fA, fB = salida[:base], salida[base:2 * base]
+    fAB = salida[2 * base:].reshape(d, base)
+    rng = np.random.default_rng(semilla)
+    # La primera fila usa todas las muestras; las demás, remuestreos
+    filas = np.vstack([np.arange(base), rng.integers(0, base, size=(REMUESTREOS, base))])
+    A, B, AB = fA[filas], fB[filas], fAB[:, filas]
+    varianza = np.var(np.concatenate([A, B], axis=1), axis=1)
+    varianza = np.where(varianza > 0, varianza, np.nan)
+    primer = np.mean(B * (AB - A), axis=2) / varianza
+    total = 0.5 * np.mean((A - AB) ** 2, axis=2) / varianza
+    return {
+        'S1': primer[:, 0], 'ST': total[:, 0],
+        'S1_ic': 1.96 * np.std(primer[:, 1:], axis=1), 'ST_ic': 1.96 * np.std(total[:, 1:], axis=1),
+    }
+
+
+def muestras_morris(nombres, rangos, trayectorias, niveles=4, semilla=0):
+    """
+    `trayectorias` trayectorias de Morris de d + 1 puntos: cada una cambia
+    un parámetro a la vez en Δ = niveles / (2 (niveles - 1)). Devuelve las
+    muestras y, por trayectoria, el orden en que se movieron.
+    """
+    d = len(nombres)
+    rng = np.random.default_rng(semilla)
+    delta = niveles / (2 * (niveles - 1))
+    # Puntos de partida en la mitad baja de la rejilla para poder sumar Δ
+    inicio = rng.integers(0, niveles // 2, size=(trayectorias, d)) / (niveles - 1)
+    orden = np.argsort(rng.random((trayectorias, d)), axis=1)
+    puntos = np.repeat(inicio[:, None, :], d + 1, axis=1)
+    filas = np.arange(trayectorias)[:, None]
+    for paso in range(d):
+        puntos[filas, np.arange(paso + 1, d + 1), orden[:, paso][:, None]] += delta
+    return _escalar(puntos.reshape(-1, d), rangos, nombres), orden, delta
+
+
+def indices_morris(salida, orden, delta):
+    """
+    μ* y σ de los efectos elementales de cada parámetro (en unidades de
+    la salida por recorrido completo del rango).
+    """
+    trayectorias, d = orden.shape
+    valores = salida.reshape(trayectorias, d + 1)
+    efectos = np.empty((trayectorias, d))
+    efectos[np.arange(trayectorias)[:, None], orden] = np.diff(valores, axis=1) / delta
+    return {'mu_estrella': np.mean(np.abs(efectos), axis=0), 'mu': np.mean(efectos, axis=0),
+            'sigma': np.std(efectos, axis=0)}
+
+
+def analizar_sensibilidad(modelo, rangos, t_max, metodo='sobol', base=1024, procesos=None, progreso=None):
+    """
+    Muestrea, integra todas las muestras por lotes y calcula los índices
+    de cada salida. `base` es el tamaño de A y B en Sobol (base·(d + 2)
+    corridas) o el número de trayectorias en Morris (base·(d + 1)).
+    Devuelve {'parametros', 'corridas', 'indices' ({salida: índices}),
+    'muestras' y 'salidas' (las primeras MUESTRAS_DISPERSION), 'desde_cache'}.
+    """
+    nombres = PARAMETROS[modelo]
+    cache = obtener_cache()
+    clave = clave_de('sensibilidad', modelo, tuple(tuple(map(float, rangos[p])) for p in nombres), t_max, metodo,
+                     base)
+    guardado = cache.obtener(ESPACIO_CACHE, clave)
+    if guardado is not None:
+        return dict(guardado, desde_cache=True)
+
+    if metodo == 'morris':
+        muestras, orden, delta = muestras_morris(nombres, rangos, base)
+    else:
+        muestras = muestras_saltelli(nombres, rangos, base)
+    salidas = evaluar(modelo, muestras, t_max, procesos, progreso)
+    if metodo == 'morris':
+        indices = {s: indices_morris(v, orden, delta) for s, v in salidas.items()}
+    else:
+        indices = {s: indices_sobol(v, len(nombres), base) for s, v in salidas.items()}
+    resultado = {
+        'parametros': nombres, 'corridas': len(muestras['i0']), 'indices': indices,
+        'muestras': {p: v[:MUESTRAS_DISPERSION] for p, v in muestras.items()},
+        'salidas': {s: v[:MUESTRAS_DISPERSION] for s, v in salidas.items()},
+    }
+    cache.guardar(ESPACIO_CACHE, clave, resultado, TTL_SENSIBILIDAD)
+    return dict(resultado, desde_cache=False)
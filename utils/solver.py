@@ -0,0 +1,76 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+
+# ==========================================
+# CAPA DE INTEGRACIÓN ADAPTATIVA CON DETECCIÓN DE EVENTOS
+# ==========================================
+
+# Puntos por curva: del orden del ancho en píxeles de una gráfica
+PUNTOS_PANTALLA = 600
+
+
+def resolver_ode(rhs, y0, t_max, args=(), indice_pico=1, umbrales=None,
+                 n_puntos=PUNTOS_PANTALLA, metodo='LSODA', jac=None,
+                 rtol=1e-8, atol=1e-8):
+    """
+    Integra dy/dt = rhs(t, y, *args) en [0, t_max] con paso adaptativo.
+
+    En vez de muestrear una malla densa y buscar el máximo con np.argmax,
+    el pico de y[indice_pico] se detecta como evento (dy/dt = 0 cruzando de
+    positivo a negativo) y se localiza con la salida densa del integrador.
+
+    Parámetros:
+        - umbrales: diccionario {nombre: (indice, valor, direccion)} con los
+          cruces a detectar (direccion +1 subiendo, -1 bajando, 0 ambos)
+        - n_puntos: tamaño de la malla devuelta para graficar
+
+    Devuelve un diccionario con:
+        - t, y: malla de graficación (incluye exactamente el instante del pico)
+        - t_pico, valor_pico: máximo de y[indice_pico]
+        - cruces: {nombre: [tiempos]} para cada umbral
+        - sol: interpolante denso de la solución
+        - nfev: evaluaciones del lado derecho
+    """
+    umbrales = umbrales or {}
+
+    def evento_pico(t, y, *a):
+        return rhs(t, y, *a)[indice_pico]
+    evento_pico.direction = -1
+
+    eventos = [evento_pico]
+    for indice, valor, direccion in umbrales.values():
+        def evento_umbral(t, y, *a, indice=indice, valor=valor):
+            return y[indice] - valor
+        evento_umbral.direction = direccion
+        eventos.append(evento_umbral)
+
+    opciones = {'jac': jac} if jac is not None and metodo in ('LSODA', 'BDF', 'Radau') else {}
+    sol = solve_ivp(
+        rhs, (0, t_max), y0, method=metodo, args=args, events=eventos,
+        dense_output=True, rtol=rtol, atol=atol, **opciones
+    )
+
+    # Candidatos a máximo: eventos dI/dt = 0 y los extremos del intervalo
+    candidatos_t = np.concatenate([[0.0, sol.t[-1]], sol.t_events[0]])
+    candidatos_y = np.concatenate([
+        [sol.y[indice_pico, 0], sol.y[indice_pico, -1]],
+        sol.y_events[0][:, indice_pico] if len(sol.t_events[0]) else []
+    ])
+    k = int(np.argmax(candidatos_y))
+    t_pico, valor_pico = float(candidatos_t[k]), float(candidatos_y[k])
+
+    t = np.union1d(np.linspace(0, sol.t[-1], n_puntos), [t_pico])
+    cruces = {
+        nombre: [float(te) for te in tiempos]
+        for nombre, tiempos in zip(umbrales, sol.t_events[1:])
+    }
+
+    return {
+        't': t,
+        'y': sol.sol(t),
+        't_pico': t_pico,
+        'valor_pico': valor_pico,
+        'cruces': cruces,
+        'sol': sol.sol,
+        'nfev': sol.nfev,
+    }
@@ -0,0 +1,294 @@
+import functools
+import json
+import uuid
+
+import numpy as np
+import dash
+from dash import dcc, html, Input, Output, State, Patch, no_update
+from dash.exceptions import MissingCallbackContextException
+
+from utils.cache_compartido import obtener_cache
+from utils.compactar import compactar_arreglo
+
+# ==========================================
+# SERIES DE TIEMPO A LA RESOLUCIÓN DE LA PANTALLA
+# ==========================================
+#
+# Un horizonte largo (Euler con un punto por día, ensambles, el histórico
+# completo de COVID) produce muchos más puntos de los que caben en la
+# gráfica. series_reducidas deja en cada traza a lo sumo un punto por
+# píxel de ancho: la serie se divide en cubetas y de cada una se conservan
+# el mínimo y el máximo, así que picos y valles se dibujan exactos. La
+# serie completa queda en la caché compartida y, al hacer zoom, el
+# navegador pide el detalle del tramo visible:
+#
+#     relayoutData --(clientside)--> {grafico}-vista {ancho, rango}
+#     {grafico}-vista --(servidor)--> Patch de x/y de las trazas reducidas
+#
+# Cada página con una gráfica reducida incluye controles_resolucion(id).
+
+PUNTOS_POR_PIXEL = 1
+
+# Ancho supuesto antes de que el navegador informe el real
+ANCHO_POR_DEFECTO = 800
+
+ESPACIO_CACHE = 'series'
+TTL_SERIES = 30 * 60
+
+TIPOS_REDUCIBLES = ('scatter', 'scattergl')
+
+_registrados = set()
+
+
+def limite_puntos(ancho=None):
+    """
+    Puntos por traza para una gráfica de `ancho` píxeles.
+    """
+    return max(int((ancho or ANCHO_POR_DEFECTO) * PUNTOS_POR_PIXEL), 100)
+
+
+def indices_min_max(y, puntos):
+    """
+    Índices (ordenados) de a lo sumo ~`puntos` puntos de `y`: el mínimo y el
+    máximo de cada cubeta, el primero y el último. Los NaN se conservan
+    (uno por cubeta) para que los huecos de la línea no desaparezcan.
+    """
+    n = len(y)
+    if n <= puntos:
+        return np.arange(n)
+    cubetas = max(puntos // 2, 1)
+    tamano = -(-n // cubetas)
+    relleno = cubetas * tamano - n
+    finitos = np.isfinite(y)
+
+    arriba = np.concatenate([np.where(finitos, y, -np.inf), np.full(relleno, -np.inf)]).reshape(cubetas, tamano)
+    abajo = np.concatenate([np.where(finitos, y, np.inf), np.full(relleno, np.inf)]).reshape(cubetas, tamano)
+    base = np.arange(cubetas) * tamano
+    indices = [base + np.argmax(arriba, axis=1), base + np.argmin(abajo, axis=1), [0, n - 1]]
+    if not finitos.all():
+        huecos = np.concatenate([~finitos, np.zeros(relleno, dtype=bool)]).reshape(cubetas, tamano)
+        indices.append((base + np.argmax(huecos, axis=1))[huecos.any(axis=1)])
+
+    indices = np.unique(np.concatenate(indices))
+    return indices[indices < n]
+
+
+def _eje(x):
+    # Eje x como arreglo numérico o de fechas, o None si no es ordenable
+    # (categorías) o no está ordenado (trayectorias en el plano de fases)
+    eje = np.asarray(x)
+    if eje.dtype.kind == 'O':
+        try:
+            eje = eje.astype('datetime64[ms]')
+        except (TypeError, ValueError):
+            return None
+    if eje.dtype.kind not in 'iufM' or eje.ndim != 1:
+        return None
+    if len(eje) > 1 and not np.all(eje[1:] >= eje[:-1]):
+        return None
+    return eje
+
+
+def _limite_rango(valor, eje):
+    if eje.dtype.kind == 'M':
+        return np.datetime64(str(valor).replace(' ', 'T')).astype(eje.dtype)
+    return float(valor)
+
+
+def _seleccion(eje, y, puntos, rango=None):
+    # Índices a dibujar del tramo visible (con un punto más a cada lado)
+    inicio, fin = 0, len(eje)
+    if rango is not None:
+        inicio = max(int(np.searchsorted(eje, _limite_rango(rango[0], eje), 'left')) - 1, 0)
+        fin = min(int(np.searchsorted(eje, _limite_rango(rango[1], eje), 'right')) + 1, len(eje))
+    return inicio + indices_min_max(y[inicio:fin], puntos)
+
+
+def _por_punto(valor, n):
+    return isinstance(valor, (list, tuple, np.ndarray)) and len(valor) == n
+
+
+def _anidado(arreglos, seleccion):
+    # {('marker', 'color'): arreglo} -> {'marker': {'color': arreglo[seleccion]}}
+    cambios = {}
+    for ruta, valores in arreglos.items():
+        destino = cambios
+        for clave in ruta[:-1]:
+            destino = destino.setdefault(clave, {})
+        destino[ruta[-1]] = valores[seleccion]
+    return cambios
+
+
+def reducir_figura(figura, puntos):
+    """
+    Reduce en el lugar las trazas de línea de un go.Figure con más de
+    `puntos` puntos. Devuelve {índice de traza: {ruta: arreglo completo}}
+    de las trazas reducidas (vacío si no hizo falta).
+    """
+    completas = {}
+    for indice, traza in enumerate(figura.data):
+        if traza.type not in TIPOS_REDUCIBLES or traza.x is None or traza.y is None:
+            continue
+        x, y = traza.x, traza.y
+        n = len(y)
+        if n <= puntos or len(x) != n:
+            continue
+        eje = _eje(x)
+        if eje is None:
+            continue
+        try:
+            valores = np.asarray(y, dtype=float)
+        except (TypeError, ValueError):
+            continue
+
+        arreglos = {('x',): eje, ('y',): valores}
+        # Texto, customdata, colores o tamaños por punto siguen a x/y (las
+        # propiedades compuestas son objetos y no pasan _por_punto)
+        for clave in traza:
+            valor = traza[clave]
+            if clave not in ('x', 'y') and _por_punto(valor, n):
+                arreglos[(clave,)] = np.asarray(valor)
+        for clave in traza.marker:
+            valor = traza.marker[clave]
+            if _por_punto(valor, n):
+                arreglos[('marker', clave)] = np.asarray(valor)
+        completas[indice] = arreglos
+
+    for indice, arreglos in completas.items():
+        figura.data[indice].update(_anidado(arreglos, _seleccion(arreglos[('x',)], arreglos[('y',)], puntos)))
+    return completas
+
+
+def _es_figura(valor):
+    return hasattr(valor, 'to_plotly_json') and hasattr(valor, 'layout')
+
+
+def _reducir_si_figura(grafico, valor):
+    if not _es_figura(valor):
+        return valor
+    puntos = limite_puntos()
+    completas = reducir_figura(valor, puntos)
+    serie = None
+    if completas:
+        clave = uuid.uuid4().hex
+        # Misma uirevision mientras se piden detalles: Plotly conserva el zoom
+        valor.layout.uirevision = clave
+        # Primero a la caché: el navegador nunca recibe una clave sin datos
+        obtener_cache().guardar(ESPACIO_CACHE, clave, completas, TTL_SERIES)
+        serie = {'clave': clave, 'puntos': puntos, 'rango': None}
+    try:
+        # Siempre, también sin reducir: la serie de una corrida anterior no
+        # debe llegar por zoom a esta figura
+        dash.set_props(f"{grafico}-serie", {'data': serie})
+    except MissingCallbackContextException:
+        # Llamada fuera de un callback (benchmarks): no habrá zoom
+        pass
+    return valor
+
+
+def series_reducidas(grafico):
+    """
+    Decorador para el callback que dibuja la gráfica `grafico`: reduce la
+    primera figura que devuelve (sola o en la tupla de salidas) a la
+    resolución de la pantalla y registra la carga de detalle al hacer zoom.
+    Va debajo de @figuras_compactas.
+    """
+    _registrar_zoom(grafico)
+
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            resultado = funcion(*args, **kwargs)
+            if isinstance(resultado, (list, tuple)):
+                salidas = list(resultado)
+                for i, valor in enumerate(salidas):
+                    if _es_figura(valor):
+                        salidas[i] = _reducir_si_figura(grafico, valor)
+                        break
+                return type(resultado)(salidas)
+            return _reducir_si_figura(grafico, resultado)
+        return envoltura
+    return decorador
+
+
+def controles_resolucion(grafico):
+    """
+    Almacenes de la vista (ancho y rango visibles) y de la serie completa
+    de la gráfica `grafico`.
+    """
+    return html.Div([
+        dcc.Store(id=f"{grafico}-vista"),
+        dcc.Store(id=f"{grafico}-serie"),
+    ])
+
+
+def detalle_serie(vista, serie):
+    """
+    Patch con las trazas reducidas de nuevo para el ancho y el tramo
+    visibles, y el nuevo estado de la serie. Sin cambios si la vista no
+    necesita más detalle o la serie completa ya no está en la caché.
+    """
+    if not vista or not serie:
+        return no_update, no_update
+    puntos = limite_puntos(vista.get('ancho'))
+    rango = vista.get('rango')
+    if rango == serie.get('rango') and puntos <= serie['puntos']:
+        return no_update, no_update
+    completas = obtener_cache().obtener(ESPACIO_CACHE, serie['clave'])
+    if completas is None:
+        return no_update, no_update
+
+    parche = Patch()
+    for indice, arreglos in completas.items():
+        seleccion = _seleccion(arreglos[('x',)], arreglos[('y',)], puntos, rango)
+        for ruta, valores in arreglos.items():
+            destino = parche['data'][indice]
+            for clave in ruta[:-1]:
+                destino = destino[clave]
+            compacto = compactar_arreglo(valores[seleccion])
+            destino[ruta[-1]] = compacto if compacto is not None else valores[seleccion].tolist()
+    return parche, {**serie, 'puntos': puntos, 'rango': rango}
+
+
+# El navegador conoce el ancho del área de trazado y el rango del eje x que
+# quedó tras el zoom, el paneo o el doble clic (None si es automático)
+VISTA_JS = """
+function(relayout, vista) {
+    var contenedor = document.getElementById(%s);
+    var grafica = contenedor && contenedor.querySelector('.js-plotly-plot');
+    if (!grafica || !grafica._fullLayout) {
+        return window.dash_clientside.no_update;
+    }
+    var eje = grafica._fullLayout.xaxis;
+    var nueva = {
+        ancho: Math.round(grafica._fullLayout._size.w),
+        rango: eje && !eje.autorange ? eje.range.slice() : null
+    };
+    if (JSON.stringify(nueva) === JSON.stringify(vista)) {
+        return window.dash_clientside.no_update;
+    }
+    return nueva;
+}
+"""
+
+
+def _registrar_zoom(grafico):
+    # Una vez por gráfica aunque varios callbacks la dibujen
+    if grafico in _registrados:
+        return
+    _registrados.add(grafico)
+
+    dash.clientside_callback(
+        VISTA_JS % json.dumps(grafico),
+        Output(f"{grafico}-vista", 'data'),
+        Input(grafico, 'relayoutData'),
+        State(f"{grafico}-vista", 'data'),
+        prevent_initial_call=True
+    )
+    dash.callback(
+        Output(grafico, 'figure', allow_duplicate=True),
+        Output(f"{grafico}-serie", 'data'),
+        Input(f"{grafico}-vista", 'data'),
+        State(f"{grafico}-serie", 'data'),
+        prevent_initial_call=True
+    )(detalle_serie)
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+import time
+
+# ==========================================
+# INFORME DE TIEMPOS DE IMPORTACIÓN
+# ==========================================
+#
+# Las páginas se registran todas al arrancar (use_pages=True), así que el
+# arranque de cada worker depende de lo que importen a nivel de módulo.
+# scipy, numba y los simuladores se importan dentro de los callbacks (y
+# utils.modelos compila sus núcleos en la primera llamada) y
+# dash_bootstrap_components con el layout de la única página que lo usa;
+# este informe mide el costo de cada página y comprueba que `import app`
+# no cargue ninguno de esos módulos. requests lo importa el propio Dash
+# (dash._jupyter), así que ya está cargado antes de la primera página.
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CARPETA_PAGINAS = os.path.join(RAIZ, 'pages')
+
+# Módulos que no deberían cargarse al arrancar
+PESADOS = ('scipy', 'numba', 'pandas', 'dash_bootstrap_components', 'requests')
+
+
+def _medir(codigo, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, check=True, stdout=subprocess.DEVNULL)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def _cargados(importacion):
+    codigo = ("import sys, %s; print(' '.join(m for m in %r if m in sys.modules))" % (importacion, PESADOS))
+    salida = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, check=True, capture_output=True, text=True)
+    return salida.stdout.split()
+
+
+def pesados_al_arrancar():
+    """
+    Módulos de PESADOS que quedan cargados tras `import app` en un
+    proceso nuevo y que `import dash` por sí solo no carga.
+    """
+    de_dash = _cargados('dash')
+    return [modulo for modulo in _cargados('app') if modulo not in de_dash]
+
+
+def informe_importacion(repeticiones=3):
+    """
+    Mide en procesos nuevos el costo de importar cada página por separado
+    y el de `import app` completo.
+    """
+    crear_app = "import dash; dash.Dash(__name__, use_pages=True, pages_folder='');"
+    base_app = _medir(crear_app, repeticiones)
+    filas = []
+    for archivo in sorted(os.listdir(CARPETA_PAGINAS)):
+        if archivo.startswith(('_', '.')) or not archivo.endswith('.py'):
+            continue
+        modulo = f"pages.{archivo[:-3]}"
+        filas.append((modulo, _medir(f"{crear_app} import {modulo}", repeticiones) - base_app))
+
+    print(f"{'Página':<22}{'Importación (s)':>16}")
+    for modulo, tiempo in sorted(filas, key=lambda fila: -fila[1]):
+        print(f"{modulo:<22}{tiempo:>16.3f}")
+    print()
+    print(f"import dash (base):       {_medir('import dash', repeticiones):.3f} s")
+    print(f"import app:               {_medir('import app', repeticiones):.3f} s")
+    print(f"Cargados al arrancar:     {', '.join(pesados_al_arrancar()) or 'ninguno de ' + ', '.join(PESADOS)}")
+    print(f"Cargados por dash:        {', '.join(_cargados('dash')) or 'ninguno'}")
+
+
+if __name__ == '__main__':
+    informe_importacion()
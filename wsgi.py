@@ -0,0 +1,6 @@
+from app import app
+
+# Punto de entrada WSGI para producción:
+#     gunicorn wsgi:server
+#     uvicorn wsgi:server --interface wsgi --workers 4
+server = app.server